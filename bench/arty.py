@@ -59,7 +59,10 @@ class BenchSoC(BaseSoC):
                 )
             ]
             self.platform.add_extension(_la_pmod_ios)
-            self.submodules.sampler = Sampler(self.platform.request("la_pmod"))
+            self.submodules.sampler = Sampler(self.platform.request("la_pmod"),
+                with_rle          = True,
+                with_trigger      = True,
+                pre_trigger_depth = 4096)
 
             # DRAMFIFO -----------------------------------------------------------------------------
             from litedram.frontend.fifo import LiteDRAMFIFO
@@ -92,25 +95,8 @@ class BenchSoC(BaseSoC):
             self.comb += udp_streamer.source.connect(udp_port.sink)
 
         if with_analyzer:
-            from litescope import LiteScopeAnalyzer
-            analyzer_signals = [
-                self.sdphy.sdpads,
-                self.sdphy.cmdw.sink,
-                self.sdphy.cmdr.sink,
-                self.sdphy.cmdr.source,
-                self.sdphy.dataw.sink,
-                self.sdphy.dataw.stop,
-                self.sdphy.dataw.crc.source,
-                self.sdphy.dataw.status.status,
-                self.sdphy.datar.sink,
-                self.sdphy.datar.source,
-                self.sdphy.clocker.ce,
-                self.sdphy.clocker.stop,
-            ]
-            self.submodules.analyzer = LiteScopeAnalyzer(analyzer_signals,
-                depth        = 2048,
-                clock_domain = "sys",
-                csr_csv      = "analyzer.csv")
+            from litesdcard.scope import add_sdcard_analyzer
+            add_sdcard_analyzer(self, name="sdcard", depth=2048, csr_csv="analyzer.csv")
 
 # BenchPHY -----------------------------------------------------------------------------------------
 
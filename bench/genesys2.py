@@ -46,25 +46,8 @@ class BenchSoC(BaseSoC):
             self.add_etherbone(phy=self.ethphy)
 
         if with_analyzer:
-            from litescope import LiteScopeAnalyzer
-            analyzer_signals = [
-                self.sdphy.sdpads,
-                self.sdphy.cmdw.sink,
-                self.sdphy.cmdr.sink,
-                self.sdphy.cmdr.source,
-                self.sdphy.dataw.sink,
-                self.sdphy.dataw.stop,
-                self.sdphy.dataw.crc.source,
-                self.sdphy.dataw.status.status,
-                self.sdphy.datar.sink,
-                self.sdphy.datar.source,
-                self.sdphy.clocker.ce,
-                self.sdphy.clocker.stop,
-            ]
-            self.submodules.analyzer = LiteScopeAnalyzer(analyzer_signals,
-                depth        = 2048,
-                clock_domain = "sys",
-                csr_csv      = "analyzer.csv")
+            from litesdcard.scope import add_sdcard_analyzer
+            add_sdcard_analyzer(self, name="sdcard", depth=2048, csr_csv="analyzer.csv")
 
 # SoC Ctrl -----------------------------------------------------------------------------------------
 
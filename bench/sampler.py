@@ -6,7 +6,6 @@
 # Copyright (c) 2020 Florent Kermarrec <florent@enjoy-digital.fr>
 # SPDX-License-Identifier: BSD-2-Clause
 
-import socket
 import argparse
 
 from migen import *
@@ -18,10 +17,324 @@ from litex.soc.interconnect import stream
 
 # Gateware -----------------------------------------------------------------------------------------
 
+class SamplerRLE(Module, AutoCSR):
+    """Sampler Run-Length Encoder
+
+    Encodes the samples as 32-bit records (sent LSB first on the 8-bit source): value (8-bit) and
+    run length - 1 (24-bit). A record is emitted when the sampled value changes, when the run length
+    saturates and on the last sample, so idle/repetitive bus periods only cost 4 bytes. The record
+    timestamps are recovered on the host by accumulating the run lengths (see
+    litesdcard.host.capture.rle_decode).
+
+    When disabled, samples are passed through unmodified. Overflow is set (sticky until the encoder
+    is disabled) when records are lost (value changing faster than records can be sent).
+    """
+    def __init__(self, fifo_depth=16):
+        self.enable   = CSRStorage()
+        self.overflow = CSRStatus()
+        self.sink     = sink   = stream.Endpoint([("data", 8)])
+        self.source   = source = stream.Endpoint([("data", 8)])
+
+        # # #
+
+        # Run-length encoding.
+        value  = Signal(8)
+        run    = Signal(24)
+        active = Signal()
+        flush  = Signal()
+        push   = Signal()
+        record = Signal(32)
+        last   = Signal()
+        self.comb += record.eq(Cat(value, run))
+        self.sync += [
+            flush.eq(0),
+            If(~self.enable.storage,
+                active.eq(0),
+            ).Elif(flush,
+                active.eq(0)
+            ).Elif(sink.valid,
+                flush.eq(sink.last),
+                If(~active | (sink.data != value) | (run == (2**24 - 1)),
+                    active.eq(1),
+                    value.eq(sink.data),
+                    run.eq(0)
+                ).Else(
+                    run.eq(run + 1)
+                )
+            )
+        ]
+        self.comb += [
+            push.eq(active & (flush | (sink.valid & ((sink.data != value) | (run == (2**24 - 1)))))),
+            last.eq(flush),
+        ]
+
+        # Records FIFO/Converter.
+        fifo      = stream.SyncFIFO([("data", 32)], fifo_depth)
+        converter = stream.Converter(32, 8)
+        self.submodules += fifo, converter
+        self.comb += [
+            fifo.sink.valid.eq(self.enable.storage & push),
+            fifo.sink.data.eq(record),
+            fifo.sink.last.eq(last),
+            fifo.source.connect(converter.sink),
+        ]
+        self.sync += [
+            If(~self.enable.storage,
+                self.overflow.status.eq(0)
+            ).Elif(fifo.sink.valid & ~fifo.sink.ready,
+                self.overflow.status.eq(1)
+            )
+        ]
+
+        # Output (Bypass/Encoded, samples held during the flush cycle).
+        self.comb += [
+            If(self.enable.storage,
+                sink.ready.eq(~flush),
+                converter.source.connect(source, omit={"valid_token_count"}),
+            ).Else(
+                sink.connect(source)
+            )
+        ]
+
+class _SDBusDecoder(Module):
+    """Decodes the sampled SD bus lines (on SDCard Clk rising edges) for the protocol triggers:
+    Cmd frames (index/argument), CRC status tokens after written Data blocks and busy periods (after
+    written Data blocks and R1b responses)."""
+    def __init__(self, data, clk, cmd, dat0, block_clocks):
+        self.cmd_done     = cmd_done     = Signal()
+        self.cmd_index    = cmd_index    = Signal(6)
+        self.cmd_argument = cmd_argument = Signal(32)
+        self.token_done   = token_done   = Signal()
+        self.token_status = token_status = Signal(3)
+        self.busy         = busy         = Signal()
+        self.busy_cycles  = busy_cycles  = Signal(32)
+
+        # # #
+
+        # Clk rising edges.
+        clk_d  = Signal()
+        rise   = Signal()
+        cmd_i  = Signal()
+        dat0_i = Signal()
+        self.sync += clk_d.eq(data[clk])
+        self.comb += [
+            rise.eq(data[clk] & ~clk_d),
+            cmd_i.eq(data[cmd]),
+            dat0_i.eq(data[dat0]),
+        ]
+
+        # Cmd line deserializer (synchronized after 8 Clk cycles idle, R2 responses are 136-bit).
+        synced    = Signal()
+        ones      = Signal(4)
+        receiving = Signal()
+        count     = Signal(8)
+        length    = Signal(8)
+        shift     = Signal(48)
+        command   = Signal()
+        expect_r2 = Signal()
+        resp_done = Signal()
+        self.comb += [
+            cmd_index.eq(shift[40:46]),
+            cmd_argument.eq(shift[8:40]),
+        ]
+        self.sync += [
+            cmd_done.eq(0),
+            resp_done.eq(0),
+            If(rise,
+                If(~receiving,
+                    If(cmd_i,
+                        If(ones != 8, ones.eq(ones + 1)).Else(synced.eq(1))
+                    ).Else(
+                        ones.eq(0),
+                        If(synced,
+                            receiving.eq(1),
+                            count.eq(1),
+                            length.eq(48),
+                        )
+                    )
+                ).Else(
+                    count.eq(count + 1),
+                    If(count == 1,
+                        command.eq(cmd_i),
+                        If(~cmd_i & expect_r2, length.eq(136))
+                    ),
+                    If(count == (length - 1),
+                        receiving.eq(0),
+                        cmd_done.eq(command),
+                        resp_done.eq(~command),
+                    )
+                ),
+                If(~receiving | (count < 48),
+                    shift.eq(Cat(cmd_i, shift[:-1]))
+                )
+            ),
+            If(cmd_done,
+                expect_r2.eq((cmd_index == 2) | (cmd_index == 9) | (cmd_index == 10))
+            )
+        ]
+
+        # Data line FSM.
+        multiple   = Signal()
+        pending    = Signal()
+        clocks     = Signal(16)
+        busy_start = Signal()
+        write      = Signal()
+        r1b        = Signal()
+        self.comb += [
+            write.eq((cmd_index == 24) | (cmd_index == 25)),
+            r1b.eq((cmd_index == 7) | (cmd_index == 12) | (cmd_index == 28) | (cmd_index == 29) | (cmd_index == 38)),
+        ]
+        self.sync += [
+            If(cmd_done,
+                pending.eq(r1b)
+            ).Elif(resp_done,
+                pending.eq(0)
+            )
+        ]
+        on_cmd = If(cmd_done,
+            NextValue(multiple, cmd_index == 25),
+            If(write,
+                NextState("START")
+            ).Else(
+                NextState("IDLE")
+            )
+        )
+        self.submodules.fsm = fsm = FSM(reset_state="IDLE")
+        fsm.act("IDLE",
+            If(resp_done & pending,
+                NextValue(busy_cycles, 0),
+                NextValue(busy_start, 0),
+                NextValue(clocks, 0),
+                NextState("BUSY")
+            ),
+            on_cmd
+        )
+        fsm.act("START",
+            If(rise & ~dat0_i,
+                NextValue(clocks, 1),
+                NextState("BLOCK")
+            ),
+            on_cmd
+        )
+        fsm.act("BLOCK",
+            If(rise,
+                NextValue(clocks, clocks + 1),
+                If(clocks == (block_clocks - 1),
+                    NextValue(clocks, 0),
+                    NextState("TOKEN-START")
+                )
+            ),
+            on_cmd
+        )
+        fsm.act("TOKEN-START",
+            If(rise,
+                NextValue(clocks, clocks + 1),
+                If(~dat0_i,
+                    NextValue(clocks, 0),
+                    NextState("TOKEN")
+                ).Elif(clocks == 8,
+                    NextState("IDLE")
+                )
+            ),
+            on_cmd
+        )
+        fsm.act("TOKEN",
+            If(rise,
+                NextValue(clocks, clocks + 1),
+                NextValue(token_status, Cat(dat0_i, token_status[:-1])),
+                If(clocks == 2,
+                    NextState("TOKEN-END")
+                )
+            ),
+            on_cmd
+        )
+        fsm.act("TOKEN-END",
+            If(rise,
+                token_done.eq(1),
+                NextValue(busy_cycles, 0),
+                NextValue(busy_start, 0),
+                NextValue(clocks, 0),
+                NextState("BUSY")
+            ),
+            on_cmd
+        )
+        fsm.act("BUSY",
+            busy.eq(~dat0_i),
+            If(~dat0_i,
+                NextValue(busy_start, 1),
+                NextValue(busy_cycles, busy_cycles + 1)
+            ),
+            If(rise & dat0_i,
+                NextValue(clocks, clocks + 1),
+                If(busy_start | (clocks == 8),
+                    If(multiple,
+                        NextState("START")
+                    ).Else(
+                        NextState("IDLE")
+                    )
+                )
+            ),
+            on_cmd
+        )
+
+class SamplerTrigger(Module, AutoCSR):
+    """Sampler Protocol Trigger
+
+    Triggers on SD bus events decoded from the sampled Clk/Cmd/DAT0 lines (bit positions in the
+    samples), instead of the raw pins match:
+    - mode 1: Cmd with index == cmd_index and (argument & cmd_argument_mask) == cmd_argument.
+    - mode 2: CRC status token != accepted (0b010) after a written Data block (of block_clocks).
+    - mode 3: Busy (after written Data blocks and R1b responses) longer than busy_cycles.
+    The trigger fires on the count-th occurrence of the event (ex the 1000th CMD25). Mode 0 disables
+    the protocol trigger (raw pins match).
+    """
+    def __init__(self, data, clk=0, cmd=1, dat0=2):
+        self.arm                = Signal() # Trigger armed (events counted/decoded when armed).
+        self.hit                = Signal() # Trigger hit.
+        self.mode               = CSRStorage(2)
+        self.count              = CSRStorage(32, reset=1)
+        self.cmd_index          = CSRStorage(6)
+        self.cmd_argument       = CSRStorage(32)
+        self.cmd_argument_mask  = CSRStorage(32)
+        self.block_clocks       = CSRStorage(16, reset=1 + 512*8//4 + 16 + 1)
+        self.busy_cycles        = CSRStorage(32)
+
+        # # #
+
+        # SD Bus decoder (reset when not armed).
+        decoder = _SDBusDecoder(data, clk, cmd, dat0, self.block_clocks.storage)
+        decoder = ResetInserter()(decoder)
+        self.submodules.decoder = decoder
+        self.comb += decoder.reset.eq(~self.arm)
+
+        # Events.
+        event = Signal()
+        self.comb += Case(self.mode.storage, {
+            1 : event.eq(decoder.cmd_done &
+                (decoder.cmd_index == self.cmd_index.storage) &
+                ((decoder.cmd_argument & self.cmd_argument_mask.storage) ==
+                 (self.cmd_argument.storage & self.cmd_argument_mask.storage))),
+            2 : event.eq(decoder.token_done & (decoder.token_status != 0b010)),
+            3 : event.eq(decoder.busy & (decoder.busy_cycles == self.busy_cycles.storage)),
+            "default" : event.eq(0),
+        })
+
+        # Occurrences.
+        occurrences = Signal(32)
+        self.sync += [
+            If(~self.arm,
+                occurrences.eq(0)
+            ).Elif(event,
+                occurrences.eq(occurrences + 1)
+            )
+        ]
+        self.comb += self.hit.eq(self.arm & event & (occurrences >= (self.count.storage - 1)))
+
 class Sampler(Module, AutoCSR):
-    def __init__(self, pads):
+    def __init__(self, pads, with_rle=False, with_trigger=False, pre_trigger_depth=0,
+        clk_bit=0, cmd_bit=1, dat_bit=2):
         self.enable        = CSRStorage()
-        self.pattern       = CSRStorage()
+        self.pattern       = CSRStorage(description="Capture the counter pattern (instead of the pads).")
         self.state         = CSRStatus(fields=[
             CSRField("idle",    offset=0),
             CSRField("trigger", offset=1),
@@ -31,7 +344,7 @@ class Sampler(Module, AutoCSR):
         self.trig_mask           = CSRStorage(8)
         self.sample_count        = CSRStorage(32)
         self.sample_downsampling = CSRStorage(16, reset=1)
-        self.source              = stream.Endpoint([("data", 8)])
+        self.source              = source = stream.Endpoint([("data", 8)])
 
         # # #
 
@@ -47,12 +360,48 @@ class Sampler(Module, AutoCSR):
         data = Signal(8)
         self.sync += [
             If(self.pattern.storage,
-                data.eq(data_pads)
-            ).Else(
                 data.eq(data_pattern)
+            ).Else(
+                data.eq(data_pads)
             )
         ]
 
+        # Pre-Trigger buffer (Optional, samples delayed by pre_trigger + 1 sys-clk cycles).
+        sample = Signal(8)
+        if pre_trigger_depth:
+            assert (pre_trigger_depth & (pre_trigger_depth - 1)) == 0
+            self.pre_trigger = CSRStorage(bits_for(pre_trigger_depth - 1))
+            data_d = Signal(8)
+            ptr    = Signal(max=pre_trigger_depth)
+            mem    = Memory(8, pre_trigger_depth)
+            wrport = mem.get_port(write_capable=True)
+            rdport = mem.get_port()
+            self.specials += mem, wrport, rdport
+            self.sync += [
+                ptr.eq(ptr + 1),
+                data_d.eq(data),
+            ]
+            self.comb += [
+                wrport.we.eq(1),
+                wrport.adr.eq(ptr),
+                wrport.dat_w.eq(data),
+                rdport.adr.eq(ptr - self.pre_trigger.storage),
+                If(self.pre_trigger.storage == 0,
+                    sample.eq(data_d)
+                ).Else(
+                    sample.eq(rdport.dat_r)
+                )
+            ]
+        else:
+            self.comb += sample.eq(data)
+
+        # Protocol Trigger (Optional).
+        trigger = Signal()
+        self.comb += trigger.eq((data & self.trig_mask.storage) == (self.trig_value.storage & self.trig_mask.storage))
+        if with_trigger:
+            self.submodules.trigger = SamplerTrigger(data, clk=clk_bit, cmd=cmd_bit, dat0=dat_bit)
+            self.comb += If(self.trigger.mode.storage != 0, trigger.eq(self.trigger.hit))
+
         # Main FSM.
         count        = Signal(32)
         downsampling = Signal(16)
@@ -68,7 +417,7 @@ class Sampler(Module, AutoCSR):
         )
         fsm.act("TRIGGER",
             self.state.fields.trigger.eq(1),
-            If((data & self.trig_mask.storage) == (self.trig_value.storage & self.trig_mask.storage),
+            If(trigger,
                 NextState("CAPTURE")
             )
         )
@@ -80,7 +429,8 @@ class Sampler(Module, AutoCSR):
             ).Else(
                 NextValue(downsampling, downsampling + 1)
             ),
-            self.source.data.eq(data),
+            self.source.data.eq(sample),
+            self.source.last.eq(count == (self.sample_count.storage - 1)),
             If(self.source.valid & self.source.ready,
                 NextValue(count, count + 1),
                 If(count == (self.sample_count.storage - 1),
@@ -89,16 +439,50 @@ class Sampler(Module, AutoCSR):
             )
         )
 
+        if with_trigger:
+            self.comb += self.trigger.arm.eq(fsm.ongoing("TRIGGER"))
+
+        # Run-Length Encoder (Optional).
+        if with_rle:
+            self.submodules.rle = SamplerRLE()
+            self.source = stream.Endpoint([("data", 8)])
+            self.comb += [
+                source.connect(self.rle.sink),
+                self.rle.source.connect(self.source),
+            ]
+
 # Software -----------------------------------------------------------------------------------------
 
 if __name__ == '__main__':
     from litex import RemoteClient
+
+    from litesdcard.host.capture import UDPCapture, pattern_gaps, rle_decode
+    from litesdcard.host.timeline import decode_timeline, format_event
+
     parser = argparse.ArgumentParser()
     parser.add_argument("--value",        default="0",         help="Trigger Value.")
     parser.add_argument("--mask",         default="0",         help="Trigger Mask.")
     parser.add_argument("--count",        default="1e3",       help="Sample Count.")
     parser.add_argument("--downsampling", default="1",         help="Sample Downsampling.")
-    parser.add_argument("--pattern",      action="store_true", help="Enable Pattern.")
+    parser.add_argument("--pattern",      action="store_true", help="Enable Pattern (and check capture for gaps).")
+    parser.add_argument("--rle",          action="store_true", help="Enable Run-Length Encoding (and decode capture).")
+    parser.add_argument("--trigger",      default="pins",      choices=["pins", "cmd", "crc-error", "busy"], help="Trigger mode.")
+    parser.add_argument("--trigger-count",     default="1",    help="Trigger on the N-th occurrence of the event.")
+    parser.add_argument("--cmd-index",         default="0",    help="Cmd trigger: Cmd index.")
+    parser.add_argument("--cmd-argument",      default="0",    help="Cmd trigger: Cmd argument.")
+    parser.add_argument("--cmd-argument-mask", default="0",    help="Cmd trigger: Cmd argument mask.")
+    parser.add_argument("--busy-us",      default=100.0, type=float, help="Busy trigger: Busy duration threshold (in us).")
+    parser.add_argument("--block-length", default=512, type=int, help="CRC/Busy triggers: Write block length (in bytes).")
+    parser.add_argument("--data-width",   default=4,   type=int, choices=[1, 4, 8], help="CRC/Busy triggers: Data width.")
+    parser.add_argument("--pre-trigger",  default="0",         help="Pre-Trigger samples (in sys-clk cycles).")
+    parser.add_argument("--ip",           default="192.168.1.100", help="Host IP address.")
+    parser.add_argument("--port",         default=2000, type=int,  help="Host UDP port.")
+    parser.add_argument("--output",       default="data.bin",  help="Capture file.")
+    parser.add_argument("--decode",       action="store_true", help="Decode capture to SD bus timeline.")
+    parser.add_argument("--clk-bit",      default=0, type=int, help="SDCard Clk bit in samples.")
+    parser.add_argument("--cmd-bit",      default=1, type=int, help="SDCard Cmd bit in samples.")
+    parser.add_argument("--dat-bit",      default=2, type=int, help="SDCard DAT0 bit in samples (DAT0-3 on consecutive bits).")
+    parser.add_argument("--sys-clk-freq", default=100e6, type=float, help="Sys Clk frequency (for timeline).")
     args = parser.parse_args()
 
     wb = RemoteClient()
@@ -116,10 +500,35 @@ if __name__ == '__main__':
         def set_pattern(self, enable):
             wb.regs.sampler_pattern.write(enable)
 
-        def run(self, trig_value=0, trig_mask=0, sample_count=int(1e6), sample_downsampling=1):
+        def set_trigger(self, mode="pins", count=1, cmd_index=0, cmd_argument=0, cmd_argument_mask=0,
+            busy_cycles=0, block_length=512, data_width=4, pre_trigger=0):
+            modes = {"pins": 0, "cmd": 1, "crc-error": 2, "busy": 3}
+            if hasattr(wb.regs, "sampler_trigger_mode"):
+                wb.regs.sampler_trigger_count.write(count)
+                wb.regs.sampler_trigger_cmd_index.write(cmd_index)
+                wb.regs.sampler_trigger_cmd_argument.write(cmd_argument)
+                wb.regs.sampler_trigger_cmd_argument_mask.write(cmd_argument_mask)
+                wb.regs.sampler_trigger_block_clocks.write(1 + block_length*8//data_width + 16 + 1)
+                wb.regs.sampler_trigger_busy_cycles.write(busy_cycles)
+                wb.regs.sampler_trigger_mode.write(modes[mode])
+            else:
+                assert mode == "pins", "Protocol triggers not available."
+            if hasattr(wb.regs, "sampler_pre_trigger"):
+                wb.regs.sampler_pre_trigger.write(pre_trigger)
+            else:
+                assert pre_trigger == 0, "Pre-Trigger not available."
+
+        def run(self, trig_value=0, trig_mask=0, sample_count=int(1e6), sample_downsampling=1, filename=None, rle=False):
             # Disable Sampler
             wb.regs.sampler_enable.write(0)
 
+            # Configure Run-Length Encoding.
+            if rle:
+                wb.regs.sampler_rle_enable.write(0)
+                wb.regs.sampler_rle_enable.write(1)
+            elif hasattr(wb.regs, "sampler_rle_enable"):
+                wb.regs.sampler_rle_enable.write(0)
+
             # Configure trigger
             wb.regs.sampler_trig_value.write(trig_value)
             wb.regs.sampler_trig_mask.write(trig_mask)
@@ -128,33 +537,62 @@ if __name__ == '__main__':
             wb.regs.sampler_sample_count.write(sample_count)
             wb.regs.sampler_sample_downsampling.write(sample_downsampling)
 
-            # Enable Sampler
+            # Capture (open socket before enabling Sampler to not miss the first packets).
+            capture = UDPCapture(ip=args.ip, port=args.port)
+            capture.open()
             wb.regs.sampler_enable.write(1)
-
-            # Capture
-            data_count = 0
-            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            sock.bind(("192.168.1.100", 2000))
-            f = open("data.bin", "wb")
-            while data_count < sample_count:
-                print(data_count)
-                data, addr = sock.recvfrom(1024)
-
-                f.write(data)
-                data_count += len(data)
+            samples, stats = capture.capture(sample_count, filename=filename, rle=rle)
+            capture.close()
 
             # Disable Sampler
             wb.regs.sampler_enable.write(0)
 
+            # Decode Run-Length Encoding.
+            if rle:
+                overflow = wb.regs.sampler_rle_overflow.read()
+                print("Captured {samples} bytes in {packets} packets ({rate:.0f} bytes/s){}.".format(
+                    " [OVERFLOW]" if overflow else "", **stats))
+                samples = rle_decode(samples, expand=True)[:sample_count]
+                stats["complete"] = (len(samples) == sample_count)
+                stats["samples"]  = len(samples)
+
+            print("Captured {samples} samples in {packets} packets ({rate:.0f} samples/s){}.".format(
+                "" if stats["complete"] else " [INCOMPLETE]", **stats))
+            return samples
+
     sampler = Sampler()
     sampler.set_pattern(int(args.pattern))
-    sampler.run(
+    sampler.set_trigger(
+        mode              = args.trigger,
+        count             = num(args.trigger_count),
+        cmd_index         = num(args.cmd_index),
+        cmd_argument      = num(args.cmd_argument),
+        cmd_argument_mask = num(args.cmd_argument_mask),
+        busy_cycles       = int(args.busy_us*1e-6*args.sys_clk_freq),
+        block_length      = args.block_length,
+        data_width        = args.data_width,
+        pre_trigger       = num(args.pre_trigger),
+    )
+    downsampling = num(args.downsampling)
+    samples = sampler.run(
         trig_value          = num(args.value),
         trig_mask           = num(args.mask),
         sample_count        = num(args.count),
-        sample_downsampling = num(args.downsampling)
+        sample_downsampling = downsampling,
+        filename            = args.output,
+        rle                 = args.rle,
     )
 
+    # Check Pattern.
+    if args.pattern:
+        gaps = pattern_gaps(samples, downsampling)
+        print("{} sequence gap(s){}".format(len(gaps), ": " + str(gaps[:16].tolist()) if len(gaps) else "."))
+
+    # Decode Timeline.
+    if args.decode:
+        for event in decode_timeline(samples, clk=args.clk_bit, cmd=args.cmd_bit, dat=args.dat_bit):
+            print(format_event(event, sample_period=downsampling/args.sys_clk_freq))
+
     # # #
 
     wb.close()
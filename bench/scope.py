@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+
+#
+# This file is part of LiteSDCard.
+#
+# Copyright (c) 2026 Florent Kermarrec <florent@enjoy-digital.fr>
+# SPDX-License-Identifier: BSD-2-Clause
+
+"""
+LiteSDCard LiteScope capture
+
+Captures the SDScope probes (see litesdcard.scope.add_sdcard_analyzer, bench --with-analyzer) with
+a named trigger and decodes the capture into transactions.
+
+Ex: ./scope.py --trigger cmd --cmd-index 25
+    ./scope.py --trigger clk-stop --clk-stop-threshold 10000
+"""
+
+import argparse
+
+from litex import RemoteClient
+
+from litescope import LiteScopeAnalyzerDriver
+
+from litesdcard.host.scope import *
+
+# Run ----------------------------------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="LiteSDCard LiteScope capture.")
+    parser.add_argument("--trigger",      default="cmd", choices=["now"] + list(TRIGGERS.keys()), help="Trigger.")
+    parser.add_argument("--cmd-index",    default=None,  type=int,   help="Cmd trigger: Cmd index (any if not specified).")
+    parser.add_argument("--clk-stop-threshold", default=None, type=int, help="Clk stop trigger: threshold (in sys-clk cycles).")
+    parser.add_argument("--name",         default="sdcard",          help="SDCard name (CSRs prefix).")
+    parser.add_argument("--offset",       default=128,   type=int,   help="Capture offset (pre-trigger samples).")
+    parser.add_argument("--length",       default=None,  type=int,   help="Capture length.")
+    parser.add_argument("--csv",          default="analyzer.csv",    help="Analyzer CSV.")
+    parser.add_argument("--vcd",          default="dump.vcd",        help="Save capture to VCD.")
+    parser.add_argument("--sys-clk-freq", default=None,  type=float, help="Sys Clk frequency (for durations).")
+    args = parser.parse_args()
+
+    wb = RemoteClient()
+    wb.open()
+
+    # # #
+
+    # Configure Clk stop threshold.
+    if args.clk_stop_threshold is not None:
+        getattr(wb.regs, f"{args.name}_scope_clk_stop_threshold").write(args.clk_stop_threshold)
+
+    # Configure Analyzer/Trigger.
+    layout   = read_layout(args.csv)
+    analyzer = LiteScopeAnalyzerDriver(wb.regs, "analyzer", config_csv=args.csv, debug=True)
+    analyzer.configure_group(0)
+    if args.trigger == "now":
+        analyzer.add_trigger(value=0, mask=0)
+    else:
+        value, mask = trigger_value_mask(layout, args.trigger, cmd_index=args.cmd_index)
+        analyzer.add_trigger(value=value, mask=mask)
+
+    # Capture.
+    analyzer.run(offset=args.offset, length=args.length)
+    analyzer.wait_done()
+    analyzer.upload()
+    analyzer.save(args.vcd)
+    samples = analyzer.data
+
+    # Decode.
+    for transaction in decode_transactions(decode_fields(samples, layout)):
+        print(format_transaction(transaction, sys_clk_freq=args.sys_clk_freq))
+
+    # # #
+
+    wb.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+
+#
+# This file is part of LiteSDCard.
+#
+# Copyright (c) 2026 Florent Kermarrec <florent@enjoy-digital.fr>
+# SPDX-License-Identifier: BSD-2-Clause
+
+"""
+LiteSDCard simulated throughput bench
+
+Runs SDPHY + SDCore against the behavioral SDCardModel over a sweep of Clk divider, Data width,
+block length and block count, for reads and/or writes, and reports bytes per cycle, projected MB/s
+at --sys-clk-freq, latency, inter-block gaps and Clk stopped cycles. Results can be saved to CSV
+and/or JSON to track regressions. With --model, results are estimated with the analytical model
+(litesdcard.host.throughput) instead of simulated.
+
+Ex: ./throughput.py --divider 0 2 --data-width 1 4 8 --block-count 4 --csv results.csv
+"""
+
+import csv
+import json
+import time
+import argparse
+import itertools
+
+from litesdcard.emulator.perf import measure
+from litesdcard.host.throughput import estimate
+
+# Results ------------------------------------------------------------------------------------------
+
+_columns = [
+    "direction",
+    "divider",
+    "data_width",
+    "block_length",
+    "block_count",
+    "cycles",
+    "bytes_per_cycle",
+    "mbps",
+    "latency",
+    "max_gap",
+    "stopped",
+]
+
+def print_result(result):
+    print("{direction:5s} div={divider:3d} width={data_width} len={block_length:3d} count={block_count:3d}: "
+        "{cycles:8d} cycles, {bytes_per_cycle:.4f} B/cycle, {mbps:7.2f} MB/s, latency={latency}, "
+        "max_gap={max_gap}, stopped={stopped}".format(**{"max_gap": "-", "stopped": "-", **result}))
+
+def write_csv(filename, results):
+    with open(filename, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=_columns, extrasaction="ignore")
+        writer.writeheader()
+        for result in results:
+            writer.writerow(result)
+
+def write_json(filename, results):
+    with open(filename, "w") as f:
+        json.dump(results, f, indent=4)
+
+# Run ----------------------------------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="LiteSDCard simulated throughput bench.")
+    parser.add_argument("--direction",    default=["read", "write"], nargs="+", choices=["read", "write"], help="Transfer direction(s).")
+    parser.add_argument("--divider",      default=[0],   nargs="+", type=int,   help="SDCard Clk divider(s).")
+    parser.add_argument("--data-width",   default=[4],   nargs="+", type=int,   choices=[1, 4, 8], help="Data width(s).")
+    parser.add_argument("--block-length", default=[512], nargs="+", type=int,   help="Block length(s) (in bytes, <= 512).")
+    parser.add_argument("--block-count",  default=[4],   nargs="+", type=int,   help="Block count(s).")
+    parser.add_argument("--sys-clk-freq", default=100e6,            type=float, help="Sys Clk frequency used for MB/s projection.")
+    parser.add_argument("--access-latency",  default=8,  type=int, help="Card access latency (in SDCard Clk cycles).")
+    parser.add_argument("--program-latency", default=16, type=int, help="Card program latency (in SDCard Clk cycles).")
+    parser.add_argument("--model",        action="store_true", help="Use analytical model instead of simulation.")
+    parser.add_argument("--csv",          default=None, help="Save results to CSV file.")
+    parser.add_argument("--json",         default=None, help="Save results to JSON file.")
+    args = parser.parse_args()
+
+    results = []
+    for direction, divider, data_width, block_length, block_count in itertools.product(
+        args.direction, args.divider, args.data_width, args.block_length, args.block_count):
+        start  = time.time()
+        result = (estimate if args.model else measure)(
+            direction       = direction,
+            divider         = divider,
+            data_width      = data_width,
+            block_length    = block_length,
+            block_count     = block_count,
+            sys_clk_freq    = args.sys_clk_freq,
+            access_latency  = args.access_latency,
+            program_latency = args.program_latency,
+        )
+        result["sim_time"] = time.time() - start
+        print_result(result)
+        results.append(result)
+
+    if args.csv is not None:
+        write_csv(args.csv, results)
+    if args.json is not None:
+        write_json(args.json, results)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+
+#
+# This file is part of LiteSDCard.
+#
+# Copyright (c) 2026 Florent Kermarrec <florent@enjoy-digital.fr>
+# SPDX-License-Identifier: BSD-2-Clause
+
+"""
+LiteSDCard benchmark/qualification
+
+Connects to a target (through litex_server) or to a local stand-in (--sim), initializes the card,
+runs the BIST (write/read/check, with the gateware BIST when the target has it, from the host
+otherwise) and read/write throughput sweeps over Clk divider and Data width:
+- Sequential: MB/s of Multiple blocks reads/writes.
+- Random: IOPS and latency percentiles of Single block reads/writes.
+
+Results are printed and can be saved as JSON (--json) for trending. Exits with an error code when
+the BIST fails, so it can be used to qualify card batches on production boards.
+
+Ex: litesdcard_bench --csr-csv csr.csv --divider 0 1 3 --data-width 1 4 --json card.json
+
+Warning: The blocks from --start-block are overwritten (use --read-only to skip writes).
+"""
+
+import sys
+import json
+import time
+import random
+import argparse
+import datetime
+
+# Helpers ------------------------------------------------------------------------------------------
+
+def percentiles(latencies):
+    import numpy as np
+    latencies = np.asarray(latencies)*1e6
+    return {
+        "p50" : float(np.percentile(latencies, 50)),
+        "p90" : float(np.percentile(latencies, 90)),
+        "p99" : float(np.percentile(latencies, 99)),
+        "max" : float(latencies.max()),
+    }
+
+def sequential(sdcard, direction, block, count, loops):
+    """Sequential Multiple blocks transfers, returns MB/s."""
+    data  = bytes(512*count)
+    start = time.time()
+    for loop in range(loops):
+        if direction == "read":
+            sdcard.read(block, count)
+        else:
+            sdcard.write(block, data)
+    duration = time.time() - start
+    return 512*count*loops/duration/1e6
+
+def random_access(sdcard, direction, block, span, ios, seed=0):
+    """Random Single block transfers, returns IOPS and latency percentiles (us)."""
+    prng      = random.Random(seed)
+    data      = bytes(512)
+    latencies = []
+    for io in range(ios):
+        start = time.time()
+        if direction == "read":
+            sdcard.read(block + prng.randrange(span))
+        else:
+            sdcard.write(block + prng.randrange(span), data)
+        latencies.append(time.time() - start)
+    return {"iops": ios/sum(latencies), "latency_us": percentiles(latencies)}
+
+def print_result(result):
+    print("{direction:5s} div={divider:3d} width={data_width}: {mbps:8.3f} MB/s, {iops:8.1f} IOPS, "
+        "latency p50={p50:.1f}us p90={p90:.1f}us p99={p99:.1f}us max={max:.1f}us".format(
+        **result, **result["latency_us"]))
+
+# Run ----------------------------------------------------------------------------------------------
+
+def run(sdcard, dividers=[0], data_widths=[4], start_block=0x10000, count=64, loops=4, ios=100,
+    span       = 1024,
+    bist_count = 64,
+    bist_loops = 4,
+    read_only  = False):
+    """Run the BIST and the throughput sweeps on an initialized card, returns results (dict)."""
+    results = {"bist": None, "sweep": []}
+
+    # BIST (Gateware when available, Host otherwise).
+    if not read_only:
+        if sdcard.has_bist:
+            results["bist"] = sdcard.bist_gateware(block=start_block, count=bist_count, loops=bist_loops)
+        else:
+            results["bist"] = sdcard.bist(block=start_block, count=bist_count, loops=bist_loops)
+        results["bist"]["gateware"] = sdcard.has_bist
+
+    # Sweep.
+    directions = ["read"] if read_only else ["read", "write"]
+    for data_width in data_widths:
+        sdcard.set_bus_width(data_width)
+        for divider in dividers:
+            sdcard.set_divider(divider)
+            for direction in directions:
+                result = {
+                    "direction"  : direction,
+                    "divider"    : divider,
+                    "data_width" : data_width,
+                    "mbps"       : sequential(sdcard, direction, start_block, count, loops),
+                }
+                result.update(random_access(sdcard, direction, start_block, span, ios))
+                print_result(result)
+                results["sweep"].append(result)
+    return results
+
+# Main ---------------------------------------------------------------------------------------------
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="LiteSDCard benchmark/qualification.")
+    parser.add_argument("--host",        default="localhost", help="litex_server host.")
+    parser.add_argument("--port",        default=1234, type=int, help="litex_server port.")
+    parser.add_argument("--csr-csv",     default="csr.csv",   help="SoC CSR CSV.")
+    parser.add_argument("--name",        default="sdcard",    help="SDCard name in the SoC.")
+    parser.add_argument("--sim",         action="store_true", help="Use a local stand-in (SDCardModel) instead of a target.")
+    parser.add_argument("--sim-size",    default=64,   type=int, help="Stand-in card size (in MB).")
+    parser.add_argument("--sim-bist",    action="store_true", help="Add the gateware BIST to the stand-in.")
+    parser.add_argument("--divider",     default=[0],  type=int, nargs="+", help="Clk dividers to sweep.")
+    parser.add_argument("--data-width",  default=[4],  type=int, nargs="+", choices=[1, 4], help="Data widths to sweep.")
+    parser.add_argument("--start-block", default=0x10000, type=lambda x: int(x, 0), help="First block of the test area.")
+    parser.add_argument("--count",       default=64,   type=int, help="Blocks per sequential transfer.")
+    parser.add_argument("--loops",       default=4,    type=int, help="Sequential transfers per point.")
+    parser.add_argument("--ios",         default=100,  type=int, help="Random Single block transfers per point.")
+    parser.add_argument("--span",        default=1024, type=int, help="Random transfers span (in blocks).")
+    parser.add_argument("--bist-count",  default=64,   type=int, help="BIST blocks.")
+    parser.add_argument("--bist-loops",  default=4,    type=int, help="BIST loops.")
+    parser.add_argument("--read-only",   action="store_true", help="Skip BIST/writes.")
+    parser.add_argument("--json",        default=None,        help="Save results to JSON file.")
+    args = parser.parse_args(argv)
+
+    from litesdcard.host.driver import BatchRemoteClient, SDCardDriver
+
+    # Connect.
+    server = None
+    if args.sim:
+        import os
+        import tempfile
+        from litesdcard.host.standin import SoCStandIn, EtherboneServer
+        soc    = SoCStandIn(bytearray(args.sim_size*1024*1024), with_bist=args.sim_bist)
+        server = EtherboneServer(soc)
+        server.open()
+        args.host    = "localhost"
+        args.port    = server.port
+        args.csr_csv = os.path.join(tempfile.mkdtemp(), "csr.csv")
+        soc.write_csv(args.csr_csv)
+    bus = BatchRemoteClient(host=args.host, port=args.port, csr_csv=args.csr_csv)
+    bus.open()
+
+    # Run.
+    try:
+        sdcard = SDCardDriver(bus, name=args.name)
+        sdcard.init()
+        print("Card: {:d}MB, CID 0x{:032x}.".format(sdcard.size//(1024*1024), sdcard.cid))
+        results = run(sdcard,
+            dividers    = args.divider,
+            data_widths = args.data_width,
+            start_block = args.start_block,
+            count       = args.count,
+            loops       = args.loops,
+            ios         = args.ios,
+            span        = args.span,
+            bist_count  = args.bist_count,
+            bist_loops  = args.bist_loops,
+            read_only   = args.read_only)
+    finally:
+        bus.close()
+        if server is not None:
+            server.close()
+
+    # Report.
+    bist   = results["bist"]
+    passed = (bist is None) or (bist["errors"] == 0)
+    if bist is not None:
+        print("BIST: {} ({} bytes, {} errors, write {:.3f} MB/s, read {:.3f} MB/s, {}).".format(
+            "PASS" if passed else "FAIL", bist["bytes"], bist["errors"],
+            bist["write_speed"]/1e6, bist["read_speed"]/1e6, "gateware" if bist["gateware"] else "host"))
+    if args.json is not None:
+        results.update({
+            "date"     : datetime.datetime.now().isoformat(timespec="seconds"),
+            "target"   : "sim" if args.sim else f"{args.host}:{args.port}",
+            "card"     : {"size": sdcard.size, "cid": f"{sdcard.cid:032x}", "csd": f"{sdcard.csd:032x}"},
+            "clk_freq" : sdcard.clk_freq,
+            "passed"   : passed,
+        })
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=4)
+    return 0 if passed else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -17,13 +17,153 @@ from litex.soc.interconnect import stream
 from litesdcard.common import *
 from litesdcard.crc import CRC
 
+# Layouts ------------------------------------------------------------------------------------------
+
+def _cmd_layout():
+    return [
+        ("argument",     32),
+        ("cmd",           6),
+        ("cmd_type",      2),
+        ("crc",           1),
+        ("data_type",     2),
+        ("block_length", 10),
+        ("block_count",  32),
+    ]
+
+# SDCore Port --------------------------------------------------------------------------------------
+
+class SDCorePort:
+    """SDCore Cmd Port
+
+    Allows logic to issue Cmd/Data transfers to the SDCore without CPU intervention. The Cmd is
+    presented on cmd and accepted when the core is idle; Data is then received on source (or sent
+    from sink) and done pulses at the end of the transfer, with error reporting its status.
+
+    The port shares the core with the CSRs: software must not send Cmds while the port is in use.
+    """
+    def __init__(self):
+        self.cmd    = stream.Endpoint(_cmd_layout())
+        self.source = stream.Endpoint([("data", 8)])
+        self.sink   = stream.Endpoint([("data", 8)])
+        self.done   = Signal()
+        self.error  = Signal()
+
+# SDCore Block Buffer ------------------------------------------------------------------------------
+
+class _SDBlockBuffer(LiteXModule):
+    """Block Buffer
+
+    FIFO with commit/rollback of the data written since the last commit: only committed Data is
+    presented on source, allowing a failing block to be dropped and read again.
+    """
+    def __init__(self, depth=1024):
+        self.sink     = sink   = stream.Endpoint([("data", 8)])
+        self.source   = source = stream.Endpoint([("data", 8)])
+        self.commit   = Signal()
+        self.rollback = Signal()
+
+        # # #
+
+        wr_ptr      = Signal(log2_int(depth) + 1)
+        wr_ptr_next = Signal(log2_int(depth) + 1)
+        commit_ptr  = Signal(log2_int(depth) + 1)
+        rd_ptr      = Signal(log2_int(depth) + 1)
+        rd_ptr_next = Signal(log2_int(depth) + 1)
+        level       = Signal(log2_int(depth) + 1)
+
+        mem = Memory(8 + 2, depth)
+        wr_port = mem.get_port(write_capable=True)
+        rd_port = mem.get_port()
+        self.specials += mem, wr_port, rd_port
+
+        # Write.
+        self.comb += [
+            level.eq(wr_ptr - rd_ptr),
+            sink.ready.eq(level < depth),
+            wr_port.adr.eq(wr_ptr),
+            wr_port.dat_w.eq(Cat(sink.data, sink.first, sink.last)),
+            wr_port.we.eq(sink.valid & sink.ready),
+            wr_ptr_next.eq(wr_ptr + wr_port.we),
+        ]
+        self.sync += [
+            If(self.rollback,
+                wr_ptr.eq(commit_ptr)
+            ).Else(
+                wr_ptr.eq(wr_ptr_next),
+                If(self.commit, commit_ptr.eq(wr_ptr_next))
+            )
+        ]
+
+        # Read.
+        self.comb += [
+            rd_ptr_next.eq(rd_ptr + (source.valid & source.ready)),
+            rd_port.adr.eq(rd_ptr_next),
+            source.valid.eq(rd_ptr != commit_ptr),
+            Cat(source.data, source.first, source.last).eq(rd_port.dat_r),
+        ]
+        self.sync += rd_ptr.eq(rd_ptr_next)
+
+# SDCore Block Replay Buffer -----------------------------------------------------------------------
+
+class _SDBlockReplayBuffer(LiteXModule):
+    """Block Replay Buffer
+
+    FIFO keeping the Data read since the last commit: on rollback, this Data is presented again on
+    source, allowing a failing block to be written again.
+    """
+    def __init__(self, depth=1024):
+        self.sink     = sink   = stream.Endpoint([("data", 8)])
+        self.source   = source = stream.Endpoint([("data", 8)])
+        self.commit   = Signal()
+        self.rollback = Signal()
+
+        # # #
+
+        wr_ptr      = Signal(log2_int(depth) + 1)
+        commit_ptr  = Signal(log2_int(depth) + 1)
+        rd_ptr      = Signal(log2_int(depth) + 1)
+        rd_ptr_next = Signal(log2_int(depth) + 1)
+        level       = Signal(log2_int(depth) + 1)
+
+        mem = Memory(8 + 2, depth)
+        wr_port = mem.get_port(write_capable=True)
+        rd_port = mem.get_port()
+        self.specials += mem, wr_port, rd_port
+
+        # Write.
+        self.comb += [
+            level.eq(wr_ptr - commit_ptr),
+            sink.ready.eq(level < depth),
+            wr_port.adr.eq(wr_ptr),
+            wr_port.dat_w.eq(Cat(sink.data, sink.first, sink.last)),
+            wr_port.we.eq(sink.valid & sink.ready),
+        ]
+        self.sync += wr_ptr.eq(wr_ptr + wr_port.we)
+
+        # Read.
+        self.comb += [
+            If(self.rollback,
+                rd_ptr_next.eq(commit_ptr)
+            ).Else(
+                rd_ptr_next.eq(rd_ptr + (source.valid & source.ready))
+            ),
+            rd_port.adr.eq(rd_ptr_next),
+            source.valid.eq(rd_ptr != wr_ptr),
+            Cat(source.data, source.first, source.last).eq(rd_port.dat_r),
+        ]
+        self.sync += [
+            rd_ptr.eq(rd_ptr_next),
+            If(self.commit, commit_ptr.eq(rd_ptr_next))
+        ]
+
 # SDCore -------------------------------------------------------------------------------------------
 
 class SDCore(LiteXModule):
-    def __init__(self, phy):
+    def __init__(self, phy, with_retry=False):
         self.sink   = stream.Endpoint([("data", 8)])
         self.source = stream.Endpoint([("data", 8)])
         self.irq = Signal()
+        self.cmd_crc_error = Signal() # Cmd Response CRC Error strobe (for PHY Clk fallback).
 
         # Cmd Registers.
         self.cmd_argument = CSRStorage(32, description="SDCard Cmd Argument.")
@@ -54,22 +194,36 @@ class SDCore(LiteXModule):
         self.block_length = CSRStorage(10, description="Data transfer Block Length (in bytes).")
         self.block_count  = CSRStorage(32, description="Data transfer Block Count.")
 
+        # Retry Registers (optional).
+        if with_retry:
+            self.retry = CSRStorage(fields=[
+                CSRField("max", size=4, offset=0, reset=3, description="Maximum number of retries per Cmd/Data transfer (0: disabled)."),
+                CSRField("addressing", size=1, offset=4, values=[
+                    ("0b0", "Block addressing (SDHC/SDXC)."),
+                    ("0b1", "Byte addressing (SDSC, 512-bytes blocks)."),
+                ], description="SDCard addressing, used to resume multi-block reads."),
+            ])
+            self.cmd_retries  = CSRStatus(32, description="Number of Cmd retries (on Cmd Timeout/CRC Error).")
+            self.data_retries = CSRStatus(32, description="Number of Data retries (on Data Read Timeout/CRC Error, Data Write CRC Error).")
+
         # # #
 
         # Register Mapping -------------------------------------------------------------------------
-        cmd_argument = self.cmd_argument.storage
-        cmd_command  = self.cmd_command.storage
-        cmd_send     = self.cmd_send.wr_stb
         cmd_response = self.cmd_response.status
         cmd_event    = self.cmd_event.status
         data_event   = self.data_event.status
-        block_length = self.block_length.storage
-        block_count  = self.block_count.storage
+
+        # Cmd Requests (from CSRs or Cmd Port, see get_port) ---------------------------------------
+        self._request = request = stream.Endpoint(_cmd_layout())
+        self._source  = source  = stream.Endpoint([("data", 8)])
+        self._sink    = sink    = stream.Endpoint([("data", 8)])
+        self._port    = None
 
         # CRC Inserter/Checkers --------------------------------------------------------------------
         self.crc7_inserter  = crc7_inserter  = CRC(polynom=0x9, taps=7, dw=8)
 
         # Cmd/Data Signals -------------------------------------------------------------------------
+        cmd_argument = Signal(32)
         cmd_type     = Signal(2)
         cmd_crc_en   = Signal()
         cmd_count    = Signal(3)
@@ -79,6 +233,8 @@ class SDCore(LiteXModule):
         cmd_crc      = Signal()
 
         data_type    = Signal(2)
+        block_length = Signal(10)
+        block_count  = Signal(32)
         data_count   = Signal(32)
         data_done    = Signal()
         data_error   = Signal()
@@ -87,13 +243,43 @@ class SDCore(LiteXModule):
 
         cmd          = Signal(6)
 
-        self.comb += [
-            # Decode type of Cmd/Data from Register.
-            cmd_type.eq(self.cmd_command.fields.cmd_type),
-            cmd_crc_en.eq(self.cmd_command.fields.crc),
-            data_type.eq(self.cmd_command.fields.data_type),
-            cmd.eq(self.cmd_command.fields.cmd),
+        # Retry Signals ----------------------------------------------------------------------------
+        retry          = Signal() # Retry allowed for current Cmd/Data transfer.
+        retry_left     = Signal(4)
+        retry_resume   = Signal()
+        orig_cmd       = Signal(6)
+        orig_argument  = Signal(32)
+        orig_cmd_type  = Signal(2)
+        orig_data_type = Signal(2)
+        if with_retry:
+            self.comb += retry.eq(retry_left != 0)
+
+        # Data Read/Write Buffers (only committed blocks are forwarded/released when retries are
+        # enabled) ---------------------------------------------------------------------------------
+        data_sink     = stream.Endpoint([("data", 8)])
+        data_source   = stream.Endpoint([("data", 8)])
+        data_commit   = Signal()
+        data_rollback = Signal()
+        if with_retry:
+            self.buffer        = _SDBlockBuffer(depth=1024)
+            self.replay_buffer = _SDBlockReplayBuffer(depth=1024)
+            self.comb += [
+                data_sink.connect(self.buffer.sink),
+                self.buffer.commit.eq(data_commit),
+                self.buffer.rollback.eq(data_rollback),
+                self.buffer.source.connect(source),
+                sink.connect(self.replay_buffer.sink),
+                self.replay_buffer.commit.eq(data_commit),
+                self.replay_buffer.rollback.eq(data_rollback),
+                self.replay_buffer.source.connect(data_source),
+            ]
+        else:
+            self.comb += [
+                data_sink.connect(source),
+                sink.connect(data_source),
+            ]
 
+        self.comb += [
             # Encode Cmd Event to Register.
             self.cmd_event.fields.done.eq(cmd_done),
             self.cmd_event.fields.error.eq(cmd_error),
@@ -107,15 +293,20 @@ class SDCore(LiteXModule):
             self.data_event.fields.crc.eq(data_crc),
         ]
 
+        # Report Cmd CRC Errors to PHY's Clk fallback (only checked here).
+        if hasattr(phy, "clock_fallback"):
+            self.comb += phy.clock_fallback.cmd_crc_error.eq(self.cmd_crc_error)
+
         # Block delimiter for DATA-WRITE
-        count = Signal(9)
+        count     = Signal(9)
+        sink_last = Signal()
+        self.comb += sink_last.eq(data_source.last | (count == (block_length - 1)))
         self.sync += [
-            If(self.sink.valid & self.sink.ready,
+            If(data_source.valid & data_source.ready,
                 count.eq(count + 1),
-                If(self.sink.last, count.eq(0))
+                If(sink_last, count.eq(0))
             )
         ]
-        self.comb += If(count == (block_length - 1), self.sink.last.eq(1))
 
         # IRQ / Generate IRQ on CMD done rising edge
         done_d     = Signal()
@@ -132,7 +323,22 @@ class SDCore(LiteXModule):
             NextValue(data_count, 0),
             crc7_inserter.reset.eq(1),
             # Wait for a valid Cmd.
-            If(cmd_send,
+            request.ready.eq(1),
+            If(request.valid,
+                # Latch Cmd.
+                NextValue(cmd_argument, request.argument),
+                NextValue(cmd,          request.cmd),
+                NextValue(cmd_type,     request.cmd_type),
+                NextValue(cmd_crc_en,   request.crc),
+                NextValue(data_type,    request.data_type),
+                NextValue(block_length, request.block_length),
+                NextValue(block_count,  request.block_count),
+                NextValue(orig_argument,  request.argument),
+                NextValue(orig_cmd,       request.cmd),
+                NextValue(orig_cmd_type,  request.cmd_type),
+                NextValue(orig_data_type, request.data_type),
+                NextValue(retry_left,     self.retry.fields.max if with_retry else 0),
+                NextValue(retry_resume,   0),
                 # Clear Cmd/Data Done/Error/Timeout.
                 NextValue(cmd_done,     0),
                 NextValue(cmd_error,    0),
@@ -197,30 +403,44 @@ class SDCore(LiteXModule):
             phy.cmdr.source.ready.eq(1),
             crc7_inserter.din.eq(phy.cmdr.source.data),
             If(phy.cmdr.source.valid,
-                # On Timeout: set Cmd Timeout and return to Idle.
+                # On Timeout: Retry or set Cmd Timeout and return to Idle.
                 If(phy.cmdr.source.status == SDCARD_STREAM_STATUS_TIMEOUT,
-                    NextValue(cmd_timeout, 1),
-                    NextState("IDLE")
-                # On last Cmd byte:
-                ).Elif(phy.cmdr.source.last,
-                    # Send/Receive Data for Data Cmds.
-                    If(data_type == SDCARD_CTRL_DATA_TRANSFER_WRITE,
-                        NextState("DATA-WRITE")
-                    ).Elif(data_type == SDCARD_CTRL_DATA_TRANSFER_READ,
-                        NextState("DATA-READ")
-                    # Else return to Idle.
+                    If(retry,
+                        NextState("CMD-RETRY")
                     ).Else(
+                        NextValue(cmd_timeout, 1),
                         NextState("IDLE")
-                    ),
-                    NextValue(cmd_done, 1),
+                    )
+                # On last Cmd byte:
+                ).Elif(phy.cmdr.source.last,
                     If(cmd_type == SDCARD_CTRL_RESPONSE_LONG,
                         # 8-bit shift to expose expected 128-bit window to software.
                         NextValue(cmd_response, Cat(phy.cmdr.source.data, cmd_response)),
                     ),
+                    # If CRC check enabled and CRC bad, Retry or set Cmd Error/CRC and return to Idle.
                     If(cmd_crc_en & (crc7_inserter.crc != phy.cmdr.source.data[1:]),
-                        # If CRC check enabled and CRC bad, set Cmd Error/CRC and return to Idle
-                        NextValue(cmd_crc, 1),
-                        NextState("IDLE"),
+                        self.cmd_crc_error.eq(1),
+                        If(retry,
+                            NextState("CMD-RETRY")
+                        ).Else(
+                            NextValue(cmd_done, 1),
+                            NextValue(cmd_crc, 1),
+                            NextState("IDLE"),
+                        )
+                    # Resume Data transfer after Stop Cmd on Data Retry.
+                    ).Elif(retry_resume,
+                        NextState("DATA-RESUME")
+                    ).Else(
+                        NextValue(cmd_done, 1),
+                        # Send/Receive Data for Data Cmds.
+                        If(data_type == SDCARD_CTRL_DATA_TRANSFER_WRITE,
+                            NextState("DATA-WRITE")
+                        ).Elif(data_type == SDCARD_CTRL_DATA_TRANSFER_READ,
+                            NextState("DATA-READ")
+                        # Else return to Idle.
+                        ).Else(
+                            NextState("IDLE")
+                        )
                     ),
                 # Else Shift Cmd Response.
                 ).Else(
@@ -233,26 +453,43 @@ class SDCore(LiteXModule):
                 )
             )
         )
+        write_retry     = Signal() # CRC Error on current block, retried at the end of the block.
+        write_retry_now = Signal()
         fsm.act("DATA-WRITE",
             # Send Data to the PHY.
-            self.sink.connect(phy.dataw.sink),
-            phy.dataw.sink.last_block.eq(data_count == (block_count - 1)),
+            data_source.connect(phy.dataw.sink, omit={"last"}),
+            phy.dataw.sink.last.eq(sink_last),
+            # End PHY Data transfer on last block (or failing block to retry).
+            phy.dataw.sink.last_block.eq((data_count == (block_count - 1)) | write_retry | write_retry_now),
             # On last PHY Data cycle:
             If(phy.dataw.sink.valid & phy.dataw.sink.ready & phy.dataw.sink.last,
-                # Incremennt Data Count.
-                NextValue(data_count, data_count + 1),
-                # Transfer is done when Data Count reaches Block Count.
-                If(phy.dataw.sink.last_block,
-                    NextState("IDLE")
+                # On CRC Error: Write block again.
+                If(write_retry,
+                    data_rollback.eq(1),
+                    NextValue(write_retry, 0),
+                    NextState("DATA-RETRY")
+                ).Else(
+                    data_commit.eq(1),
+                    # Incremennt Data Count.
+                    NextValue(data_count, data_count + 1),
+                    # Transfer is done when Data Count reaches Block Count.
+                    If(phy.dataw.sink.last_block,
+                        NextState("IDLE")
+                    )
                 )
             ),
 
             # Receive Status from the PHY.
             phy.dataw.source.ready.eq(1),
             If(phy.dataw.source.valid,
-                # Set Data Error when Data has not been accepted.
+                # Set Data Error when Data has not been accepted (or Retry on CRC Error).
                 If(phy.dataw.source.status == SDCARD_STREAM_STATUS_CRCERROR,
-                    NextValue(data_crc, 1)
+                    If(retry,
+                        write_retry_now.eq(1),
+                        NextValue(write_retry, 1)
+                    ).Else(
+                        NextValue(data_crc, 1)
+                    )
                 ).Elif(phy.dataw.source.status != SDCARD_STREAM_STATUS_DATAACCEPTED,
                     NextValue(data_error, 1)
                 )
@@ -273,25 +510,148 @@ class SDCore(LiteXModule):
                     If(phy.datar.source.drop,
                         phy.datar.source.ready.eq(1)
                     ).Else(
-                        phy.datar.source.connect(self.source, omit={"status", "drop"}),
+                        phy.datar.source.connect(data_sink, omit={"status", "drop"}),
                     ),
                     # On last Data:
                     If(phy.datar.source.last & phy.datar.source.ready,
-                        # Increment Data Count.
-                        NextValue(data_count, data_count + 1),
-                        # Transfer is Done when Data Count reaches Block Count.
-                        If(data_count == (block_count - 1),
-                            NextState("IDLE")
+                        # On CRC Error: Drop block and Retry.
+                        If((phy.datar.source.status == SDCARD_STREAM_STATUS_CRCERROR) & retry,
+                            data_rollback.eq(1),
+                            NextState("DATA-RETRY")
+                        ).Else(
+                            data_commit.eq(1),
+                            If(phy.datar.source.status == SDCARD_STREAM_STATUS_CRCERROR,
+                                NextValue(data_crc, 1),
+                            ),
+                            # Increment Data Count.
+                            NextValue(data_count, data_count + 1),
+                            # Transfer is Done when Data Count reaches Block Count.
+                            If(data_count == (block_count - 1),
+                                NextState("IDLE")
+                            )
                         )
                     ),
-                    If(phy.dataw.source.status == SDCARD_STREAM_STATUS_CRCERROR,
-                        NextValue(data_crc, 1),
-                    ),
-                # On Timeout: set Data Timeout and return to Idle.
+                # On Timeout: Retry or set Data Timeout and return to Idle.
                 ).Elif(phy.datar.source.status == SDCARD_STREAM_STATUS_TIMEOUT,
-                    NextValue(data_timeout, 1),
                     phy.datar.source.ready.eq(1),
-                    NextState("IDLE")
+                    If(retry,
+                        data_rollback.eq(1),
+                        NextState("DATA-RETRY")
+                    ).Else(
+                        NextValue(data_timeout, 1),
+                        NextState("IDLE")
+                    )
                 )
             )
         )
+
+        # Retry FSM states (only reachable when retries are enabled) ------------------------------
+        cmd_retries  = self.cmd_retries.status        if with_retry else Signal(32)
+        data_retries = self.data_retries.status       if with_retry else Signal(32)
+        addressing   = self.retry.fields.addressing   if with_retry else 0
+        fsm.act("CMD-RETRY",
+            # Send the Cmd again.
+            crc7_inserter.reset.eq(1),
+            NextValue(retry_left, retry_left - 1),
+            NextValue(cmd_retries, cmd_retries + 1),
+            NextValue(cmd_count, 0),
+            NextState("CMD-SEND")
+        )
+        fsm.act("DATA-RETRY",
+            crc7_inserter.reset.eq(1),
+            NextValue(retry_left, retry_left - 1),
+            NextValue(data_retries, data_retries + 1),
+            NextValue(cmd_count, 0),
+            # On Multiple Block Read/Write, Stop the transmission first...
+            If((orig_cmd == 18) | (orig_cmd == 25),
+                NextValue(cmd, 12),
+                NextValue(cmd_argument, 0),
+                NextValue(cmd_type, SDCARD_CTRL_RESPONSE_SHORT_BUSY),
+                NextValue(data_type, SDCARD_CTRL_DATA_TRANSFER_NONE),
+                NextValue(retry_resume, 1),
+                NextState("CMD-SEND")
+            # ...else directly resume.
+            ).Else(
+                NextState("DATA-RESUME")
+            )
+        )
+        fsm.act("DATA-RESUME",
+            # Send the Cmd again, resuming from the failing block.
+            crc7_inserter.reset.eq(1),
+            NextValue(cmd, orig_cmd),
+            NextValue(cmd_type, orig_cmd_type),
+            NextValue(data_type, orig_data_type),
+            If(addressing,
+                NextValue(cmd_argument, orig_argument + (data_count << 9)),
+            ).Else(
+                NextValue(cmd_argument, orig_argument + data_count),
+            ),
+            NextValue(retry_resume, 0),
+            NextValue(cmd_count, 0),
+            NextState("CMD-SEND")
+        )
+
+        # Transfer Done (end of Cmd/Data transfer, for Cmd Port).
+        self._busy  = busy  = Signal()
+        self._error = error = Signal()
+        self.comb += [
+            busy.eq(~fsm.ongoing("IDLE")),
+            error.eq(cmd_error | cmd_timeout | cmd_crc | data_error | data_timeout | data_crc),
+        ]
+
+    def get_port(self):
+        """Get the Cmd Port of the core (see SDCorePort)."""
+        assert self._port is None
+        self._port = SDCorePort()
+        return self._port
+
+    def do_finalize(self):
+        request = self._request
+        port    = self._port
+
+        # Cmd Requests from CSRs.
+        csr_request = [
+            request.valid.eq(self.cmd_send.wr_stb),
+            request.argument.eq(self.cmd_argument.storage),
+            request.cmd.eq(self.cmd_command.fields.cmd),
+            request.cmd_type.eq(self.cmd_command.fields.cmd_type),
+            request.crc.eq(self.cmd_command.fields.crc),
+            request.data_type.eq(self.cmd_command.fields.data_type),
+            request.block_length.eq(self.block_length.storage),
+            request.block_count.eq(self.block_count.storage),
+        ]
+        if port is None:
+            self.comb += csr_request
+            self.comb += self._source.connect(self.source)
+            self.comb += self.sink.connect(self._sink)
+            return
+
+        # Cmd Requests from CSRs or Cmd Port (Cmd Port has priority).
+        port_sel = Signal()
+        busy_d   = Signal()
+        self.comb += [
+            If(port.cmd.valid,
+                port.cmd.connect(request)
+            ).Else(
+                *csr_request
+            )
+        ]
+        self.sync += If(request.valid & request.ready, port_sel.eq(port.cmd.valid))
+
+        # Data from/to CSRs or Cmd Port.
+        self.comb += [
+            If(port_sel,
+                self._source.connect(port.source),
+                port.sink.connect(self._sink),
+            ).Else(
+                self._source.connect(self.source),
+                self.sink.connect(self._sink),
+            )
+        ]
+
+        # Done/Error on end of Cmd Port transfer.
+        self.sync += busy_d.eq(self._busy)
+        self.comb += [
+            port.done.eq(port_sel & busy_d & ~self._busy),
+            port.error.eq(self._error),
+        ]
@@ -9,6 +9,60 @@ from migen import *
 
 from litex.gen import *
 
+# CRC Equations ------------------------------------------------------------------------------------
+
+def _crc_equations(polynom, taps, dw):
+    """Compute the CRC next state equations over GF(2).
+
+    Returns, for each bit of the next state, the list of variables to XOR: state bits (0..taps-1)
+    and din bits (taps..taps+dw-1), din[dw-1] being processed first (as done by a serial LFSR).
+    """
+    # Symbolic LFSR: each bit is represented as a mask of the variables.
+    reg = [1 << j for j in range(taps)]
+    for i in range(dw):
+        inv = (1 << (taps + dw - 1 - i)) ^ reg[taps-1]
+        reg = [inv] + [reg[j] ^ (inv if (polynom >> (j + 1)) & 1 else 0) for j in range(taps - 1)]
+    return [[v for v in range(taps + dw) if (bit >> v) & 1] for bit in reg]
+
+def _xor_factorize(equations, nvariables):
+    """Share common subterms between XOR equations.
+
+    Greedily extracts the pair of variables used by the most equations as a new variable (index
+    nvariables, nvariables + 1, ...) until no pair is shared. Returns the (a, b) pairs of the new
+    variables and the rewritten equations.
+    """
+    equations = [set(equation) for equation in equations]
+    shared    = []
+    while True:
+        counts = {}
+        for equation in equations:
+            variables = sorted(equation)
+            for i, a in enumerate(variables):
+                for b in variables[i+1:]:
+                    counts[(a, b)] = counts.get((a, b), 0) + 1
+        if not counts:
+            break
+        pair = max(sorted(counts), key=lambda pair: counts[pair])
+        if counts[pair] < 2:
+            break
+        v = nvariables + len(shared)
+        shared.append(pair)
+        for equation in equations:
+            if set(pair) <= equation:
+                equation -= set(pair)
+                equation.add(v)
+    return shared, [sorted(equation) for equation in equations]
+
+def _xor_network(module, variables, shared, equations):
+    """Generate the XOR network of factorized equations, returns the equations expressions."""
+    variables = list(variables)
+    for a, b in shared:
+        t = Signal()
+        module.comb += t.eq(variables[a] ^ variables[b])
+        variables.append(t)
+    return [Reduce("XOR", [variables[v] for v in equation]) if equation else C(0)
+        for equation in equations]
+
 # CRC ----------------------------------------------------------------------------------------------
 
 class CRC(LiteXModule):
@@ -20,60 +74,117 @@ class CRC(LiteXModule):
 
         # # #
 
-        reg = [Signal(taps, reset=init) for i in range(dw+1)]
+        crc      = Signal(taps, reset=init)
+        crc_next = Signal(taps)
 
-        # CRC LFSR
-        for i in range(dw):
-            inv = self.din[dw-i-1] ^ reg[i][taps-1]
-            tmp = [inv]
-            for j in range(taps -1):
-                if((polynom >> (j + 1)) & 1):
-                    tmp.append(reg[i][j] ^ inv)
-                else:
-                    tmp.append(reg[i][j])
-            self.comb += reg[i+1].eq(Cat(*tmp))
+        # CRC Next State (flat XORs computed at elaboration time, with common subterms shared).
+        shared, equations = _xor_factorize(_crc_equations(polynom, taps, dw), taps + dw)
+        variables = [crc[j] for j in range(taps)] + [self.din[i] for i in range(dw)]
+        for j, xor in enumerate(_xor_network(self, variables, shared, equations)):
+            self.comb += crc_next[j].eq(xor)
 
         # Control
         self.sync += [
             If(self.reset,
-                reg[0].eq(init)
+                crc.eq(init)
             ).Else(
                 If(self.enable,
-                    reg[0].eq(reg[dw])
+                    crc.eq(crc_next)
                 )
             )
         ]
 
         # Output
-        self.comb += self.crc.eq(reg[0])
+        self.comb += self.crc.eq(crc)
+
+# Parallel CRC16 -----------------------------------------------------------------------------------
+
+class ParallelCRC16(LiteXModule):
+    """Fused multi-lane CRC16
+
+    Computes the CRC16 of lanes Data lines, absorbing k bits per lane per cycle with XOR equations
+    precomputed at elaboration time.
+
+    din/dout are k words of lanes bits, MSB word first (in time). The CRCs of all lanes are stored
+    interleaved in a single register that is also used as a shared output shift register: with
+    shift, the CRCs are shifted out MSB first (k bits per lane per cycle) on dout.
+    """
+    def __init__(self, lanes, k=1):
+        assert 16 % k == 0
+        self.reset  = Signal()
+        self.enable = Signal()
+        self.shift  = Signal()
+        self.din    = Signal(lanes*k)
+        self.dout   = Signal(lanes*k)
+        self.crc    = [Signal(16) for n in range(lanes)]
+
+        # # #
+
+        # Interleaved CRCs: bit j of lane n is state[j*lanes + n].
+        state      = Signal(16*lanes)
+        state_next = Signal(16*lanes)
+
+        # Next State (same factorized equations for all lanes).
+        shared, equations = _xor_factorize(_crc_equations(polynom=0x1021, taps=16, dw=k), 16 + k)
+        for n in range(lanes):
+            variables  = [state[i*lanes + n] for i in range(16)]
+            variables += [self.din[i*lanes + n] for i in range(k)]
+            for j, xor in enumerate(_xor_network(self, variables, shared, equations)):
+                self.comb += state_next[j*lanes + n].eq(xor)
+
+        # Control.
+        self.sync += [
+            If(self.reset,
+                state.eq(0)
+            ).Elif(self.enable,
+                state.eq(state_next)
+            ).Elif(self.shift,
+                state.eq(state << (k*lanes))
+            )
+        ]
+
+        # Outputs.
+        self.comb += self.dout.eq(state[(16-k)*lanes:])
+        for n in range(lanes):
+            self.comb += self.crc[n].eq(Cat(*[state[j*lanes + n] for j in range(16)]))
 
 # CRC16 -------------------------------------------------------------------------------------
 
 class CRC16(LiteXModule):
-    def __init__(self, data_pads, count):
+    """CRC16 of each Data line.
+
+    The CRCs are output on data_pads_out MSB first, either selected by count or, when count is
+    None, shifted out of the CRC registers with shift (avoiding the output mux).
+    """
+    def __init__(self, data_pads, count=None):
 
         self.data_pads_out = data_pads_out = Signal(len(data_pads))
 
         self.enable = Signal()
         self.reset  = Signal()
-        self.crc = []
+        self.shift  = Signal()
 
         # # #
 
-        crcs  = [CRC(polynom=0x1021, taps=16, dw=1, init=0) for i in range(len(data_pads))]
-        for i in range(len(data_pads)):
-            self.submodules += crcs[i]
-            self.crc.append(crcs[i].crc)
-            self.comb += [
-                crcs[i].reset.eq(self.reset),
-                crcs[i].enable.eq(self.enable),
-                crcs[i].din[0].eq(data_pads[i]),
-            ]
+        self.engine = engine = ParallelCRC16(lanes=len(data_pads), k=1)
+        self.crc = engine.crc
+        self.comb += [
+            engine.reset.eq(self.reset),
+            engine.enable.eq(self.enable),
+            engine.din.eq(data_pads),
+        ]
+
+        # Shifted output.
+        if count is None:
+            self.comb += engine.shift.eq(self.shift)
+            self.comb += data_pads_out.eq(engine.dout)
+            return
 
+        # Selected output.
         cases = {}
         for i in range(16):
             cases[i] = [
-                data_pads_out[n].eq(crcs[n].crc[16-1-i]) for n in range(len(data_pads_out))
+                data_pads_out[n].eq(self.crc[n][16-1-i]) for n in range(len(data_pads_out))
             ]
 
         self.comb += Case(count, cases)
@@ -3,3 +3,4 @@
 # SPDX-License-Identifier: BSD-2-Clause
 
 from litesdcard.emulator.core import SDEmulator
+from litesdcard.emulator.model import SDCardModel
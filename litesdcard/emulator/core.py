@@ -7,15 +7,15 @@ import os
 from migen import *
 
 
-def _sdemulator_pads():
+def _sdemulator_pads(data_width=4):
     pads = Record([
         ("clk",   1),
         ("cmd_i", 1),
         ("cmd_o", 1),
         ("cmd_t", 1),
-        ("dat_i", 4),
-        ("dat_o", 4),
-        ("dat_t", 4),
+        ("dat_i", data_width),
+        ("dat_o", data_width),
+        ("dat_t", data_width),
     ])
     return pads
 
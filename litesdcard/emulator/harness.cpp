@@ -0,0 +1,142 @@
+//
+// This file is part of LiteSDCard.
+//
+// Copyright (c) 2026 Florent Kermarrec <florent@enjoy-digital.fr>
+// SPDX-License-Identifier: BSD-2-Clause
+
+// LiteSDCard Verilator harness: thin C API around the Verilated harness (see harness.py).
+//
+// - Wishbone Control: driven by csr_read/csr_write (byte addresses, 32-bit words).
+// - Wishbone DMA    : served from a flat memory (single cycle, combinatorial ack).
+
+#include <cstdint>
+#include <cstring>
+#include <vector>
+
+#include "verilated.h"
+#include "Vharness.h"
+
+static VerilatedContext     *ctx = nullptr;
+static Vharness             *top = nullptr;
+static std::vector<uint8_t>  mem;
+static uint64_t              cycles = 0;
+
+static const uint64_t WB_TIMEOUT = 1000000;
+
+// Wishbone DMA Slave -------------------------------------------------------------------------------
+
+static void dma_serve(void) {
+    top->wb_dma_ack   = 0;
+    top->wb_dma_err   = 0;
+    top->wb_dma_dat_r = 0;
+    if (!(top->wb_dma_cyc && top->wb_dma_stb))
+        return;
+    uint64_t addr = ((uint64_t)top->wb_dma_adr) << 2;
+    if (addr + 4 > mem.size()) {
+        top->wb_dma_err = 1;
+        return;
+    }
+    top->wb_dma_ack = 1;
+    if (top->wb_dma_we) {
+        for (int i = 0; i < 4; i++)
+            if (top->wb_dma_sel & (1 << i))
+                mem[addr + i] = (top->wb_dma_dat_w >> (8*i)) & 0xff;
+    } else {
+        uint32_t data;
+        memcpy(&data, &mem[addr], 4);
+        top->wb_dma_dat_r = data;
+    }
+}
+
+// Clocking -----------------------------------------------------------------------------------------
+
+static void tick(void) {
+    top->clk = 0;
+    top->eval();
+    // Present DMA response before the rising edge (DMA writes are committed here, the DUT sees
+    // ack on the edge).
+    dma_serve();
+    top->eval();
+    top->clk = 1;
+    top->eval();
+    cycles++;
+}
+
+// API ----------------------------------------------------------------------------------------------
+
+extern "C" {
+
+void sim_init(size_t mem_size) {
+    ctx = new VerilatedContext;
+    top = new Vharness{ctx};
+    mem.assign(mem_size, 0);
+    cycles = 0;
+    top->wb_ctrl_cyc = 0;
+    top->wb_ctrl_stb = 0;
+    top->rst = 1;
+    for (int i = 0; i < 16; i++)
+        tick();
+    top->rst = 0;
+}
+
+void sim_tick(uint64_t n) {
+    for (uint64_t i = 0; i < n; i++)
+        tick();
+}
+
+uint64_t sim_cycles(void) {
+    return cycles;
+}
+
+void sim_close(void) {
+    top->final();
+    delete top;
+    delete ctx;
+    top = nullptr;
+    ctx = nullptr;
+}
+
+static uint32_t csr_access(uint32_t addr, int we, uint32_t data) {
+    uint32_t rdata = 0;
+    top->wb_ctrl_adr   = addr >> 2;
+    top->wb_ctrl_dat_w = data;
+    top->wb_ctrl_sel   = 0xf;
+    top->wb_ctrl_we    = we;
+    top->wb_ctrl_cyc   = 1;
+    top->wb_ctrl_stb   = 1;
+    for (uint64_t i = 0; i < WB_TIMEOUT; i++) {
+        top->clk = 0;
+        top->eval();
+        dma_serve();
+        top->eval();
+        int ack = top->wb_ctrl_ack | top->wb_ctrl_err;
+        rdata   = top->wb_ctrl_dat_r;
+        top->clk = 1;
+        top->eval();
+        cycles++;
+        if (ack)
+            break;
+    }
+    top->wb_ctrl_cyc = 0;
+    top->wb_ctrl_stb = 0;
+    top->wb_ctrl_we  = 0;
+    return rdata;
+}
+
+uint32_t csr_read(uint32_t addr) {
+    return csr_access(addr, 0, 0);
+}
+
+void csr_write(uint32_t addr, uint32_t data) {
+    csr_access(addr, 1, data);
+}
+
+void mem_read(uint64_t offset, void *data, size_t length) {
+    memcpy(data, &mem[offset], length);
+}
+
+void mem_write(uint64_t offset, const void *data, size_t length) {
+    memcpy(&mem[offset], data, length);
+}
+
+}
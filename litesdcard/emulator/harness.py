@@ -0,0 +1,212 @@
+#
+# This file is part of LiteSDCard.
+#
+# Copyright (c) 2026 Florent Kermarrec <florent@enjoy-digital.fr>
+# SPDX-License-Identifier: BSD-2-Clause
+
+"""
+LiteSDCard Verilator harness
+
+Full-stack simulation of SDPHY + SDCore + DMAs against the SDEmulator, compiled with Verilator into a
+shared library and driven from Python:
+- CSRs are accessed through a Wishbone Control slave (read/write are compatible with LiteX's
+  RemoteClient, so CSRs can also be used through harness.regs.*).
+- DMAs access a simulated memory that can be preloaded/dumped from/to files.
+
+Compared to Migen's simulator, simulations run several orders of magnitude faster, making
+multi-megabytes transfers possible in seconds.
+
+Limitations:
+- The SDEmulator is not backed by an image: all blocks share its single 512-bytes buffer, so each
+  written block overwrites the previous one and reads (at any address) return the last written block.
+  Multi-block transfers exercise the full DMA/SDCore/SDPHY path, but read data can only be compared
+  to the last block written.
+
+Usage:
+    harness = VerilatorHarness()
+    harness.mem_load("image.bin", offset=0x0000)
+    harness.regs.sdcard_core_cmd_argument.write(0)
+    ...
+    harness.close()
+"""
+
+import os
+import ctypes
+import shutil
+import subprocess
+
+from migen import *
+
+from litex.gen import *
+
+from litex.build.generic_platform import *
+
+from litex.soc.interconnect import wishbone
+from litex.soc.integration.soc import SoCBusHandler, SoCRegion
+from litex.soc.integration.soc_core import SoCMini
+from litex.soc.integration.builder import Builder
+
+from litex.tools.remote.csr_builder import CSRBuilder
+
+# IOs ----------------------------------------------------------------------------------------------
+
+_io = [
+    # Clk / Rst.
+    ("clk", 0, Pins(1)),
+    ("rst", 0, Pins(1)),
+]
+
+# Platform -----------------------------------------------------------------------------------------
+
+class _HarnessPlatform(GenericPlatform):
+    """Platform only generating the Verilog of the design (compilation is done by the harness)."""
+    def build(self, fragment, build_dir, build_name, **kwargs):
+        os.makedirs(build_dir, exist_ok=True)
+        cwd = os.getcwd()
+        os.chdir(build_dir)
+        try:
+            v_output = self.get_verilog(fragment, name=build_name)
+            v_output.write(build_name + ".v")
+        finally:
+            os.chdir(cwd)
+        return v_output.ns
+
+# Harness SoC --------------------------------------------------------------------------------------
+
+class HarnessSoC(SoCMini):
+    def __init__(self, platform, clk_freq=int(100e6)):
+        # CRG --------------------------------------------------------------------------------------
+        self.crg = CRG(platform.request("clk"), platform.request("rst"))
+
+        # SoCMini ----------------------------------------------------------------------------------
+        SoCMini.__init__(self, platform, clk_freq=clk_freq)
+
+        # Wishbone Control -------------------------------------------------------------------------
+        wb_ctrl = wishbone.Interface()
+        self.bus.add_master(name="wb_ctrl", master=wb_ctrl)
+        platform.add_extension(wb_ctrl.get_ios("wb_ctrl"))
+        self.comb += wb_ctrl.connect_to_pads(self.platform.request("wb_ctrl"), mode="slave")
+
+        # Wishbone DMA -----------------------------------------------------------------------------
+        wb_dma = wishbone.Interface()
+        platform.add_extension(wb_dma.get_ios("wb_dma"))
+        self.comb += wb_dma.connect_to_pads(self.platform.request("wb_dma"), mode="master")
+        self.dma_bus = SoCBusHandler(
+            name             = "SoCDMABusHandler",
+            standard         = "wishbone",
+            data_width       = 32,
+            address_width    = 32,
+        )
+        self.dma_bus.add_slave("dma", slave=wb_dma, region=SoCRegion(origin=0x00000000, size=0x100000000))
+
+        # SDCard (with SDEmulator) -----------------------------------------------------------------
+        self.add_sdcard(name="sdcard", use_emulator=True)
+
+# Build --------------------------------------------------------------------------------------------
+
+def build_harness(build_dir="build/harness", clk_freq=int(100e6), rebuild=False):
+    """Generate and compile the harness, returns (library, csr_csv) paths."""
+    build_dir = os.path.abspath(build_dir)
+    library   = os.path.join(build_dir, "libharness.so")
+    csr_csv   = os.path.join(build_dir, "csr.csv")
+    if os.path.exists(library) and os.path.exists(csr_csv) and not rebuild:
+        return library, csr_csv
+
+    if shutil.which("verilator") is None:
+        raise OSError("Verilator not found, required to build the harness.")
+
+    # Generate Verilog.
+    platform = _HarnessPlatform(device="", io=_io, name="harness")
+    soc      = HarnessSoC(platform, clk_freq=clk_freq)
+    builder  = Builder(soc, output_dir=build_dir, csr_csv=csr_csv)
+    builder.build(build_name="harness")
+
+    # Compile Verilog + Harness to a shared library.
+    gateware_dir = os.path.join(build_dir, "gateware")
+    sources      = [os.path.join(gateware_dir, "harness.v")]
+    sources     += [f for f, language, library in platform.sources if language == "verilog"]
+    includes     = ["-I" + path for path in platform.verilog_include_paths]
+    subprocess.check_call([
+        "verilator", "--cc", "--exe", "--build", "-j", "0",
+        "-Wno-fatal", "-Wno-lint", "-Wno-style",
+        "--top-module", "harness",
+        "-Mdir", os.path.join(build_dir, "obj_dir"),
+        "-CFLAGS", "-fPIC -O2",
+        "-LDFLAGS", "-shared",
+        "-o", library,
+        *includes,
+        *sources,
+        os.path.join(os.path.dirname(__file__), "harness.cpp"),
+    ])
+    return library, csr_csv
+
+# Verilator Harness --------------------------------------------------------------------------------
+
+class VerilatorHarness:
+    """Python interface to the compiled harness.
+
+    read/write follow RemoteClient's API (byte addresses, 32-bit words) so that CSRBuilder (regs,
+    constants) and code written for RemoteClient can be used unchanged.
+    """
+    def __init__(self, build_dir="build/harness", mem_size=16*1024*1024, rebuild=False):
+        self.library, self.csr_csv = build_harness(build_dir, rebuild=rebuild)
+        self.lib = lib = ctypes.CDLL(self.library)
+        lib.sim_init.argtypes  = [ctypes.c_size_t]
+        lib.sim_tick.argtypes  = [ctypes.c_uint64]
+        lib.sim_cycles.restype = ctypes.c_uint64
+        lib.csr_read.argtypes  = [ctypes.c_uint32]
+        lib.csr_read.restype   = ctypes.c_uint32
+        lib.csr_write.argtypes = [ctypes.c_uint32, ctypes.c_uint32]
+        lib.mem_read.argtypes  = [ctypes.c_uint64, ctypes.c_void_p, ctypes.c_size_t]
+        lib.mem_write.argtypes = [ctypes.c_uint64, ctypes.c_void_p, ctypes.c_size_t]
+        lib.sim_init(mem_size)
+        self.mem_size = mem_size
+
+        # CSRs.
+        self.csr_builder = CSRBuilder(comm=self, csr_csv=self.csr_csv)
+        self.regs        = self.csr_builder.build_registers()
+        self.constants   = self.csr_builder.constants
+        self.bases       = self.csr_builder.bases
+        self.mems        = self.csr_builder.mems
+
+    def close(self):
+        self.lib.sim_close()
+
+    # Simulation.
+    @property
+    def cycles(self):
+        return self.lib.sim_cycles()
+
+    def run(self, cycles):
+        self.lib.sim_tick(cycles)
+
+    # CSRs (RemoteClient compatible).
+    def read(self, addr, length=None, burst="incr"):
+        assert burst == "incr"
+        datas = [self.lib.csr_read(addr + 4*i) for i in range(1 if length is None else length)]
+        return datas[0] if length is None else datas
+
+    def write(self, addr, datas):
+        datas = datas if isinstance(datas, list) else [datas]
+        for i, data in enumerate(datas):
+            self.lib.csr_write(addr + 4*i, data)
+
+    # Memory.
+    def mem_write(self, offset, data):
+        data = bytes(data)
+        assert offset + len(data) <= self.mem_size
+        self.lib.mem_write(offset, data, len(data))
+
+    def mem_read(self, offset, length):
+        assert offset + length <= self.mem_size
+        data = ctypes.create_string_buffer(length)
+        self.lib.mem_read(offset, data, length)
+        return data.raw
+
+    def mem_load(self, filename, offset=0):
+        with open(filename, "rb") as f:
+            self.mem_write(offset, f.read())
+
+    def mem_dump(self, filename, offset, length):
+        with open(filename, "wb") as f:
+            f.write(self.mem_read(offset, length))
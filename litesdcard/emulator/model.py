@@ -0,0 +1,406 @@
+#
+# This file is part of LiteSDCard.
+#
+# Copyright (c) 2026 Florent Kermarrec <florent@enjoy-digital.fr>
+# SPDX-License-Identifier: BSD-2-Clause
+
+import os
+import mmap
+
+import numpy as np
+
+from migen import *
+
+from litesdcard.host.codec import *
+
+# Helpers ------------------------------------------------------------------------------------------
+
+def _clk_edge(pads, rising):
+    # Wait for the next SDCard Clk rising/falling edge.
+    clk_d = (yield pads.clk)
+    while True:
+        yield
+        clk = (yield pads.clk)
+        if (clk != clk_d) and (clk == rising):
+            return
+        clk_d = clk
+
+def _open_image(image, size):
+    if isinstance(image, (bytearray, mmap.mmap)):
+        return image, None
+    if not os.path.exists(image) and size is None:
+        raise ValueError(f"{image}: size required to create a new image.")
+    f = open(image, "r+b" if os.path.exists(image) else "w+b")
+    if size is not None and os.path.getsize(image) < size:
+        f.truncate(size) # Sparse file.
+    return mmap.mmap(f.fileno(), 0), f
+
+# Card States --------------------------------------------------------------------------------------
+
+CARD_STATE_IDLE  = 0
+CARD_STATE_READY = 1
+CARD_STATE_IDENT = 2
+CARD_STATE_STBY  = 3
+CARD_STATE_TRAN  = 4
+CARD_STATE_DATA  = 5
+CARD_STATE_RCV   = 6
+CARD_STATE_PRG   = 7
+
+# Card Status bits.
+CARD_STATUS_OUT_OF_RANGE    = (1 << 31)
+CARD_STATUS_BLOCK_LEN_ERROR = (1 << 29)
+CARD_STATUS_COM_CRC_ERROR   = (1 << 23)
+CARD_STATUS_ILLEGAL_COMMAND = (1 << 22)
+CARD_STATUS_READY_FOR_DATA  = (1 <<  8)
+CARD_STATUS_APP_CMD         = (1 <<  5)
+
+# SDCard Model -------------------------------------------------------------------------------------
+
+class SDCardModel:
+    """Behavioral SDCard model
+
+    Pure Python SDCard (SDHC, block addressing) model for Migen simulations, connected to the pads
+    of SDPHYIOEmulator (see _sdemulator_pads) and backed by a disk image: a file (memory-mapped, and
+    created/extended to size if needed) or a bytearray.
+
+    Supports the initialization flow (CMD0/2/3/7/8/9/10/13/55, ACMD6/13/41/51, CMD6), single and
+    multiple blocks reads/writes (CMD17/18/24/25, with CMD12 or CMD23) on 1-bit or 4-bit bus with
+    configurable latencies (in SDCard Clk cycles). Blocks are addressed in 512-bytes units but the
+    transferred length can be reduced with CMD16 (for benchmarks with small blocks).
+    Latencies:
+    - response_latency: between the end of a Cmd and its response (NCR).
+    - access_latency: before each read Data block (NAC).
+    - program_latency: busy time after each written Data block.
+
+    Cmds received by the card are logged in commands (ex "CMD17", "ACMD41"). Add the model to the
+    simulation with run_simulation(dut, [..., *model.get_generators()]).
+
+    Errors can be injected with inject(fault, after), the fault applying once after the given
+    number of Cmds/blocks:
+    - cmd_timeout: Cmd ignored (no response).
+    - cmd_crc: Response sent with a bad CRC7.
+    - read_crc: Read Data block sent with a bad CRC16.
+    - write_crc: Written Data block rejected with a CRC error status.
+    """
+    def __init__(self, pads, image, size=None, rca=0x1234,
+        response_latency = 2,
+        access_latency   = 8,
+        program_latency  = 16,
+        init_latency     = 1):
+        self.pads             = pads
+        self.mem, self.file   = _open_image(image, size)
+        self.size             = len(self.mem)
+        self.rca              = rca
+        self.response_latency = response_latency
+        self.access_latency   = access_latency
+        self.program_latency  = program_latency
+        self.init_latency     = init_latency
+        self.commands         = []
+        self.faults           = {}
+        assert self.size % 512 == 0
+        self.reset()
+
+    def reset(self):
+        self.state      = CARD_STATE_IDLE
+        self.status     = 0
+        self.app        = False
+        self.width      = 1
+        self.length     = 512 # Block length (CMD16).
+        self.init_count = 0
+        self.count      = None # Block count (CMD23).
+        self.transfer   = None
+        self.stop       = False
+
+    def inject(self, fault, after=0):
+        assert fault in ["cmd_timeout", "cmd_crc", "read_crc", "write_crc"]
+        self.faults[fault] = after
+
+    def fault(self, fault):
+        # Return True when an injected fault applies (and consume it).
+        if fault not in self.faults:
+            return False
+        if self.faults[fault] == 0:
+            del self.faults[fault]
+            return True
+        self.faults[fault] -= 1
+        return False
+
+    def close(self):
+        if self.file is not None:
+            self.mem.flush()
+            self.mem.close()
+            self.file.close()
+
+    # Registers ------------------------------------------------------------------------------------
+
+    def ocr(self):
+        ready = self.init_count > self.init_latency
+        return (ready << 31) | (1 << 30) | 0x00ff8000 # Ready, CCS (SDHC), 2.7-3.6V.
+
+    def cid(self):
+        return bytes([0x03, ord("L"), ord("X"), ord("L"), ord("S"), ord("D"), ord("C"), ord("M"),
+            0x10, 0x12, 0x34, 0x56, 0x78, 0x01, 0x9a, 0x01])
+
+    def csd(self):
+        # CSD Version 2.0: capacity = (C_SIZE + 1) * 512KB.
+        c_size = max(self.size // (512*1024), 1) - 1
+        csd  = (0b01 << 126) | (0x0e << 112) | (0x32 << 96) | (0x5b5 << 84) | (9 << 80)
+        csd |= (c_size << 48) | (1 << 46) | (0x7f << 39) | (0b010 << 26) | (9 << 22) | 1
+        return csd.to_bytes(16, "big")
+
+    def scr(self):
+        # SD Spec 3.0, SDHC security, 1-bit/4-bit bus widths.
+        return bytes([0x02, 0x35, 0x80, 0x00, 0x00, 0x00, 0x00, 0x00])
+
+    def switch_status(self, argument):
+        status = bytearray(64)
+        status[0:2]   = (100).to_bytes(2, "big")  # Max current (mA).
+        status[12:14] = (0x8003).to_bytes(2, "big") # Group 1: Default/High-Speed.
+        status[16]    = (argument & 0xf) if (argument & 0xf) in [0, 1] else 0xf
+        return bytes(status)
+
+    def card_status(self):
+        status = self.status | (self.state << 9) | CARD_STATUS_READY_FOR_DATA
+        if self.app:
+            status |= CARD_STATUS_APP_CMD
+        self.status = 0 # Clear on read.
+        return status
+
+    # Responses ------------------------------------------------------------------------------------
+
+    def r1(self, index):
+        return encode_response_r1(index, self.card_status())
+
+    def r3(self):
+        return np.concatenate([[0, 0], [1]*6, int_to_bits(self.ocr(), 32), [1]*7, [1]])
+
+    def r6(self):
+        status = self.card_status()
+        status = ((status >> 8) & 0xc000) | ((status >> 6) & 0x2000) | (status & 0x1fff)
+        return encode_response_r1(3, (self.rca << 16) | status)
+
+    # Commands -------------------------------------------------------------------------------------
+
+    def blocks(self, argument, count):
+        # Check range, return block addresses.
+        if count is not None and (argument + count)*512 > self.size:
+            self.status |= CARD_STATUS_OUT_OF_RANGE
+            return None
+        if argument*512 >= self.size:
+            self.status |= CARD_STATUS_OUT_OF_RANGE
+            return None
+        return range(argument, self.size//512 if count is None else argument + count)
+
+    def read_blocks(self, blocks):
+        for block in blocks:
+            yield bytes(self.mem[block*512:block*512 + self.length])
+
+    def command(self, index, argument):
+        """Execute Cmd, returns response bits (or None) and Data transfer (or None)."""
+        app      = self.app
+        self.app = False
+
+        # App Cmds.
+        if app:
+            if index == 6: # SET_BUS_WIDTH.
+                self.app = True
+                response = self.r1(index)
+                self.app = False
+                self.width = 4 if (argument & 0b11) == 0b10 else 1
+                return response, None
+            if index in [13, 51]: # SD_STATUS/SEND_SCR.
+                self.app = True
+                response = self.r1(index)
+                self.app = False
+                return response, ("read", [bytes(64) if index == 13 else self.scr()])
+            if index == 41: # SD_SEND_OP_COND.
+                self.init_count += 1
+                if self.ocr() >> 31:
+                    self.state = CARD_STATE_READY
+                return self.r3(), None
+
+        # Cmds.
+        if index == 0: # GO_IDLE_STATE.
+            self.reset()
+            return None, None
+        if index == 2: # ALL_SEND_CID.
+            self.state = CARD_STATE_IDENT
+            return encode_response_r2(np.frombuffer(self.cid(), dtype=np.uint8)), None
+        if index == 3: # SEND_RELATIVE_ADDR.
+            response = self.r6()
+            self.state = CARD_STATE_STBY
+            return response, None
+        if index == 6: # SWITCH_FUNC.
+            return self.r1(index), ("read", [self.switch_status(argument)])
+        if index == 7: # SELECT/DESELECT_CARD.
+            response = self.r1(index)
+            self.state = CARD_STATE_TRAN if (argument >> 16) == self.rca else CARD_STATE_STBY
+            return response, None
+        if index == 8: # SEND_IF_COND.
+            return encode_response_r1(8, argument & 0xfff), None
+        if index == 9: # SEND_CSD.
+            return encode_response_r2(np.frombuffer(self.csd(), dtype=np.uint8)), None
+        if index == 10: # SEND_CID.
+            return encode_response_r2(np.frombuffer(self.cid(), dtype=np.uint8)), None
+        if index == 12: # STOP_TRANSMISSION.
+            self.stop = self.transfer is not None
+            response = self.r1(index)
+            self.state = CARD_STATE_TRAN
+            return response, None
+        if index == 13: # SEND_STATUS.
+            return self.r1(index), None
+        if index == 16: # SET_BLOCKLEN.
+            if 0 < argument <= 512:
+                self.length = argument
+            else:
+                self.status |= CARD_STATUS_BLOCK_LEN_ERROR
+            return self.r1(index), None
+        if index == 23: # SET_BLOCK_COUNT.
+            self.count = argument & 0xffff
+            return self.r1(index), None
+        if index == 55: # APP_CMD.
+            self.app = True
+            return self.r1(index), None
+        if index in [17, 18, 24, 25]: # READ/WRITE_SINGLE/MULTIPLE_BLOCK.
+            # Illegal during an ongoing transfer (ie without Stop Cmd).
+            if self.state in [CARD_STATE_DATA, CARD_STATE_RCV, CARD_STATE_PRG]:
+                self.status |= CARD_STATUS_ILLEGAL_COMMAND
+                return None, None
+            count, self.count = (1 if index in [17, 24] else self.count), None
+            blocks   = self.blocks(argument, count)
+            response = self.r1(index)
+            if blocks is None:
+                return response, None
+            if index in [17, 18]:
+                self.state = CARD_STATE_DATA
+                return response, ("read", self.read_blocks(blocks))
+            else:
+                self.state = CARD_STATE_RCV
+                return response, ("write", blocks)
+
+        # Illegal Cmd: No response.
+        self.status |= CARD_STATUS_ILLEGAL_COMMAND
+        return None, None
+
+    # Generators -----------------------------------------------------------------------------------
+
+    def get_generators(self):
+        return [self.cmd_generator(), self.dat_generator()]
+
+    @passive
+    def cmd_generator(self):
+        pads = self.pads
+        yield pads.cmd_t.eq(1)
+        while True:
+            # Receive Cmd (sampled on SDCard Clk rising edge).
+            bits = []
+            while len(bits) < COMMAND_BITS:
+                yield from _clk_edge(pads, rising=1)
+                bit = (yield pads.cmd_i)
+                if bits or (bit == 0):
+                    bits.append(bit)
+            index, argument, valid = decode_command(bits)
+            if not valid:
+                self.status |= CARD_STATUS_COM_CRC_ERROR
+                continue
+            index, argument = int(index), int(argument)
+            self.commands.append(("ACMD{}" if self.app else "CMD{}").format(index))
+            if self.fault("cmd_timeout"):
+                continue
+            response, transfer = self.command(index, argument)
+            if response is None:
+                continue
+            if self.fault("cmd_crc"):
+                response = np.array(response)
+                response[-2] ^= 1
+
+            # Send Response (driven on SDCard Clk falling edge).
+            for i in range(self.response_latency):
+                yield from _clk_edge(pads, rising=0)
+            for bit in response:
+                yield from _clk_edge(pads, rising=0)
+                yield pads.cmd_o.eq(int(bit))
+                yield pads.cmd_t.eq(0)
+            yield from _clk_edge(pads, rising=0)
+            yield pads.cmd_t.eq(1)
+
+            # Start Data transfer.
+            if transfer is not None:
+                self.stop     = False
+                self.transfer = transfer
+
+    @passive
+    def dat_generator(self):
+        pads = self.pads
+        yield pads.dat_t.eq(2**len(pads.dat_t) - 1)
+        while True:
+            if self.transfer is None:
+                yield
+                continue
+            kind, blocks = self.transfer
+            if kind == "read":
+                yield from self.read(blocks)
+            else:
+                yield from self.write(blocks)
+            self.transfer = None
+            self.state    = CARD_STATE_TRAN
+
+    def drive(self, value, lanes):
+        yield from _clk_edge(self.pads, rising=0)
+        if value is None:
+            yield self.pads.dat_t.eq(2**len(self.pads.dat_t) - 1)
+        else:
+            yield self.pads.dat_o.eq(int(value))
+            yield self.pads.dat_t.eq((2**len(self.pads.dat_t) - 1) & ~(2**lanes - 1))
+
+    def read(self, blocks):
+        for data in blocks:
+            # Access Latency.
+            for i in range(self.access_latency):
+                yield from _clk_edge(self.pads, rising=0)
+            # Data Block (interrupted by Stop Cmd).
+            values = encode_data_block(np.frombuffer(data, dtype=np.uint8), self.width)
+            if self.fault("read_crc"):
+                values[1] ^= 1
+            for value in values:
+                if self.stop:
+                    break
+                yield from self.drive(value, self.width)
+            yield from self.drive(None, self.width)
+            if self.stop:
+                return
+
+    def write(self, blocks):
+        pads = self.pads
+        for block in blocks:
+            # Wait Data Block start bit (or Stop Cmd).
+            while True:
+                yield from _clk_edge(pads, rising=1)
+                if self.stop:
+                    return
+                if ((yield pads.dat_i) & 0b1) == 0:
+                    break
+            # Receive Data Block.
+            values = [0]
+            for i in range(data_block_clocks(self.length, self.width) - 1):
+                yield from _clk_edge(pads, rising=1)
+                values.append((yield pads.dat_i))
+            data, valid = decode_data_block(values, self.length, self.width)
+            # Send CRC Status (2 clks after end bit), then Busy while programming.
+            valid &= not self.fault("write_crc")
+            status = CRC_STATUS_ACCEPTED if valid else CRC_STATUS_CRC_ERROR
+            yield from self.drive(None, 1)
+            for bit in encode_crc_status(status):
+                yield from self.drive(bit, 1)
+            if not valid:
+                yield from self.drive(None, 1)
+                # Multiple blocks: Ignore further Data until Stop Cmd.
+                while len(blocks) > 1 and not self.stop:
+                    yield from _clk_edge(pads, rising=1)
+                return
+            self.state = CARD_STATE_PRG
+            for i in range(self.program_latency):
+                yield from self.drive(0, 1)
+            self.mem[block*512:block*512 + self.length] = data.tobytes()
+            self.state = CARD_STATE_RCV
+            yield from self.drive(None, 1)
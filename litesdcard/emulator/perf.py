@@ -0,0 +1,168 @@
+#
+# This file is part of LiteSDCard.
+#
+# Copyright (c) 2026 Florent Kermarrec <florent@enjoy-digital.fr>
+# SPDX-License-Identifier: BSD-2-Clause
+
+"""
+LiteSDCard throughput measurements
+
+Simulates SDPHY + SDCore against the behavioral SDCardModel and measures the sys-clk cycles spent
+on Single/Multiple blocks transfers: total cycles, bytes per cycle and projected MB/s at a given
+sys_clk_freq, latency to the first Data byte, inter-block gaps and cycles with the SDCard Clk
+stopped (for backpressure).
+
+The card is directly put in transfer state (no initialization) to keep simulations short.
+"""
+
+import os
+
+import numpy as np
+
+from migen import *
+
+from litex.gen import *
+
+from litesdcard.common import *
+from litesdcard.phy import SDPHY
+from litesdcard.core import SDCore
+from litesdcard.emulator.core import _sdemulator_pads
+from litesdcard.emulator.model import SDCardModel, CARD_STATE_TRAN
+from litesdcard.emulator.recorder import StreamRecorder
+
+_data_widths = {
+    1: SD_PHY_SPEED_1X,
+    4: SD_PHY_SPEED_4X,
+    8: SD_PHY_SPEED_8X,
+}
+
+# Perf DUT -----------------------------------------------------------------------------------------
+
+class PerfDUT(LiteXModule):
+    def __init__(self, divider=0, data_width=4, sys_clk_freq=100e6, **kwargs):
+        self.pads = _sdemulator_pads(max(data_width, 4))
+        self.phy  = SDPHY(self.pads, "", sys_clk_freq, **kwargs)
+        self.core = SDCore(self.phy)
+        self.phy.clocker.divider.storage.reset    = divider
+        self.phy.settings.storage.reset           = _data_widths[data_width]
+        self.phy.settings.fields.data_width.reset = _data_widths[data_width]
+
+# Helpers ------------------------------------------------------------------------------------------
+
+def _command(dut, cmd, argument, cmd_type, data_type=SDCARD_CTRL_DATA_TRANSFER_NONE,
+    block_length = 512,
+    block_count  = 0):
+    core = dut.core
+    yield core.cmd_argument.storage.eq(argument)
+    yield core.cmd_command.fields.cmd.eq(cmd)
+    yield core.cmd_command.fields.cmd_type.eq(cmd_type)
+    yield core.cmd_command.fields.data_type.eq(data_type)
+    yield core.cmd_command.fields.crc.eq(cmd_type == SDCARD_CTRL_RESPONSE_SHORT)
+    yield core.block_length.storage.eq(block_length)
+    yield core.block_count.storage.eq(block_count)
+    yield core.cmd_send.wr_stb.eq(1)
+    yield
+    yield core.cmd_send.wr_stb.eq(0)
+    yield
+    yield
+    while not (yield core.data_event.fields.done):
+        yield
+    if (yield core.cmd_event.fields.error) or (yield core.data_event.fields.error):
+        raise RuntimeError("CMD{} failed.".format(cmd))
+
+@passive
+def _source_generator(dut):
+    yield dut.core.source.ready.eq(1)
+
+@passive
+def _sink_generator(dut):
+    data = 0
+    yield dut.core.sink.valid.eq(1)
+    while True:
+        yield dut.core.sink.data.eq(data)
+        yield
+        if (yield dut.core.sink.ready):
+            data = (data + 1) % 256
+
+# Measure ------------------------------------------------------------------------------------------
+
+def measure(direction="read", divider=0, data_width=4, block_length=512, block_count=8,
+    sys_clk_freq = 100e6,
+    vcd_name     = None,
+    **model_kwargs):
+    """Simulate a transfer and return its measurements as a dict.
+
+    Multiple blocks transfers (block_count > 1) use CMD18/CMD25 followed by CMD12, Single block
+    transfers CMD17/CMD24. Cycles are counted from the first Cmd to the end of the transfer.
+    """
+    assert direction in ["read", "write"]
+    assert 0 < block_length <= 512
+    dut     = PerfDUT(divider=divider, data_width=data_width, sys_clk_freq=sys_clk_freq)
+    image   = bytearray(os.urandom(max(block_count, 1)*512))
+    model   = SDCardModel(dut.pads, image, **model_kwargs)
+    model.state = CARD_STATE_TRAN
+    model.width = data_width
+    cycles  = {}
+    stopped = []
+
+    # Record Data beats on the PHY Data path and the Clk stopped cycles.
+    endpoint = dut.phy.datar.source if direction == "read" else dut.phy.dataw.sink
+    recorder = StreamRecorder(endpoint, fields=["last"])
+
+    @passive
+    def stop_generator():
+        while True:
+            stopped.append((yield dut.phy.clocker.stop))
+            yield
+
+    def generator():
+        if block_length != 512:
+            yield from _command(dut, 16, block_length, SDCARD_CTRL_RESPONSE_SHORT)
+        cmd = {
+            ("read",  False) : 17,
+            ("read",  True)  : 18,
+            ("write", False) : 24,
+            ("write", True)  : 25,
+        }[(direction, block_count > 1)]
+        data_type = {
+            "read"  : SDCARD_CTRL_DATA_TRANSFER_READ,
+            "write" : SDCARD_CTRL_DATA_TRANSFER_WRITE,
+        }[direction]
+        cycles["cmd"] = recorder.cycle
+        yield from _command(dut, cmd, 0, SDCARD_CTRL_RESPONSE_SHORT, data_type,
+            block_length = block_length,
+            block_count  = block_count)
+        if block_count > 1:
+            yield from _command(dut, 12, 0, SDCARD_CTRL_RESPONSE_SHORT_BUSY)
+        cycles["end"] = recorder.cycle
+
+    generators = [generator(), recorder.generator(), stop_generator(), *model.get_generators()]
+    generators.append(_source_generator(dut) if direction == "read" else _sink_generator(dut))
+    run_simulation(dut, generators, vcd_name=vcd_name)
+
+    # Compute results (blocks: first/last beat cycles).
+    beats  = recorder.to_array()
+    ends   = np.flatnonzero(beats["last"])
+    starts = np.concatenate([[0], ends[:-1] + 1])
+    blocks = list(zip(beats["cycle"][starts].tolist(), beats["cycle"][ends].tolist()))
+    assert len(blocks) == block_count
+    total  = cycles["end"] - cycles["cmd"]
+    nbytes = block_length*block_count
+    gaps   = [b[0] - a[1] for a, b in zip(blocks[:-1], blocks[1:])]
+    return {
+        "direction"       : direction,
+        "divider"         : divider,
+        "data_width"      : data_width,
+        "block_length"    : block_length,
+        "block_count"     : block_count,
+        "sys_clk_freq"    : sys_clk_freq,
+        "cycles"          : total,
+        "bytes"           : nbytes,
+        "bytes_per_cycle" : nbytes/total,
+        "mbps"            : nbytes/total*sys_clk_freq/1e6,
+        "latency"         : blocks[0][0] - cycles["cmd"],
+        "block_cycles"    : [end - start for start, end in blocks],
+        "gaps"            : gaps,
+        "max_gap"         : max(gaps, default=0),
+        "stopped"         : sum(stopped[cycles["cmd"]:cycles["end"]]),
+    }
@@ -0,0 +1,99 @@
+#
+# This file is part of LiteSDCard.
+#
+# Copyright (c) 2026 Florent Kermarrec <florent@enjoy-digital.fr>
+# SPDX-License-Identifier: BSD-2-Clause
+
+import numpy as np
+
+from migen import *
+
+# Helpers ------------------------------------------------------------------------------------------
+
+def _endpoint_fields(endpoint):
+    layout  = endpoint.description.payload_layout + endpoint.description.param_layout
+    fields  = [(name, width) for name, width, *_ in layout if isinstance(width, int)]
+    fields += [("first", 1), ("last", 1)]
+    return fields
+
+def _field_dtype(width):
+    for bits, dtype in [(8, np.uint8), (16, np.uint16), (32, np.uint32), (64, np.uint64)]:
+        if width <= bits:
+            return dtype
+    # Wider fields: fixed-width little-endian bytes (no Python objects, so recordings can be saved).
+    return np.dtype("S{}".format((width + 7)//8))
+
+def _field_value(width):
+    if width <= 64:
+        return lambda value: value
+    return lambda value: value.to_bytes((width + 7)//8, "little")
+
+# Stream Recorder ----------------------------------------------------------------------------------
+
+class StreamRecorder:
+    """Stream Recorder
+
+    Records the handshaked beats (valid & ready) of a stream.Endpoint in a Migen simulation, with
+    their cycle numbers, into a NumPy structured array (fields: cycle, payload/param fields, first,
+    last). Much lighter than VCD traces: transfers can then be checked with array comparisons and
+    recordings saved to/loaded from .npy files and diffed. Fields wider than 64-bit are stored as
+    little-endian bytes (int.from_bytes(beat[name], "little") to get the value back).
+
+    Add the recorder to the simulation with run_simulation(dut, [..., recorder.generator()]).
+    """
+    def __init__(self, endpoint, fields=None):
+        self.endpoint = endpoint
+        self.fields   = [(name, width) for name, width in _endpoint_fields(endpoint)
+            if fields is None or name in fields]
+        self.dtype    = np.dtype([("cycle", np.uint64)] + [(name, _field_dtype(width))
+            for name, width in self.fields])
+        self.values   = [_field_value(width) for name, width in self.fields]
+        self.beats    = []
+        self.cycle    = 0 # Current simulation cycle.
+
+    @passive
+    def generator(self):
+        ep = self.endpoint
+        self.cycle = 0
+        while True:
+            if (yield ep.valid) and (yield ep.ready):
+                beat = [self.cycle]
+                for (name, width), value in zip(self.fields, self.values):
+                    beat.append(value((yield getattr(ep, name))))
+                self.beats.append(tuple(beat))
+            self.cycle += 1
+            yield
+
+    def __len__(self):
+        return len(self.beats)
+
+    def to_array(self):
+        return np.array(self.beats, dtype=self.dtype)
+
+    def save(self, filename):
+        np.save(filename, self.to_array(), allow_pickle=False)
+
+    @staticmethod
+    def load(filename):
+        return np.load(filename, allow_pickle=False)
+
+# Diff ---------------------------------------------------------------------------------------------
+
+def stream_diff(a, b, fields=None, with_cycles=False):
+    """Compare two recordings (StreamRecorder or arrays), returns the indices of the differing beats.
+
+    Only the common fields (or the given fields) are compared, cycles only with with_cycles. When
+    lengths differ, the beats missing in the shortest recording are reported as differing.
+    """
+    a = a.to_array() if isinstance(a, StreamRecorder) else a
+    b = b.to_array() if isinstance(b, StreamRecorder) else b
+    if fields is None:
+        fields = [name for name in a.dtype.names if name in b.dtype.names]
+    if not with_cycles:
+        fields = [name for name in fields if name != "cycle"]
+    n    = min(len(a), len(b))
+    diff = np.zeros(max(len(a), len(b)), dtype=bool)
+    diff[n:] = True
+    for name in fields:
+        diff[:n] |= a[name][:n] != b[name][:n]
+    return np.flatnonzero(diff)
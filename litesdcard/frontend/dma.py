@@ -64,9 +64,10 @@ class SDBlock2MemDMA(LiteXModule):
 class SDMem2BlockDMA(LiteXModule):
     """Memory to Block DMA
 
-    Read data from memory through DMA and generate a stream of blocks.
+    Read data from memory through DMA and generate a stream of blocks (with up to dma_fifo_depth
+    memory reads in flight).
     """
-    def __init__(self, bus, endianness, fifo_depth=512):
+    def __init__(self, bus, endianness, fifo_depth=512, dma_fifo_depth=16):
         self.bus    = bus
         self.source = stream.Endpoint([("data", 8)])
         self.irq    = Signal()
@@ -74,7 +75,7 @@ class SDMem2BlockDMA(LiteXModule):
         # # #
 
         # Submodules
-        self.dma = WishboneDMAReader(bus, with_csr=True, endianness=endianness)
+        self.dma = WishboneDMAReader(bus, with_csr=True, endianness=endianness, fifo_depth=dma_fifo_depth)
         converter = stream.Converter(bus.data_width, 8, reverse=True)
         fifo      = stream.SyncFIFO([("data", 8)], fifo_depth, buffered=True)
         self.submodules += converter, fifo
@@ -0,0 +1,301 @@
+#
+# This file is part of LiteSDCard.
+#
+# Copyright (c) 2026 Florent Kermarrec <florent@enjoy-digital.fr>
+# SPDX-License-Identifier: BSD-2-Clause
+
+from migen import *
+
+from litex.gen import *
+
+from litex.soc.interconnect.csr import *
+from litex.soc.interconnect import stream
+
+from litesdcard.common import *
+
+# SD Stripe Lane -----------------------------------------------------------------------------------
+
+class _SDStripeLane(LiteXModule):
+    """Stripe Lane
+
+    Transfer the lane's share of a striped transfer to/from one SDCard (through its SDCore Cmd Port)
+    with a single Multiple blocks Cmd (CMD25/CMD18) followed by CMD12, buffering Data in a FIFO.
+
+    On error, the remaining Data is still consumed (writes) or produced as zeroes (reads) so the
+    striped stream keeps its length.
+    """
+    def __init__(self, port, fifo_depth):
+        self.port  = port
+        self.go    = Signal()   # i
+        self.write = Signal()   # i
+        self.block = Signal(32) # i
+        self.count = Signal(32) # i
+        self.idle  = Signal()   # o
+        self.error = Signal()   # o
+
+        self.fifo = fifo = stream.SyncFIFO([("data", 8)], fifo_depth, buffered=True)
+
+        # # #
+
+        block = Signal(32)
+        count = Signal(32)
+        level = Signal(32 + 9)
+
+        # Cmd.
+        stop = Signal()
+        self.comb += [
+            port.cmd.argument.eq(block),
+            port.cmd.block_length.eq(512),
+            port.cmd.crc.eq(1),
+            If(stop,
+                port.cmd.cmd.eq(12), # STOP_TRANSMISSION.
+                port.cmd.cmd_type.eq(SDCARD_CTRL_RESPONSE_SHORT_BUSY),
+                port.cmd.data_type.eq(SDCARD_CTRL_DATA_TRANSFER_NONE),
+            ).Else(
+                port.cmd.cmd.eq(Mux(self.write, 25, 18)), # WRITE/READ_MULTIPLE_BLOCK.
+                port.cmd.cmd_type.eq(SDCARD_CTRL_RESPONSE_SHORT),
+                port.cmd.data_type.eq(Mux(self.write,
+                    SDCARD_CTRL_DATA_TRANSFER_WRITE,
+                    SDCARD_CTRL_DATA_TRANSFER_READ)),
+                port.cmd.block_count.eq(count),
+            )
+        ]
+
+        # FSM.
+        self.fsm = fsm = FSM(reset_state="IDLE")
+        fsm.act("IDLE",
+            self.idle.eq(1),
+            If(self.go,
+                NextValue(block, self.block),
+                NextValue(count, self.count),
+                NextValue(level, 0),
+                NextValue(self.error, 0),
+                If(self.count != 0,
+                    NextState("CMD")
+                )
+            )
+        )
+        fsm.act("CMD",
+            port.cmd.valid.eq(1),
+            If(port.cmd.ready,
+                NextState("DATA")
+            )
+        )
+        fsm.act("DATA",
+            If(self.write,
+                fifo.source.connect(port.sink, omit={"first", "last"}),
+                If(port.sink.valid & port.sink.ready,
+                    NextValue(level, level + 1)
+                )
+            ).Else(
+                port.source.connect(fifo.sink),
+                If(port.source.valid & port.source.ready,
+                    NextValue(level, level + 1)
+                )
+            ),
+            If(port.done,
+                NextValue(self.error, port.error),
+                NextState("STOP-CMD")
+            )
+        )
+        fsm.act("STOP-CMD",
+            stop.eq(1),
+            port.cmd.valid.eq(1),
+            If(port.cmd.ready,
+                NextState("STOP-WAIT")
+            )
+        )
+        fsm.act("STOP-WAIT",
+            If(port.done,
+                If(port.error,
+                    NextValue(self.error, 1)
+                ),
+                NextState("FLUSH")
+            )
+        )
+        fsm.act("FLUSH",
+            # Consume/Produce the remaining Data (on error).
+            If(level == (count << 9),
+                NextState("IDLE")
+            ).Elif(self.write,
+                fifo.source.ready.eq(1),
+                If(fifo.source.valid,
+                    NextValue(level, level + 1)
+                )
+            ).Else(
+                fifo.sink.valid.eq(1),
+                fifo.sink.data.eq(0),
+                fifo.sink.first.eq(level[:9] == 0),
+                fifo.sink.last.eq(level[:9] == (512 - 1)),
+                If(fifo.sink.ready,
+                    NextValue(level, level + 1)
+                )
+            )
+        )
+
+# SD Stripe ----------------------------------------------------------------------------------------
+
+class SDStripe(LiteXModule):
+    """Stripe (RAID-0)
+
+    Expose several SDCards (one SDCore Cmd Port each) as a single block device: logical blocks are
+    distributed over the cards by stripes of 2**stripe blocks (stripe n on card n % ncards), so
+    a transfer is split into one Multiple blocks transfer per card, all running concurrently.
+
+    Data is written from sink (demultiplexed to the cards) and read on source (reassembled from the
+    cards), to be connected to the DMAs in place of the SDCore's. Each card buffers its Data in a
+    FIFO of fifo_depth bytes: transfers are fully parallel with stripes up to fifo_depth bytes,
+    larger stripes partially serialize the cards.
+
+    The SDCards must be initialized by software (and use block addressing, ie SDHC/SDXC) before
+    starting transfers; software must not use the SDCores' CSRs while a transfer is ongoing.
+    """
+    def __init__(self, ports, fifo_depth=2048):
+        ncards = len(ports)
+        assert ncards in [2, 4, 8]
+        assert fifo_depth >= 512
+        self.ports  = ports
+        self.sink   = stream.Endpoint([("data", 8)])
+        self.source = stream.Endpoint([("data", 8)])
+        self.irq    = Signal()
+
+        self.block  = CSRStorage(32, description="Logical Block of the transfer.")
+        self.count  = CSRStorage(32, description="Number of Logical Blocks of the transfer.")
+        self.stripe = CSRStorage(5, reset=log2_int(fifo_depth//512),
+            description="Stripe size (log2, in blocks).")
+        self.read   = CSR()
+        self.write  = CSR()
+        self.status = CSRStatus(fields=[
+            CSRField("done",  size=1, description="Transfer has been executed."),
+            CSRField("error", size=1, description="Transfer has failed due to error(s) on one or more cards."),
+        ])
+        self.reads  = CSRStatus(32, description="Blocks read (all cards, successful transfers).")
+        self.writes = CSRStatus(32, description="Blocks written (all cards, successful transfers).")
+        self.errors = CSRStatus(32, description="Transfers failed (blocks not counted in reads/writes).")
+
+        # # #
+
+        k = self.stripe.storage
+        n = log2_int(ncards)
+
+        # Lanes.
+        self.lanes = lanes = []
+        for i, port in enumerate(ports):
+            lane = _SDStripeLane(port, fifo_depth)
+            self.add_module(name=f"lane{i}", module=lane)
+            lanes.append(lane)
+
+        # Lane Blocks: Card i stores Logical Blocks of stripes i, i + ncards, ... at contiguous Card
+        # Blocks, so its share of a transfer is the range [blocks(start), blocks(end)) with
+        # blocks(x) the number of its Logical Blocks below x.
+        start = Signal(33)
+        end   = Signal(33)
+        self.comb += [
+            start.eq(self.block.storage),
+            end.eq(self.block.storage + self.count.storage),
+        ]
+        def blocks(x, i):
+            row  = Signal(33)
+            rem  = Signal(33)
+            part = Signal(33)
+            self.comb += [
+                row.eq(x >> (k + n)),
+                rem.eq(x - (row << (k + n))),
+                If(rem <= (i << k),
+                    part.eq(0)
+                ).Elif(rem >= ((i + 1) << k),
+                    part.eq(1 << k)
+                ).Else(
+                    part.eq(rem - (i << k))
+                )
+            ]
+            return (row << k) + part
+        for i, lane in enumerate(lanes):
+            lane_start = Signal(32)
+            self.comb += [
+                lane_start.eq(blocks(start, i)),
+                lane.block.eq(lane_start),
+                lane.count.eq(blocks(end, i) - lane_start),
+            ]
+
+        # Data (De)Multiplexing: stripe by stripe, in Logical Blocks order.
+        write     = Signal()
+        sel       = Signal(n)
+        remaining = Signal(32 + 9) # Bytes left in current stripe.
+        total     = Signal(32 + 9) # Bytes left in transfer.
+        active    = Signal()
+        handshake = Signal()
+        for i, lane in enumerate(lanes):
+            self.comb += [
+                lane.write.eq(write),
+                If(active & (sel == i),
+                    If(write,
+                        self.sink.connect(lane.fifo.sink, omit={"first", "last"})
+                    ).Else(
+                        lane.fifo.source.connect(self.source)
+                    )
+                )
+            ]
+        self.comb += [
+            active.eq(total != 0),
+            If(write,
+                handshake.eq(self.sink.valid & self.sink.ready)
+            ).Else(
+                handshake.eq(self.source.valid & self.source.ready)
+            )
+        ]
+        self.sync += [
+            If(handshake,
+                total.eq(total - 1),
+                remaining.eq(remaining - 1),
+                If(remaining == 1,
+                    sel.eq(sel + 1),
+                    remaining.eq((1 << k) << 9)
+                )
+            )
+        ]
+
+        # Stats.
+        reads  = self.reads.status
+        writes = self.writes.status
+        errors = self.errors.status
+
+        # Status.
+        done  = Signal(reset=1)
+        error = Signal()
+        self.comb += [
+            self.status.fields.done.eq(done),
+            self.status.fields.error.eq(error),
+        ]
+
+        # FSM.
+        lanes_error = Signal()
+        self.comb += lanes_error.eq(Reduce("OR", [lane.error for lane in lanes]))
+        self.fsm = fsm = FSM(reset_state="IDLE")
+        fsm.act("IDLE",
+            If((self.read.wr_stb | self.write.wr_stb) & (self.count.storage != 0),
+                [lane.go.eq(1) for lane in lanes],
+                NextValue(write, self.write.wr_stb),
+                NextValue(sel, self.block.storage >> k),
+                NextValue(remaining, ((1 << k) - (self.block.storage & ((1 << k) - 1))) << 9),
+                NextValue(total, self.count.storage << 9),
+                NextValue(done,  0),
+                NextValue(error, 0),
+                NextState("RUN")
+            )
+        )
+        fsm.act("RUN",
+            If(~active & Reduce("AND", [lane.idle for lane in lanes]),
+                NextValue(done,  1),
+                NextValue(error, lanes_error),
+                If(lanes_error,
+                    NextValue(errors, errors + 1)
+                ).Elif(write,
+                    NextValue(writes, writes + self.count.storage)
+                ).Else(
+                    NextValue(reads, reads + self.count.storage)
+                ),
+                self.irq.eq(1),
+                NextState("IDLE")
+            )
+        )
@@ -0,0 +1,184 @@
+#
+# This file is part of LiteSDCard.
+#
+# Copyright (c) 2026 Florent Kermarrec <florent@enjoy-digital.fr>
+# SPDX-License-Identifier: BSD-2-Clause
+
+from migen import *
+
+from litex.gen import *
+
+from litex.soc.interconnect.csr import *
+from litex.soc.interconnect import wishbone
+
+from litesdcard.common import *
+
+# SD Block Window ----------------------------------------------------------------------------------
+
+class SDBlockWindow(LiteXModule):
+    """Block Window
+
+    Expose the SDCard as a read-only memory on a Wishbone slave: a load from
+    base + lba*512 + offset returns the data of the SDCard at block (lba + block_base), offset.
+
+    Blocks are fetched from the SDCard (through the SDCore Cmd Port) on cache miss and stored in a
+    small fully-associative line cache (one 512-bytes block per line, round-robin replacement). When
+    enabled, the next block is also prefetched on each hit to speed up sequential accesses.
+
+    The SDCard must be initialized by software (and use block addressing, ie SDHC/SDXC) before
+    enabling the window. Accesses when disabled, writes and failed fetches return a bus error.
+    """
+    def __init__(self, port, nlines=4, with_readahead=True):
+        assert nlines in [2, 4, 8, 16]
+        self.port = port
+        self.bus  = bus = wishbone.Interface(data_width=32)
+
+        self.enable     = CSRStorage(description="Enable Window (once SDCard is initialized).")
+        self.block_base = CSRStorage(32, description="SDCard Block mapped at the Window's base.")
+        self.flush      = CSR()
+        self.hits       = CSRStatus(32, description="Cache Hits.")
+        self.misses     = CSRStatus(32, description="Cache Misses.")
+
+        # # #
+
+        words = 512//4
+        index = Signal(log2_int(nlines))
+
+        # Line Cache.
+        mem = Memory(32, nlines*words)
+        self.specials += mem
+        rd_port = mem.get_port()
+        wr_port = mem.get_port(write_capable=True)
+        self.specials += rd_port, wr_port
+
+        tags  = [Signal(32) for _ in range(nlines)]
+        valid = [Signal()   for _ in range(nlines)]
+
+        # Lookup.
+        lba = Signal(32)
+        hit = Signal()
+        self.comb += lba.eq(self.block_base.storage + bus.adr[log2_int(words):])
+        for i in range(nlines):
+            self.comb += If(valid[i] & (tags[i] == lba), hit.eq(1), index.eq(i))
+        self.comb += rd_port.adr.eq(Cat(bus.adr[:log2_int(words)], index))
+
+        # Fill.
+        victim      = Signal(log2_int(nlines))
+        fill_lba    = Signal(32)
+        fill_count  = Signal(log2_int(512) + 1)
+        fill_data   = Signal(32)
+        fill_ahead  = Signal()
+        ahead_lba   = Signal(32)
+        ahead_valid = Signal()
+        ahead_hit   = Signal()
+        filled      = Signal() # Access already counted (as a miss), block just filled.
+        for i in range(nlines):
+            self.comb += If(valid[i] & (tags[i] == ahead_lba), ahead_hit.eq(1))
+
+        self.comb += [
+            port.cmd.argument.eq(fill_lba),
+            port.cmd.cmd.eq(17), # READ_SINGLE_BLOCK.
+            port.cmd.cmd_type.eq(SDCARD_CTRL_RESPONSE_SHORT),
+            port.cmd.crc.eq(1),
+            port.cmd.data_type.eq(SDCARD_CTRL_DATA_TRANSFER_READ),
+            port.cmd.block_length.eq(512),
+            port.cmd.block_count.eq(1),
+            wr_port.adr.eq(Cat(fill_count[2:log2_int(512)], victim)),
+            wr_port.dat_w.eq(Cat(fill_data[8:], port.source.data)),
+        ]
+
+        # Stats.
+        hits   = self.hits.status
+        misses = self.misses.status
+
+        # Line Invalidation/Update.
+        invalidate = Signal()
+        update     = Signal()
+        for i in range(nlines):
+            self.sync += [
+                If(self.flush.wr_stb,
+                    valid[i].eq(0)
+                ).Elif(invalidate & (victim == i),
+                    valid[i].eq(0)
+                ).Elif(update & (victim == i),
+                    valid[i].eq(1),
+                    tags[i].eq(fill_lba)
+                )
+            ]
+
+        # FSM.
+        self.fsm = fsm = FSM(reset_state="IDLE")
+        fsm.act("IDLE",
+            If(self.flush.wr_stb,
+                NextValue(ahead_valid, 0)
+            ).Elif(bus.cyc & bus.stb,
+                If(~self.enable.storage | bus.we,
+                    NextState("ERROR")
+                # On Hit: Read Line Cache and prefetch next block (if not already cached).
+                ).Elif(hit,
+                    If(~filled,
+                        NextValue(hits, hits + 1)
+                    ),
+                    NextValue(ahead_lba, lba + 1),
+                    NextValue(ahead_valid, int(with_readahead)),
+                    NextState("READ")
+                # On Miss: Fetch block.
+                ).Else(
+                    NextValue(misses, misses + 1),
+                    NextValue(fill_lba, lba),
+                    NextValue(fill_ahead, 0),
+                    invalidate.eq(1),
+                    NextState("FILL-CMD")
+                )
+            # Prefetch when idle.
+            ).Elif(self.enable.storage & ahead_valid,
+                NextValue(ahead_valid, 0),
+                If(~ahead_hit,
+                    NextValue(fill_lba, ahead_lba),
+                    NextValue(fill_ahead, 1),
+                    invalidate.eq(1),
+                    NextState("FILL-CMD")
+                )
+            )
+        )
+        fsm.act("READ",
+            bus.ack.eq(1),
+            bus.dat_r.eq(rd_port.dat_r),
+            NextValue(filled, 0),
+            NextState("IDLE")
+        )
+        fsm.act("FILL-CMD",
+            NextValue(fill_count, 0),
+            port.cmd.valid.eq(1),
+            If(port.cmd.ready,
+                NextState("FILL-DATA")
+            )
+        )
+        fsm.act("FILL-DATA",
+            # Receive Block and write it to the Line Cache (little-endian).
+            port.source.ready.eq(1),
+            If(port.source.valid & (fill_count < 512),
+                NextValue(fill_data, wr_port.dat_w),
+                NextValue(fill_count, fill_count + 1),
+                wr_port.we.eq(fill_count[:2] == (4 - 1))
+            ),
+            If(port.done,
+                If(port.error | (fill_count != 512),
+                    If(fill_ahead,
+                        NextState("IDLE")
+                    ).Else(
+                        NextState("ERROR")
+                    )
+                ).Else(
+                    update.eq(1),
+                    NextValue(victim, victim + 1),
+                    NextValue(filled, ~fill_ahead),
+                    NextState("IDLE")
+                )
+            )
+        )
+        fsm.act("ERROR",
+            bus.err.eq(1),
+            NextValue(filled, 0),
+            NextState("IDLE")
+        )
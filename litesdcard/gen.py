@@ -15,113 +15,170 @@ for some use cases it could be interesting to generate a standalone verilog file
 - need to version/package the core.
 - avoid Migen/LiteX dependencies.
 - etc...
+
+The core is configured from a YAML file (see default_config for the parameters) and/or command line
+arguments. Generation is skipped when the configuration and LiteSDCard/LiteX/Migen sources are
+unchanged since the last build in the output directory (cached build, see --force).
+
+Ex: litesdcard_gen --config litesdcard.yml --output-dir build
+
+Migen/LiteX are only imported when the core is generated (see litesdcard.standalone), so the
+generator starts quickly, in particular for cached builds.
 """
 
+import os
+import json
+import hashlib
 import argparse
-
-from migen import *
-
-from litex.gen import *
-
-from litex.build.generic_platform import *
-from litex.build.xilinx.platform import XilinxPlatform
-from litex.build.altera.platform import AlteraPlatform
-from litex.build.lattice.platform import LatticePlatform
-
-from litex.soc.interconnect import wishbone
-from litex.soc.integration.soc import SoCBusHandler, SoCRegion
-from litex.soc.integration.soc import *
-from litex.soc.integration.builder import *
-
-# IOs ----------------------------------------------------------------------------------------------
-
-_io = [
-    # Clk / Rst.
-    ("clk", 0, Pins(1)),
-    ("rst", 1, Pins(1)),
-
-    # Interrupt
-    ("irq", 0, Pins(1)),
-
-    # SDCard Pads.
-    ("sdcard", 0,
-        Subsignal("data", Pins(4)), # Note: Requires Pullup (internal or external).
-        Subsignal("cmd",  Pins(1)), # Note: Requires Pullup (internal or external).
-        Subsignal("clk",  Pins(1)),
-        Subsignal("cd",   Pins(1)),
-        Subsignal("cmd_dir",   Pins(1)),
-        Subsignal("dat0_dir",  Pins(1)),
-        Subsignal("dat13_dir", Pins(1)),
-    ),
-]
-
-# LiteSDCard Core ----------------------------------------------------------------------------------
-
-class LiteSDCardCore(SoCMini):
-    def __init__(self, platform, clk_freq=int(100e6), dma_data_width=32):
-        # CRG --------------------------------------------------------------------------------------
-        self.crg = CRG(platform.request("clk"), platform.request("rst"))
-
-        # SoCMini ----------------------------------------------------------------------------------
-        SoCMini.__init__(self, platform, clk_freq=clk_freq, bus_data_width=dma_data_width)
-
-        # Wishbone Control -------------------------------------------------------------------------
-        # Create Wishbone Control Slave interface, expose it and connect it to the SoC.
-        wb_ctrl = wishbone.Interface()
-        self.bus.add_master(name="wb_ctrl", master=wb_ctrl)
-        platform.add_extension(wb_ctrl.get_ios("wb_ctrl"))
-        self.comb += wb_ctrl.connect_to_pads(self.platform.request("wb_ctrl"), mode="slave")
-
-        # Wishbone DMA -----------------------------------------------------------------------------
-        # Create Wishbone DMA Master interface and expose it.
-        wb_dma = wishbone.Interface(data_width=dma_data_width)
-        platform.add_extension(wb_dma.get_ios("wb_dma"))
-        self.comb += wb_dma.connect_to_pads(self.platform.request("wb_dma"), mode="master")
-
-        # Create DMA Bus Handler (DMAs will be added by add_sdcard to it) and connect it to Wishbone DMA.
-        self.dma_bus = SoCBusHandler(
-            name             = "SoCDMABusHandler",
-            standard         = "wishbone",
-            data_width       = dma_data_width,
-            address_width    = 32,
-        )
-        self.dma_bus.add_slave("dma", slave=wb_dma, region=SoCRegion(origin=0x00000000, size=0x100000000))
-
-        # SDCard -----------------------------------------------------------------------------------
-        # Simply integrate SDCard through LiteX's add_sdcard method.
-        self.add_sdcard(name="sdcard")
-
-        # IRQ
-        irq_pad = platform.request("irq")
-        self.comb += irq_pad.eq(self.sdcard.ev.irq)
+import importlib
+import importlib.util
+
+# Config -------------------------------------------------------------------------------------------
+
+default_config = {
+    "clk_freq"       : 100e6,    # Input Clk Frequency.
+    "vendor"         : "xilinx", # FPGA Vendor (xilinx, altera, intel, lattice).
+    "dma_data_width" : 32,       # Wishbone DMA data width (DMAs stream width).
+    "phy" : {
+        "data_width"       : 4,     # SDCard pads Data width (4 or 8).
+        "fixed_data_width" : None,  # Only generate logic for this Data width (1, 4 or 8, None: dynamic).
+        "with_retiming"    : False, # Register pads outputs/CRCs (improves fmax, +1 cycle latency).
+        "cmd_timeout"      : 1.0,   # Cmd timeout (s).
+        "data_timeout"     : 1.0,   # Data timeout (s).
+    },
+    "core" : {
+        "with_retry" : False, # Hardware Cmd/Data retries.
+    },
+    "dma" : {
+        "mode"              : "read+write", # DMAs (read, write or read+write).
+        "fifo_depth"        : 512,          # Block2Mem/Mem2Block FIFOs depth (bytes).
+        "reader_fifo_depth" : 16,           # Mem2Block memory reads in flight.
+    },
+    "instrumentation" : False, # Export SDScope events (litesdcard.scope) on sdscope pads.
+}
+
+def load_config(filename=None, **overrides):
+    """Load a YAML config (merged with default_config), overrides applied on top level parameters."""
+    import yaml
+    config = {}
+    if filename is not None:
+        with open(filename) as f:
+            config = yaml.safe_load(f) or {}
+    config.update({k: v for k, v in overrides.items() if v is not None})
+    return _merge(default_config, config)
+
+def _merge(defaults, config, path=""):
+    unknown = set(config) - set(defaults)
+    if unknown:
+        raise ValueError("Unknown config parameter(s): {}.".format(
+            ", ".join(path + k for k in sorted(unknown))))
+    merged = {}
+    for k, v in defaults.items():
+        if isinstance(v, dict):
+            merged[k] = _merge(v, config.get(k) or {}, path + k + ".")
+        else:
+            merged[k] = config.get(k, v)
+    return merged
+
+# Cache --------------------------------------------------------------------------------------------
+
+def config_hash(config):
+    """Hash of the config and LiteSDCard/LiteX/Migen sources."""
+    # LiteX/Migen are located, not imported.
+    packages  = [os.path.dirname(__file__)]
+    packages += [os.path.dirname(importlib.util.find_spec(name).origin) for name in ["litex", "migen"]]
+    h = hashlib.sha256()
+    h.update(json.dumps(config, sort_keys=True).encode())
+    for package in packages:
+        for root, dirs, files in sorted(os.walk(package)):
+            dirs.sort()
+            for f in sorted(files):
+                if f.endswith(".py"):
+                    h.update(os.path.relpath(os.path.join(root, f), package).encode())
+                    with open(os.path.join(root, f), "rb") as fd:
+                        h.update(fd.read())
+    return h.hexdigest()
+
+def cached(output_dir, hash):
+    """Check if a build of the core with this hash is available in output_dir."""
+    try:
+        with open(os.path.join(output_dir, "litesdcard_gen.json")) as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return False
+    verilog = os.path.join(output_dir, "gateware", "litesdcard_core.v")
+    return (cache.get("hash") == hash) and os.path.exists(verilog)
+
+
+# Platforms ----------------------------------------------------------------------------------------
+
+_platforms = {
+    "xilinx"  : ("litex.build.xilinx.platform",  "XilinxPlatform"),
+    "altera"  : ("litex.build.altera.platform",  "AlteraPlatform"),
+    "intel"   : ("litex.build.altera.platform",  "AlteraPlatform"),
+    "lattice" : ("litex.build.lattice.platform", "LatticePlatform"),
+}
+
+def get_platform_cls(vendor):
+    """Import (only) the platform of vendor."""
+    module, name = _platforms[vendor]
+    return getattr(importlib.import_module(module), name)
+
+# Standalone core (imported on first use) ----------------------------------------------------------
+
+def __getattr__(name):
+    if name in ["LiteSDCardCore", "get_io"]:
+        from litesdcard import standalone
+        return getattr(standalone, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Build --------------------------------------------------------------------------------------------
 
-def main():
+def main(argv=None):
     parser = argparse.ArgumentParser(description="LiteSDCard standalone core generator.")
-    parser.add_argument("--clk-freq",       default="100e6",  help="Input Clk Frequency.")
-    parser.add_argument("--vendor",         default="xilinx", help="FPGA Vendor.")
-    parser.add_argument("--dma-data-width", default=32,        help="Wishbone DMA data width.")
-    args = parser.parse_args()
+    parser.add_argument("--config",         default=None,    help="YAML config file.")
+    parser.add_argument("--clk-freq",       default=None,    help="Input Clk Frequency (default: 100e6).")
+    parser.add_argument("--vendor",         default=None,    help="FPGA Vendor (default: xilinx).")
+    parser.add_argument("--dma-data-width", default=None,    help="Wishbone DMA data width (default: 32).")
+    parser.add_argument("--output-dir",     default="build", help="Output directory.")
+    parser.add_argument("--force",          action="store_true", help="Regenerate even if a cached build matches.")
+    args = parser.parse_args(argv)
 
     # Convert/Check Arguments ----------------------------------------------------------------------------
-    clk_freq       = int(float(args.clk_freq))
-    dma_data_width = int(args.dma_data_width)
-    if dma_data_width not in SoCBusHandler.supported_data_width:
-        raise ValueError("Wishbone DMA data width must be one of: {}.".format(
-            ", ".join(str(data_width) for data_width in SoCBusHandler.supported_data_width)))
-    platform_cls   = {
-        "xilinx"  : XilinxPlatform,
-        "altera"  : AlteraPlatform,
-        "intel"   : AlteraPlatform,
-        "lattice" : LatticePlatform
-    }[args.vendor]
+    config = load_config(args.config,
+        clk_freq       = args.clk_freq,
+        vendor         = args.vendor,
+        dma_data_width = args.dma_data_width)
+    config["clk_freq"]       = int(float(config["clk_freq"]))
+    config["dma_data_width"] = int(config["dma_data_width"])
+    if config["vendor"] not in _platforms:
+        raise ValueError("FPGA Vendor must be one of: {}.".format(", ".join(_platforms)))
+    if config["phy"]["data_width"] not in [4, 8]:
+        raise ValueError("PHY data width must be 4 or 8.")
+
+    # Cache ----------------------------------------------------------------------------------------
+    hash = config_hash(config)
+    if not args.force and cached(args.output_dir, hash):
+        print(f"LiteSDCard core up to date in {args.output_dir} ({hash[:16]}), skipping generation.")
+        return
 
     # Generate core --------------------------------------------------------------------------------
-    platform = platform_cls(device="", io=_io)
-    core     = LiteSDCardCore(platform, clk_freq=clk_freq, dma_data_width=dma_data_width)
-    builder  = Builder(core, output_dir="build")
+    from litex.soc.integration.soc import SoCBusHandler
+    from litex.soc.integration.builder import Builder
+    from litesdcard.standalone import LiteSDCardCore, get_io
+    if config["dma_data_width"] not in SoCBusHandler.supported_data_width:
+        raise ValueError("Wishbone DMA data width must be one of: {}.".format(
+            ", ".join(str(data_width) for data_width in SoCBusHandler.supported_data_width)))
+    platform_cls = get_platform_cls(config["vendor"])
+    platform     = platform_cls(device="", io=get_io(config["phy"]["data_width"]))
+    core         = LiteSDCardCore(platform,
+        clk_freq       = config["clk_freq"],
+        dma_data_width = config["dma_data_width"],
+        config         = config)
+    builder      = Builder(core, output_dir=args.output_dir)
     builder.build(build_name="litesdcard_core", run=False)
+    with open(os.path.join(args.output_dir, "litesdcard_gen.json"), "w") as f:
+        json.dump({"hash": hash, "config": config}, f, indent=4)
 
 if __name__ == "__main__":
     main()
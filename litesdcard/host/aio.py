@@ -0,0 +1,198 @@
+#
+# This file is part of LiteSDCard.
+#
+# Copyright (c) 2026 Florent Kermarrec <florent@enjoy-digital.fr>
+# SPDX-License-Identifier: BSD-2-Clause
+
+"""
+LiteSDCard asyncio host driver
+
+asyncio version of the host driver (litesdcard.host.driver) to drive many bench boards concurrently
+over Etherbone/UDP (LiteEth Etherbone core):
+- AsyncEtherbone: Etherbone/UDP client with pipelined reads (several reads in flight, matched on
+  their return address), retries on timeout and fire-and-forget writes.
+- AsyncSDCardDriver: SDCardDriver with awaitable Cmds/DMAs/Blocks/BIST accesses (same sequences,
+  reads awaited), so polling of the Cmd/Data events and DMA done of many targets overlap.
+- run_bist: concurrent BIST runs on several targets with aggregated results.
+
+Usage:
+    async def main():
+        buses   = [AsyncEtherbone(ip, csr_csv="csr.csv") for ip in ips]
+        drivers = [AsyncSDCardDriver(await bus.open()) for bus in buses]
+        print(await run_bist(drivers, count=64))
+    asyncio.run(main())
+"""
+
+import time
+import asyncio
+
+from litex.tools.remote.etherbone import EtherbonePacket, EtherboneRecord
+from litex.tools.remote.etherbone import EtherboneReads, EtherboneWrites
+from litex.tools.remote.csr_builder import CSRBuilder
+
+from litesdcard.host.driver import MAX_BURST, CSRBatch, SDCardDriver
+
+# Etherbone/UDP ------------------------------------------------------------------------------------
+
+class AsyncEtherbone(asyncio.DatagramProtocol, CSRBuilder):
+    """Etherbone/UDP client (RemoteClient API with awaitable reads).
+
+    Each read record is tagged with a unique return address, so up to window reads can be in flight
+    and responses matched even when reordered. Reads are retried on timeout; writes are not
+    acknowledged by Etherbone and are just sent (in order with the reads).
+    """
+    def __init__(self, host="192.168.1.50", port=1234, csr_csv="csr.csv", base_address=0,
+        timeout = 0.5,
+        retries = 4,
+        window  = 16):
+        CSRBuilder.__init__(self, self, csr_csv)
+        self.host         = host
+        self.port         = port
+        self.base_address = base_address
+        self.timeout      = timeout
+        self.retries      = retries
+        self.window       = window
+        self.transport    = None
+        self.pending      = {}
+        self.tag          = 0
+        self.retried      = 0
+
+    async def open(self):
+        loop = asyncio.get_running_loop()
+        await loop.create_datagram_endpoint(lambda: self, remote_addr=(self.host, self.port))
+        self.semaphore = asyncio.Semaphore(self.window)
+        return self
+
+    def close(self):
+        if self.transport is not None:
+            self.transport.close()
+            self.transport = None
+
+    # Protocol -------------------------------------------------------------------------------------
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        packet = EtherbonePacket(self.csr_bus_address_width, data)
+        packet.decode()
+        record = packet.records.pop()
+        if record.writes is None:
+            return
+        future = self.pending.pop(record.writes.base_addr, None)
+        if future is not None and not future.done():
+            future.set_result(record.writes.get_datas())
+
+    # Accesses -------------------------------------------------------------------------------------
+
+    def write(self, addr, datas):
+        datas     = datas if isinstance(datas, list) else [datas]
+        addr_size = self.csr_bus_address_width//8
+        record = EtherboneRecord(addr_size)
+        record.writes = EtherboneWrites(addr_size=addr_size, base_addr=self.base_address + addr, datas=datas)
+        record.wcount = len(record.writes)
+        self._send(record)
+
+    async def read(self, addr, length=None):
+        datas = await self.read_addrs([addr + 4*i for i in range(1 if length is None else length)])
+        return datas[0] if length is None else datas
+
+    async def read_addrs(self, addrs):
+        """Read arbitrary addresses (bursts of MAX_BURST issued concurrently)."""
+        chunks = [addrs[i:i + MAX_BURST] for i in range(0, len(addrs), MAX_BURST)]
+        datas  = await asyncio.gather(*[self._read(chunk) for chunk in chunks])
+        return sum(datas, [])
+
+    async def _read(self, addrs):
+        addr_size = self.csr_bus_address_width//8
+        loop      = asyncio.get_running_loop()
+        async with self.semaphore:
+            for retry in range(self.retries):
+                self.tag = (self.tag + 1) % 2**(8*addr_size)
+                record = EtherboneRecord(addr_size)
+                record.reads  = EtherboneReads(addr_size=addr_size, base_ret_addr=self.tag,
+                    addrs=[self.base_address + addr for addr in addrs])
+                record.rcount = len(record.reads)
+                future = loop.create_future()
+                self.pending[self.tag] = future
+                self._send(record)
+                try:
+                    return await asyncio.wait_for(future, self.timeout)
+                except asyncio.TimeoutError:
+                    self.pending.pop(record.reads.base_ret_addr, None)
+                    self.retried += 1
+        raise TimeoutError(f"{self.host}: Etherbone read timeout.")
+
+    def _send(self, record):
+        packet = EtherbonePacket(self.csr_bus_address_width)
+        packet.records = [record]
+        packet.encode()
+        self.transport.sendto(packet.bytes)
+
+# CSR Batch ----------------------------------------------------------------------------------------
+
+class AsyncCSRBatch(CSRBatch):
+    async def read_words(self, addrs):
+        self.flush()
+        return await self.bus.read_addrs(addrs)
+
+    async def read(self, *regs):
+        addrs = sum([self._words(reg) for reg in regs], [])
+        return self._unpack(regs, await self.read_words(addrs))
+
+# SDCard Driver ------------------------------------------------------------------------------------
+
+class AsyncSDCardDriver(SDCardDriver):
+    """SDCardDriver with awaitable Cmds/DMAs/Blocks/BIST accesses (see SDCardDriver).
+
+    The SDCardDriver sequences are run with their CSR reads awaited, so every SDCardDriver method
+    doing reads (cmd, acmd, init, set_bus_width, mem_read, read, write, bist, bist_gateware) returns
+    a coroutine here; writes-only methods (set_divider, set_data_width, mem_write...) are unchanged.
+    """
+    def __init__(self, bus, **kwargs):
+        SDCardDriver.__init__(self, bus, **kwargs)
+        self.batch = AsyncCSRBatch(bus)
+
+    async def _run(self, sequence):
+        try:
+            request = next(sequence)
+            while True:
+                method, args = request
+                request = sequence.send(await getattr(self.batch, method)(*args))
+        except StopIteration as e:
+            return e.value
+
+# Concurrent BIST ----------------------------------------------------------------------------------
+
+async def run_bist(drivers, init=True, **kwargs):
+    """Run BISTs concurrently on drivers (initialized first with init), returns aggregated results.
+
+    Per-target results are returned in targets (with error set on failure); write/read speeds are
+    the aggregated throughputs over the whole run.
+    """
+    async def _run(driver):
+        if init:
+            await driver.init()
+        return await driver.bist(**kwargs)
+
+    start   = time.time()
+    results = await asyncio.gather(*[_run(driver) for driver in drivers], return_exceptions=True)
+    duration = time.time() - start
+
+    targets = []
+    for driver, result in zip(drivers, results):
+        if isinstance(result, Exception):
+            result = {"error": str(result) or type(result).__name__}
+        targets.append(dict(target=getattr(driver.bus, "host", None), **result))
+    passed = [t for t in targets if "error" not in t]
+    nbytes = sum(t["bytes"] for t in passed)
+    return {
+        "targets"     : targets,
+        "passed"      : sum(t["errors"] == 0 for t in passed),
+        "failed"      : len(targets) - sum(t["errors"] == 0 for t in passed),
+        "bytes"       : nbytes,
+        "errors"      : sum(t["errors"] for t in passed),
+        "duration"    : duration,
+        "write_speed" : sum(t["write_speed"] for t in passed),
+        "read_speed"  : sum(t["read_speed"]  for t in passed),
+    }
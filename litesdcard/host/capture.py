@@ -0,0 +1,117 @@
+#
+# This file is part of LiteSDCard.
+#
+# Copyright (c) 2026 Florent Kermarrec <florent@enjoy-digital.fr>
+# SPDX-License-Identifier: BSD-2-Clause
+
+"""
+LiteSDCard UDP capture
+
+Receives the samples streamed over UDP by the bench Sampler (LiteEthStream2UDPTX) at high rates:
+- Large socket receive buffer to absorb bursts.
+- Datagrams received directly into a preallocated (or memory-mapped file) buffer (no copies, no
+  per-packet allocations).
+- Sequence gaps detection on the Sampler pattern (incrementing counter).
+- Decoding of the Sampler Run-Length Encoder records.
+"""
+
+import time
+import socket
+
+import numpy as np
+
+# UDP Capture --------------------------------------------------------------------------------------
+
+class UDPCapture:
+    def __init__(self, ip="192.168.1.100", port=2000, rcvbuf=64*1024*1024, timeout=1.0):
+        self.ip      = ip
+        self.port    = port
+        self.rcvbuf  = rcvbuf
+        self.timeout = timeout
+        self.sock    = None
+
+    def open(self):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self.rcvbuf)
+        self.sock.bind((self.ip, self.port))
+        self.sock.settimeout(self.timeout)
+
+    def close(self):
+        self.sock.close()
+        self.sock = None
+
+    def capture(self, sample_count, filename=None, rle=False):
+        """Capture sample_count samples, returns (samples, stats).
+
+        Samples are stored in a NumPy array or, with filename, in a memory-mapped file. Capture stops
+        early on timeout (stats["samples"] then gives the number of received samples).
+
+        With rle, the capture is made of Run-Length Encoder records (see rle_decode) and stops when
+        the records cover sample_count samples (buffer sized for one record per sample, the worst
+        case). stats["samples"] then gives the number of received bytes.
+        """
+        capture_count = 4*sample_count if rle else sample_count
+        if filename is None:
+            samples = np.empty(capture_count, dtype=np.uint8)
+        else:
+            samples = np.memmap(filename, dtype=np.uint8, mode="w+", shape=(capture_count,))
+        view    = memoryview(samples).cast("B")
+        offset  = 0
+        packets = 0
+        start   = None
+        decoded = 0 # Samples covered by the received records (with rle).
+        while offset < capture_count:
+            try:
+                n = self.sock.recv_into(view[offset:])
+            except socket.timeout:
+                break
+            if start is None:
+                start = time.time()
+            if rle:
+                decoded += _rle_samples(samples[offset//4*4:(offset + n)//4*4])
+            offset  += n
+            packets += 1
+            if rle and decoded >= sample_count:
+                break
+        duration = 0 if start is None else time.time() - start
+        if filename is not None:
+            samples.flush()
+        stats = {
+            "samples"  : offset,
+            "packets"  : packets,
+            "duration" : duration,
+            "rate"     : offset/duration if duration else 0,
+            "complete" : (decoded >= sample_count) if rle else (offset == sample_count),
+        }
+        return samples[:offset], stats
+
+# Sequence Gaps ------------------------------------------------------------------------------------
+
+def pattern_gaps(samples, downsampling=1):
+    """Check a capture of the Sampler pattern (8-bit counter incremented every sys-clk cycle),
+    returns the indexes of the samples following a gap (lost/reordered data)."""
+    samples = np.asarray(samples, dtype=np.uint8)
+    step    = np.uint8(downsampling % 256)
+    return np.flatnonzero((samples[1:] - samples[:-1]) != step) + 1
+
+# Run-Length Decoding ------------------------------------------------------------------------------
+
+def _rle_samples(data):
+    # Number of samples covered by complete records.
+    records = np.frombuffer(data[:len(data)//4*4].tobytes(), dtype="<u4")
+    return int(((records >> 8).astype(np.int64) + 1).sum())
+
+def rle_decode(data, expand=False):
+    """Decode a capture of the Sampler Run-Length Encoder (32-bit records: value, run length - 1).
+
+    Returns (timestamps, values): sample index of each value change and its value, or the expanded
+    samples with expand. Incomplete trailing records are ignored.
+    """
+    data    = np.asarray(data, dtype=np.uint8)
+    records = np.frombuffer(data[:len(data)//4*4].tobytes(), dtype="<u4")
+    values  = (records & 0xff).astype(np.uint8)
+    runs    = (records >> 8).astype(np.int64) + 1
+    if expand:
+        return np.repeat(values, runs)
+    timestamps = np.concatenate([[0], np.cumsum(runs)[:-1]]).astype(np.int64)
+    return timestamps, values
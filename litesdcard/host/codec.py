@@ -0,0 +1,212 @@
+#
+# This file is part of LiteSDCard.
+#
+# Copyright (c) 2026 Florent Kermarrec <florent@enjoy-digital.fr>
+# SPDX-License-Identifier: BSD-2-Clause
+
+"""
+LiteSDCard SD bus reference codec
+
+Vectorized (NumPy) encoding/decoding of SD bus frames, used as a reference for simulations and
+offline analysis of captures:
+- Command frames (48-bit) with CRC7.
+- R1/R1b (48-bit) and R2 (136-bit) responses with CRC7 (R1b busy is signaled on DAT0 and is not
+  part of the frame).
+- 1/4/8-bit Data blocks with per-lane CRC16 and CRC status tokens.
+
+Frames are arrays of bits (one bit per SDCard Clk, as seen on CMD) and Data blocks arrays of
+lanes values (one value per SDCard Clk, bit n being DAT[n]). All functions operate on the last
+axis(es) and broadcast over leading dimensions, so thousands of frames/blocks can be processed at
+once.
+"""
+
+import functools
+
+import numpy as np
+
+# CRC ----------------------------------------------------------------------------------------------
+
+CRC7_POLYNOM  = 0x09
+CRC16_POLYNOM = 0x1021
+
+@functools.lru_cache(maxsize=None)
+def _crc_matrix(polynom, taps, length):
+    # CRC is linear (init=0): bit i of the message contributes x^(length - 1 - i + taps) mod P.
+    matrix = np.zeros((length, taps), dtype=np.int32)
+    r      = polynom
+    for i in reversed(range(length)):
+        matrix[i] = [(r >> j) & 1 for j in range(taps)]
+        r = ((r << 1) ^ (polynom if (r >> (taps - 1)) & 1 else 0)) & (2**taps - 1)
+    return matrix
+
+def crc(bits, polynom, taps):
+    """Compute the CRC of bits (..., n) (MSB first), returns (...) CRC values."""
+    bits   = np.asarray(bits, dtype=np.int32)
+    matrix = _crc_matrix(polynom, taps, bits.shape[-1])
+    return ((bits @ matrix) & 1) @ (1 << np.arange(taps, dtype=np.int64))
+
+def crc7(bits):
+    return crc(bits, CRC7_POLYNOM, 7)
+
+def crc16(bits):
+    return crc(bits, CRC16_POLYNOM, 16)
+
+# Helpers ------------------------------------------------------------------------------------------
+
+def int_to_bits(values, nbits):
+    """Convert (...) values to (..., nbits) bits (MSB first)."""
+    values = np.asarray(values, dtype=np.uint64)
+    shifts = np.arange(nbits - 1, -1, -1, dtype=np.uint64)
+    return ((values[..., None] >> shifts) & np.uint64(1)).astype(np.uint8)
+
+def bits_to_int(bits):
+    """Convert (..., nbits) bits (MSB first) to (...) values."""
+    bits   = np.asarray(bits, dtype=np.uint64)
+    shifts = np.arange(bits.shape[-1] - 1, -1, -1, dtype=np.uint64)
+    return (bits << shifts).sum(axis=-1, dtype=np.uint64)
+
+def _check_width(width):
+    if width not in [1, 4, 8]:
+        raise ValueError("Data width must be 1, 4 or 8, got {}.".format(width))
+
+# Commands -----------------------------------------------------------------------------------------
+
+COMMAND_BITS = 48
+
+def encode_command(index, argument):
+    """Encode Command frames: start (0), transmission (1), index, argument, CRC7, end (1)."""
+    index, argument = np.broadcast_arrays(np.asarray(index), np.asarray(argument))
+    content = np.concatenate([
+        np.zeros(index.shape + (1,), dtype=np.uint8),
+        np.ones( index.shape + (1,), dtype=np.uint8),
+        int_to_bits(index, 6),
+        int_to_bits(argument, 32),
+    ], axis=-1)
+    return np.concatenate([
+        content,
+        int_to_bits(crc7(content), 7),
+        np.ones(index.shape + (1,), dtype=np.uint8),
+    ], axis=-1)
+
+def decode_command(bits):
+    """Decode Command frames, returns (index, argument, valid) arrays.
+
+    valid checks start/transmission/end bits and CRC7.
+    """
+    bits  = np.asarray(bits, dtype=np.uint8)
+    valid = (bits[..., 0] == 0) & (bits[..., 1] == 1) & (bits[..., 47] == 1)
+    valid &= crc7(bits[..., :40]) == bits_to_int(bits[..., 40:47])
+    return bits_to_int(bits[..., 2:8]), bits_to_int(bits[..., 8:40]), valid
+
+# Responses ----------------------------------------------------------------------------------------
+
+R1_BITS = 48
+R2_BITS = 136
+
+def encode_response_r1(index, status):
+    """Encode R1/R1b responses: start (0), transmission (0), index, status, CRC7, end (1)."""
+    bits = encode_command(index, status)
+    bits[..., 1] = 0
+    bits[..., 40:47] = int_to_bits(crc7(bits[..., :40]), 7)
+    return bits
+
+def decode_response_r1(bits):
+    """Decode R1/R1b responses, returns (index, status, valid) arrays."""
+    bits  = np.asarray(bits, dtype=np.uint8)
+    valid = (bits[..., 0] == 0) & (bits[..., 1] == 0) & (bits[..., 47] == 1)
+    valid &= crc7(bits[..., :40]) == bits_to_int(bits[..., 40:47])
+    return bits_to_int(bits[..., 2:8]), bits_to_int(bits[..., 8:40]), valid
+
+def encode_response_r2(register):
+    """Encode R2 responses (CID/CSD): start (0), transmission (0), 0b111111, register[127:1] with
+    CRC7 in register[7:1], end (1).
+
+    register is given as (..., 16) bytes (MSB first), register[0] (end bit) and CRC7 are ignored.
+    """
+    register = np.unpackbits(np.asarray(register, dtype=np.uint8), axis=-1)
+    shape    = register.shape[:-1]
+    return np.concatenate([
+        np.zeros(shape + (2,), dtype=np.uint8),
+        np.ones( shape + (6,), dtype=np.uint8),
+        register[..., :120],
+        int_to_bits(crc7(register[..., :120]), 7),
+        np.ones(shape + (1,), dtype=np.uint8),
+    ], axis=-1)
+
+def decode_response_r2(bits):
+    """Decode R2 responses, returns (register, valid), register as (..., 16) bytes."""
+    bits  = np.asarray(bits, dtype=np.uint8)
+    valid = (bits[..., 0] == 0) & (bits[..., 1] == 0) & (bits[..., 135] == 1)
+    valid &= crc7(bits[..., 8:128]) == bits_to_int(bits[..., 128:135])
+    return np.packbits(bits[..., 8:], axis=-1), valid
+
+# Data ---------------------------------------------------------------------------------------------
+
+def data_block_clocks(length, width):
+    """Number of SDCard Clks of a Data block: start, data, CRC16, end."""
+    _check_width(width)
+    return 1 + length*8//width + 16 + 1
+
+def _data_to_values(data, width):
+    # Split bytes in width-bit values (MSB first).
+    bits = np.unpackbits(data, axis=-1)
+    bits = bits.reshape(bits.shape[:-1] + (-1, width))
+    return bits_to_int(bits).astype(np.uint8)
+
+def _lanes_crc16(values, width):
+    # Per-lane CRC16, returns (..., 16) values (CRC16 MSB first on each lane).
+    lanes = (values[..., None, :] >> np.arange(width, dtype=np.uint8)[:, None]) & 1
+    crcs  = int_to_bits(crc16(lanes), 16)
+    return (crcs.astype(np.uint8) << np.arange(width, dtype=np.uint8)[:, None]).sum(axis=-2, dtype=np.uint8)
+
+def encode_data_block(data, width=4):
+    """Encode Data blocks of (..., length) bytes on a width-bit bus, returns (..., clocks) values.
+
+    Bytes are sent MSB first: on 4-bit, the high nibble is sent first with DAT[3] carrying bit 7.
+    """
+    _check_width(width)
+    data   = np.asarray(data, dtype=np.uint8)
+    shape  = data.shape[:-1]
+    values = _data_to_values(data, width)
+    return np.concatenate([
+        np.zeros(shape + (1,), dtype=np.uint8),
+        values,
+        _lanes_crc16(values, width),
+        np.full(shape + (1,), 2**width - 1, dtype=np.uint8),
+    ], axis=-1)
+
+def decode_data_block(values, length, width=4):
+    """Decode Data blocks of length bytes from (..., clocks) values (starting with the start bit),
+    returns (data, valid), data as (..., length) bytes.
+
+    valid checks start/end bits and CRC16 of all lanes.
+    """
+    _check_width(width)
+    values   = np.asarray(values, dtype=np.uint8) & (2**width - 1)
+    n        = length*8//width
+    data     = values[..., 1:1 + n]
+    bits     = int_to_bits(data, width).reshape(data.shape[:-1] + (-1,))
+    valid    = (values[..., 0] == 0) & (values[..., 1 + n + 16] == 2**width - 1)
+    valid   &= np.all(_lanes_crc16(data, width) == values[..., 1 + n:1 + n + 16], axis=-1)
+    return np.packbits(bits, axis=-1), valid
+
+# CRC Status ---------------------------------------------------------------------------------------
+
+CRC_STATUS_ACCEPTED    = 0b010
+CRC_STATUS_CRC_ERROR   = 0b101
+CRC_STATUS_WRITE_ERROR = 0b110
+
+def encode_crc_status(status):
+    """Encode CRC status tokens (on DAT0): start (0), status, end (1)."""
+    status = np.asarray(status)
+    return np.concatenate([
+        np.zeros(status.shape + (1,), dtype=np.uint8),
+        int_to_bits(status, 3),
+        np.ones(status.shape + (1,), dtype=np.uint8),
+    ], axis=-1)
+
+def decode_crc_status(bits):
+    """Decode CRC status tokens, returns (status, valid) arrays."""
+    bits  = np.asarray(bits, dtype=np.uint8)
+    valid = (bits[..., 0] == 0) & (bits[..., 4] == 1)
+    return bits_to_int(bits[..., 1:4]), valid
@@ -0,0 +1,476 @@
+#
+# This file is part of LiteSDCard.
+#
+# Copyright (c) 2026 Florent Kermarrec <florent@enjoy-digital.fr>
+# SPDX-License-Identifier: BSD-2-Clause
+
+"""
+LiteSDCard host driver
+
+Drives an SDCard core (SDPHY/SDCore/DMAs added with add_sdcard) from the host over a RemoteClient
+(Etherbone/UART/PCIe through litex_server) or any bus with RemoteClient's read/write:
+- Card initialization (SDHC/SDXC, 1-bit/4-bit), Single/Multiple blocks reads/writes and BIST.
+- CSR accesses are batched: writes to consecutive CSRs are merged into a single multi-word write and
+  reads into a single read (arbitrary addresses with BatchRemoteClient), so a Cmd only costs one
+  write packet and one read per poll.
+- Data blocks are transferred by DMA to/from the SoC memory, then fetched/loaded in large bursts.
+
+Usage:
+    bus = BatchRemoteClient()
+    bus.open()
+    sdcard = SDCardDriver(bus)
+    sdcard.init()
+    data = sdcard.read(block=0, count=8)
+"""
+
+import time
+import random
+
+from litex.tools.litex_client import RemoteClient
+from litex.tools.remote.etherbone import EtherbonePacket, EtherboneRecord, EtherboneReads
+
+from litesdcard.common import *
+
+# Batching -----------------------------------------------------------------------------------------
+
+MAX_BURST = 255 # Etherbone record read/write count.
+
+class BatchRemoteClient(RemoteClient):
+    """RemoteClient with reads of arbitrary addresses in a single Etherbone record."""
+    def read_addrs(self, addrs):
+        datas = []
+        for i in range(0, len(addrs), MAX_BURST):
+            datas += self._read_addrs(addrs[i:i + MAX_BURST])
+        return datas
+
+    def _read_addrs(self, addrs):
+        addr_size = self.csr_bus_address_width//8
+        record = EtherboneRecord(addr_size)
+        record.reads  = EtherboneReads(addr_size=addr_size, addrs=[self.base_address + addr for addr in addrs])
+        record.rcount = len(record.reads)
+        packet = EtherbonePacket(self.csr_bus_address_width)
+        packet.records = [record]
+        packet.encode()
+        self.send_packet(self.socket, packet)
+        response = self.receive_packet(self.socket, addr_size)
+        if response == 0:
+            raise TimeoutError("Etherbone read timeout.")
+        packet = EtherbonePacket(self.csr_bus_address_width, response)
+        packet.decode()
+        return packet.records.pop().writes.get_datas()
+
+def _runs(addrs):
+    # Split addresses in runs of consecutive 32-bit words: (addr, length).
+    runs = []
+    for addr in addrs:
+        if runs and addr == runs[-1][0] + 4*runs[-1][1]:
+            runs[-1][1] += 1
+        else:
+            runs.append([addr, 1])
+    return runs
+
+class CSRBatch:
+    """Batch of CSR accesses, merged into as few bus accesses as possible.
+
+    Writes are queued (in order) and flushed on read/flush, consecutive words being merged in a single
+    write. Reads of several CSRs are done with a single read.
+    """
+    def __init__(self, bus):
+        self.bus    = bus
+        self.writes = []
+
+    def _words(self, reg):
+        return [reg.addr + 4*i for i in range(reg.length)]
+
+    def write(self, reg, value):
+        for i, addr in enumerate(self._words(reg)):
+            shift = (reg.length - 1 - i)*reg.data_width
+            self.writes.append((addr, (value >> shift) & (2**reg.data_width - 1)))
+        return self
+
+    def _write_runs(self):
+        # Merge queued writes in runs of consecutive words: (addr, datas).
+        runs = []
+        for addr, data in self.writes:
+            if runs and addr == runs[-1][0] + 4*len(runs[-1][1]) and len(runs[-1][1]) < MAX_BURST:
+                runs[-1][1].append(data)
+            else:
+                runs.append((addr, [data]))
+        self.writes = []
+        return runs
+
+    def _unpack(self, regs, datas):
+        datas  = iter(datas)
+        values = []
+        for reg in regs:
+            value = 0
+            for i in range(reg.length):
+                value = (value << reg.data_width) | next(datas)
+            values.append(value)
+        return values[0] if len(values) == 1 else values
+
+    def flush(self):
+        for addr, datas in self._write_runs():
+            self.bus.write(addr, datas)
+
+    def read_words(self, addrs):
+        self.flush()
+        if hasattr(self.bus, "read_addrs"):
+            return self.bus.read_addrs(addrs)
+        datas = []
+        for addr, length in _runs(addrs):
+            for i in range(0, length, MAX_BURST):
+                n      = min(MAX_BURST, length - i)
+                datas += self.bus.read(addr + 4*i, length=n)
+        return datas
+
+    def read(self, *regs):
+        addrs = sum([self._words(reg) for reg in regs], [])
+        return self._unpack(regs, self.read_words(addrs))
+
+# Helpers ------------------------------------------------------------------------------------------
+
+def _mem_bursts(data):
+    # Split data in bursts of little-endian 32-bit words: (word offset, words).
+    data  = bytes(data) + bytes(-len(data) % 4)
+    words = [int.from_bytes(data[4*i:4*i + 4], "little") for i in range(len(data)//4)]
+    return [(i, words[i:i + MAX_BURST]) for i in range(0, len(words), MAX_BURST)]
+
+def _mem_bytes(datas):
+    return b"".join(d.to_bytes(4, "little") for d in datas)
+
+def _bist_data(prng, count):
+    return bytes(prng.getrandbits(8) for i in range(512*count))
+
+def _bist_results(nbytes, errors, write_time, read_time):
+    return {
+        "bytes"       : nbytes,
+        "errors"      : errors,
+        "write_speed" : nbytes/write_time if write_time else 0,
+        "read_speed"  : nbytes/read_time  if read_time  else 0,
+    }
+
+# SDCard Driver ------------------------------------------------------------------------------------
+
+class SDCardError(Exception):
+    pass
+
+class SDCardDriver:
+    """SDCard host driver.
+
+    The accesses needing CSR reads (Cmds, DMAs/BIST polling, memory fetches) are written once as
+    sequences: generators yielding their reads (batch method, args) and receiving the read values,
+    executed by _run. Only _run depends on the transport, so AsyncSDCardDriver (litesdcard.host.aio)
+    shares the sequences and just awaits the reads.
+    """
+    def __init__(self, bus, name="sdcard", mem_base=None, mem_size=1024*1024, clk_freq=None, timeout=1.0,
+        slot = None):
+        self.bus      = bus
+        self.name     = name
+        self.slot     = slot # Slot of a multi-slot SDCard (add_sdcard_multislot), None otherwise.
+        self.batch    = CSRBatch(bus)
+        self.mem_base = bus.mems.main_ram.base if mem_base is None else mem_base
+        self.mem_size = mem_size
+        self.clk_freq = bus.constants.config_clock_frequency if clk_freq is None else clk_freq
+        self.timeout  = timeout
+        self.rca      = 0
+        self.cid      = None
+        self.csd      = None
+
+    def _reg(self, name):
+        if self.slot is not None and name.startswith("phy_"):
+            name = f"phy{self.slot}_" + name[len("phy_"):]
+        return getattr(self.bus.regs, f"{self.name}_{name}")
+
+    # Sequences ------------------------------------------------------------------------------------
+
+    def _run(self, sequence):
+        """Run a sequence, returns its value."""
+        try:
+            request = next(sequence)
+            while True:
+                method, args = request
+                request = sequence.send(getattr(self.batch, method)(*args))
+        except StopIteration as e:
+            return e.value
+
+    def _read(self, *regs):
+        return (yield ("read", regs))
+
+    def _read_words(self, addrs):
+        return (yield ("read_words", (addrs,)))
+
+    # Clocking/Settings ----------------------------------------------------------------------------
+
+    def set_clk_freq(self, freq):
+        """Set SDCard Clk frequency (divider rounded to get a frequency <= freq)."""
+        return self.set_divider(max(int(-(-self.clk_freq//freq)) - 1, 0))
+
+    def set_divider(self, divider):
+        """Set SDCard Clk divider (SDCard Clk = sys-clk/(divider + 1))."""
+        self.batch.write(self._reg("phy_clocker_divider"), divider).flush()
+        return divider
+
+    def set_data_width(self, data_width):
+        settings = {1: SD_PHY_SPEED_1X, 4: SD_PHY_SPEED_4X, 8: SD_PHY_SPEED_8X}[data_width]
+        self.batch.write(self._reg("phy_settings"), settings).flush()
+
+    def set_bus_width(self, data_width):
+        """Set Card (ACMD6) and PHY Data width (1 or 4-bit, card in transfer state)."""
+        return self._run(self._set_bus_width(data_width))
+
+    def _set_bus_width(self, data_width):
+        yield from self._acmd(6, {1: 0b00, 4: 0b10}[data_width])
+        self.set_data_width(data_width)
+
+    # Cmds -----------------------------------------------------------------------------------------
+
+    def cmd(self, cmd, argument=0, cmd_type=SDCARD_CTRL_RESPONSE_SHORT,
+        data_type    = SDCARD_CTRL_DATA_TRANSFER_NONE,
+        block_length = 0,
+        block_count  = 0,
+        crc          = None,
+        check        = True):
+        """Send a Cmd (and its Data transfer), returns (cmd_event, data_event, response).
+
+        The Cmd is sent with 2 writes (block length/count and argument/command/send) and Cmd/Data
+        events and response polled with a single read.
+        """
+        return self._run(self._cmd(cmd, argument, cmd_type, data_type, block_length, block_count, crc, check))
+
+    def _cmd(self, cmd, argument=0, cmd_type=SDCARD_CTRL_RESPONSE_SHORT,
+        data_type    = SDCARD_CTRL_DATA_TRANSFER_NONE,
+        block_length = 0,
+        block_count  = 0,
+        crc          = None,
+        check        = True):
+        self._cmd_send(cmd, argument, cmd_type, data_type, block_length, block_count, crc)
+        start = time.time()
+        while True:
+            response, cmd_event, data_event = yield from self._read(*self._cmd_status_regs())
+            if (cmd_event & 0b1) and (data_event & 0b1):
+                break
+            if time.time() - start > self.timeout:
+                raise SDCardError(f"CMD{cmd}: Timeout.")
+        if check:
+            self._cmd_check(cmd, cmd_event, data_event)
+        return cmd_event, data_event, response
+
+    def _cmd_send(self, cmd, argument, cmd_type, data_type, block_length, block_count, crc):
+        # Queue the Cmd writes (merged by the batch in 2 writes).
+        crc = (cmd_type == SDCARD_CTRL_RESPONSE_SHORT) if crc is None else crc
+        command = (cmd << 8) | (data_type << 5) | (int(crc) << 2) | cmd_type
+        batch = self.batch
+        if self.slot is not None:
+            batch.write(self._reg("slots_slot"), self.slot)
+        batch.write(self._reg("core_block_length"), block_length)
+        batch.write(self._reg("core_block_count"),  block_count)
+        batch.write(self._reg("core_cmd_argument"), argument)
+        batch.write(self._reg("core_cmd_command"),  command)
+        batch.write(self._reg("core_cmd_send"),     1)
+
+    def _cmd_status_regs(self):
+        return [self._reg(f"core_{name}") for name in ["cmd_response", "cmd_event", "data_event"]]
+
+    def _cmd_check(self, cmd, cmd_event, data_event):
+        for kind, event in [("Cmd", cmd_event), ("Data", data_event)]:
+            if event & 0b1110:
+                what = {0b100: "Timeout", 0b1000: "CRC Error"}.get(event & 0b1100, "Error")
+                raise SDCardError(f"CMD{cmd}: {kind} {what}.")
+
+    def acmd(self, cmd, argument=0, **kwargs):
+        return self._run(self._acmd(cmd, argument, **kwargs))
+
+    def _acmd(self, cmd, argument=0, **kwargs):
+        yield from self._cmd(55, self.rca << 16)
+        return (yield from self._cmd(cmd, argument, **kwargs))
+
+    # Initialization -------------------------------------------------------------------------------
+
+    def init(self, data_width=4, init_freq=400e3, freq=25e6, retries=1000):
+        """Initialize the SDCard (SDHC/SDXC) and put it in transfer state."""
+        return self._run(self._init(data_width, init_freq, freq, retries))
+
+    def _init(self, data_width, init_freq, freq, retries):
+        self.set_clk_freq(init_freq)
+        self.set_data_width(1)
+        self.batch.write(self._reg("phy_init_initialize"), 1)
+
+        # Reset/Interface condition.
+        yield from self._cmd(0, cmd_type=SDCARD_CTRL_RESPONSE_NONE)
+        self.rca = 0
+        _, _, response = yield from self._cmd(8, 0x1aa)
+        if (response & 0xfff) != 0x1aa:
+            raise SDCardError("CMD8: Invalid response.")
+
+        # Wait for card ready (HCS).
+        for i in range(retries):
+            yield from self._cmd(55)
+            _, _, response = yield from self._cmd(41, 0x40ff8000, crc=False) # HCS, 2.7-3.6V.
+            ocr = response & 0xffffffff
+            if ocr & (1 << 31):
+                break
+        else:
+            raise SDCardError("ACMD41: Card not ready.")
+
+        # Identification.
+        _, _, self.cid = yield from self._cmd(2, cmd_type=SDCARD_CTRL_RESPONSE_LONG)
+        _, _, response = yield from self._cmd(3)
+        self.rca = (response >> 16) & 0xffff
+        _, _, self.csd = yield from self._cmd(9, self.rca << 16, cmd_type=SDCARD_CTRL_RESPONSE_LONG)
+        yield from self._cmd(7, self.rca << 16, cmd_type=SDCARD_CTRL_RESPONSE_SHORT_BUSY)
+
+        # Bus width/Block length/Clk.
+        if data_width == 4:
+            yield from self._set_bus_width(4)
+        yield from self._cmd(16, 512)
+        self.set_clk_freq(freq)
+
+    @property
+    def size(self):
+        """SDCard size (in bytes) from CSD v2.0."""
+        c_size = (self.csd >> 48) & 0x3fffff
+        return (c_size + 1)*512*1024
+
+    # Memory ---------------------------------------------------------------------------------------
+
+    def mem_read(self, addr, length):
+        """Read length bytes of SoC memory (in bursts)."""
+        return self._run(self._mem_read(addr, length))
+
+    def _mem_read(self, addr, length):
+        words = (length + 3)//4
+        datas = yield from self._read_words([addr + 4*i for i in range(words)])
+        return _mem_bytes(datas)[:length]
+
+    def mem_write(self, addr, data):
+        """Write data to SoC memory (in bursts)."""
+        for i, words in _mem_bursts(data):
+            self.bus.write(addr + 4*i, words)
+
+    # DMAs -----------------------------------------------------------------------------------------
+
+    def _dma_start(self, dma, base, length):
+        batch = self.batch
+        batch.write(self._reg(f"{dma}_dma_enable"), 0)
+        batch.write(self._reg(f"{dma}_dma_base"),   base)
+        batch.write(self._reg(f"{dma}_dma_length"), length)
+        batch.write(self._reg(f"{dma}_dma_enable"), 1)
+
+    def _dma_wait(self, dma):
+        start = time.time()
+        while not (yield from self._read(self._reg(f"{dma}_dma_done"))):
+            if time.time() - start > self.timeout:
+                raise SDCardError(f"{dma}: DMA Timeout.")
+
+    # Blocks ---------------------------------------------------------------------------------------
+
+    def read(self, block, count=1):
+        """Read count blocks from block (DMA to SoC memory, then fetched in bursts)."""
+        return self._run(self._read_blocks(block, count))
+
+    def _read_blocks(self, block, count):
+        length = 512*count
+        assert length <= self.mem_size
+        self._dma_start("block2mem", self.mem_base, length)
+        yield from self._cmd(18 if count > 1 else 17, block,
+            data_type    = SDCARD_CTRL_DATA_TRANSFER_READ,
+            block_length = 512,
+            block_count  = count)
+        if count > 1:
+            yield from self._cmd(12, cmd_type=SDCARD_CTRL_RESPONSE_SHORT_BUSY)
+        yield from self._dma_wait("block2mem")
+        return (yield from self._mem_read(self.mem_base, length))
+
+    def write(self, block, data):
+        """Write data (multiple of 512 bytes) from block (loaded in bursts to SoC memory, then DMA)."""
+        return self._run(self._write_blocks(block, data))
+
+    def _write_blocks(self, block, data):
+        assert len(data) % 512 == 0
+        assert len(data) <= self.mem_size
+        count = len(data)//512
+        self.mem_write(self.mem_base, data)
+        self._dma_start("mem2block", self.mem_base, len(data))
+        yield from self._cmd(25 if count > 1 else 24, block,
+            data_type    = SDCARD_CTRL_DATA_TRANSFER_WRITE,
+            block_length = 512,
+            block_count  = count)
+        if count > 1:
+            yield from self._cmd(12, cmd_type=SDCARD_CTRL_RESPONSE_SHORT_BUSY)
+        yield from self._dma_wait("mem2block")
+
+    # BIST -----------------------------------------------------------------------------------------
+
+    def bist(self, block=0, count=8, loops=1, seed=0):
+        """Write/Read/Check pseudo-random blocks, returns a dict with errors and throughputs."""
+        return self._run(self._bist(block, count, loops, seed))
+
+    def _bist(self, block, count, loops, seed):
+        prng   = random.Random(seed)
+        errors = 0
+        write_time = 0
+        read_time  = 0
+        for loop in range(loops):
+            data  = _bist_data(prng, count)
+            start = time.time()
+            yield from self._write_blocks(block, data)
+            write_time += time.time() - start
+            start = time.time()
+            errors += sum(a != b for a, b in zip((yield from self._read_blocks(block, count)), data))
+            read_time  += time.time() - start
+        return _bist_results(512*count*loops, errors, write_time, read_time)
+
+    @property
+    def has_bist(self):
+        """Target has the gateware BIST (see bist_gateware)."""
+        return hasattr(self.bus.regs, f"{self.name}_bist_generator_start")
+
+    def _bist_start(self, module, count):
+        batch = self.batch
+        batch.write(self._reg(f"{module}_count"), count)
+        batch.write(self._reg(f"{module}_reset"), 1)
+        batch.write(self._reg(f"{module}_start"), 1)
+
+    def _bist_wait(self, module):
+        start = time.time()
+        while not (yield from self._read(self._reg(f"{module}_done"))):
+            if time.time() - start > self.timeout:
+                raise SDCardError(f"{module}: BIST Timeout.")
+
+    def bist_gateware(self, block=0, count=8, loops=1):
+        """Write/Read/Check blocks with the gateware BIST, returns a dict with errors and throughputs.
+
+        The BISTBlockGenerator/Checker (litesdcard.frontend.bist) are expected as {name}_bist_generator
+        and {name}_bist_checker, feeding/checking the SDCore Data (in place of the DMAs): only the Cmds
+        go over the bus. Errors are counted in 32-bit words.
+        """
+        return self._run(self._bist_gateware(block, count, loops))
+
+    def _bist_gateware(self, block, count, loops):
+        errors = 0
+        write_time = 0
+        read_time  = 0
+        for loop in range(loops):
+            start = time.time()
+            self._bist_start("bist_generator", count)
+            yield from self._cmd(25 if count > 1 else 24, block,
+                data_type    = SDCARD_CTRL_DATA_TRANSFER_WRITE,
+                block_length = 512,
+                block_count  = count)
+            if count > 1:
+                yield from self._cmd(12, cmd_type=SDCARD_CTRL_RESPONSE_SHORT_BUSY)
+            yield from self._bist_wait("bist_generator")
+            write_time += time.time() - start
+            start = time.time()
+            self._bist_start("bist_checker", count)
+            yield from self._cmd(18 if count > 1 else 17, block,
+                data_type    = SDCARD_CTRL_DATA_TRANSFER_READ,
+                block_length = 512,
+                block_count  = count)
+            if count > 1:
+                yield from self._cmd(12, cmd_type=SDCARD_CTRL_RESPONSE_SHORT_BUSY)
+            yield from self._bist_wait("bist_checker")
+            errors += yield from self._read(self._reg("bist_checker_errors"))
+            read_time  += time.time() - start
+        return _bist_results(512*count*loops, errors, write_time, read_time)
@@ -0,0 +1,117 @@
+#
+# This file is part of LiteSDCard.
+#
+# Copyright (c) 2026 Florent Kermarrec <florent@enjoy-digital.fr>
+# SPDX-License-Identifier: BSD-2-Clause
+
+"""
+LiteSDCard LiteScope capture decoder
+
+Named triggers and transactions decoding for captures of the SDScope probes (litesdcard.scope):
+- Layout: signals (name, width) of the analyzer group, read from the analyzer CSV.
+- Triggers: value/mask on the events probes for named conditions (cmd, timeout, crc-error, ...).
+- Transactions: captures split on Cmd starts, with Cmd index, Data bytes read/written, errors and
+  duration.
+"""
+
+import csv
+
+import numpy as np
+
+# Triggers -----------------------------------------------------------------------------------------
+
+TRIGGERS = {
+    "cmd"         : {"cmd_start"   : 1},
+    "timeout"     : {"timeout"     : 1},
+    "crc-error"   : {"crc_error"   : 1},
+    "write-error" : {"write_error" : 1},
+    "clk-stop"    : {"clk_stopped" : 1},
+    "core-error"  : {"core_error"  : 1},
+}
+
+# Layout -------------------------------------------------------------------------------------------
+
+def read_layout(filename, group=0):
+    """Read the (name, width) signals of an analyzer group from the LiteScope CSV."""
+    layout = []
+    with open(filename, newline="") as f:
+        for row in csv.reader(f):
+            if len(row) == 4 and row[0] == "signal" and int(row[1]) == group:
+                layout.append((row[2], int(row[3])))
+    return layout
+
+def find_field(layout, name):
+    """Find an events probe (ex cmd_start) in the layout, returns (offset, width)."""
+    offset = 0
+    for signal, width in layout:
+        if signal.endswith("events_" + name):
+            return offset, width
+        offset += width
+    raise KeyError(name)
+
+def trigger_value_mask(layout, trigger, cmd_index=None):
+    """Return the (value, mask) of a named trigger (Cmd trigger optionally on cmd_index)."""
+    cond = dict(TRIGGERS[trigger])
+    if trigger == "cmd" and cmd_index is not None:
+        cond["cmd_index"] = cmd_index
+    value = 0
+    mask  = 0
+    for name, v in cond.items():
+        offset, width = find_field(layout, name)
+        value |= (v & (2**width - 1)) << offset
+        mask  |= (2**width - 1) << offset
+    return value, mask
+
+# Decode -------------------------------------------------------------------------------------------
+
+def decode_fields(samples, layout):
+    """Split the captured samples (integers) into the events probes, returns a dict of arrays."""
+    fields = {}
+    offset = 0
+    for signal, width in layout:
+        if "events_" in signal:
+            name = signal[signal.rindex("events_") + len("events_"):]
+            mask = 2**width - 1
+            fields[name] = np.array([(int(s) >> offset) & mask for s in samples], dtype=np.uint32)
+        offset += width
+    return fields
+
+def decode_transactions(fields):
+    """Split the capture in transactions (one per Cmd start), returns a list of dicts."""
+    n      = len(fields["cmd_start"])
+    starts = np.flatnonzero(fields["cmd_start"])
+    ends   = np.append(starts[1:], n)
+    transactions = []
+    for start, end in zip(starts, ends):
+        window = slice(start, end)
+        transactions.append({
+            "start"        : int(start),
+            "end"          : int(end - 1),
+            "cmd_index"    : int(fields["cmd_index"][start]),
+            "read_bytes"   : int(fields["read"][window].sum()),
+            "write_bytes"  : int(fields["write"][window].sum()),
+            "cmd_timeout"  : bool(fields["cmd_timeout"][window].any()),
+            "data_timeout" : bool(fields["data_timeout"][window].any()),
+            "crc_error"    : bool(fields["crc_error"][window].any()),
+            "write_error"  : bool(fields["write_error"][window].any()),
+            "clk_stopped"  : bool(fields["clk_stopped"][window].any()),
+        })
+    return transactions
+
+def format_transaction(transaction, sys_clk_freq=None):
+    """Format a transaction as a string (with duration in us if sys_clk_freq is provided)."""
+    t = transaction
+    s = "{:>6d}: CMD{:<2d}".format(t["start"], t["cmd_index"])
+    if t["read_bytes"]:
+        s += " read {} bytes".format(t["read_bytes"])
+    if t["write_bytes"]:
+        s += " write {} bytes".format(t["write_bytes"])
+    cycles = t["end"] - t["start"] + 1
+    if sys_clk_freq is None:
+        s += " ({} cycles)".format(cycles)
+    else:
+        s += " ({:.3f}us)".format(cycles/sys_clk_freq*1e6)
+    errors = [e for e in ["cmd_timeout", "data_timeout", "crc_error", "write_error", "clk_stopped"] if t[e]]
+    if errors:
+        s += " [" + ", ".join(errors).upper() + "]"
+    return s
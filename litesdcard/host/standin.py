@@ -0,0 +1,375 @@
+#
+# This file is part of LiteSDCard.
+#
+# Copyright (c) 2026 Florent Kermarrec <florent@enjoy-digital.fr>
+# SPDX-License-Identifier: BSD-2-Clause
+
+"""
+LiteSDCard Etherbone stand-in server
+
+Behavioral stand-in for a SoC with an SDCard (SDPHY/SDCore/DMAs CSRs and main RAM) backed by the
+SDCardModel, served over Etherbone to test host software without hardware:
+- SoCStandIn: CSRs/memory accessed by 32-bit words, Cmds executed immediately by the model, DMAs
+  moving the Data blocks from/to the main RAM (or, with_bist, from/to the gateware BIST when
+  running). A csr.csv can be generated for LiteX's RemoteClient.
+- EtherboneServer: TCP server compatible with litex_server (RemoteClient) protocol, counting the
+  received packets (to check host batching).
+- EtherboneUDPServer: UDP server compatible with LiteEth's Etherbone core (raw Etherbone packets,
+  read data returned at the read base_ret_addr), with optional response latency/losses.
+"""
+
+import csv
+import socket
+import itertools
+import threading
+
+import numpy as np
+
+from litex.tools.remote.etherbone import EtherboneIPC, EtherbonePacket, EtherboneRecord
+from litex.tools.remote.etherbone import EtherboneWrites
+
+from litesdcard.common import *
+from litesdcard.emulator.model import SDCardModel, CARD_STATE_TRAN, CARD_STATE_DATA, CARD_STATE_RCV
+
+# CSRs ---------------------------------------------------------------------------------------------
+
+_csrs = {
+    "sdcard_phy" : [
+        ("card_detect",     1, "ro"),
+        ("clocker_divider", 1, "rw"),
+        ("init_initialize", 1, "rw"),
+        ("dataw_status",    1, "ro"),
+        ("settings",        1, "rw"),
+    ],
+    "sdcard_core" : [
+        ("cmd_argument", 1, "rw"),
+        ("cmd_command",  1, "rw"),
+        ("cmd_send",     1, "rw"),
+        ("cmd_response", 4, "ro"),
+        ("cmd_event",    1, "ro"),
+        ("data_event",   1, "ro"),
+        ("block_length", 1, "rw"),
+        ("block_count",  1, "rw"),
+    ],
+    "sdcard_block2mem" : [
+        ("dma_base",   2, "rw"),
+        ("dma_length", 1, "rw"),
+        ("dma_enable", 1, "rw"),
+        ("dma_done",   1, "ro"),
+        ("dma_loop",   1, "rw"),
+        ("dma_offset", 1, "ro"),
+    ],
+    "sdcard_mem2block" : [
+        ("dma_base",   2, "rw"),
+        ("dma_length", 1, "rw"),
+        ("dma_enable", 1, "rw"),
+        ("dma_done",   1, "ro"),
+        ("dma_loop",   1, "rw"),
+        ("dma_offset", 1, "ro"),
+    ],
+}
+
+_bist_csrs = {
+    "sdcard_bist_generator" : [
+        ("reset", 1, "rw"),
+        ("start", 1, "rw"),
+        ("done",  1, "ro"),
+        ("count", 1, "rw"),
+    ],
+    "sdcard_bist_checker" : [
+        ("reset",  1, "rw"),
+        ("start",  1, "rw"),
+        ("done",   1, "ro"),
+        ("count",  1, "rw"),
+        ("errors", 1, "ro"),
+    ],
+}
+
+# SoC Stand-In -------------------------------------------------------------------------------------
+
+class SoCStandIn:
+    csr_base = 0xf0000000
+    mem_base = 0x40000000
+
+    def __init__(self, image, size=None, mem_size=1024*1024, clk_freq=int(100e6), with_bist=False):
+        self.model    = SDCardModel(None, image, size=size)
+        self.mem      = bytearray(mem_size)
+        self.clk_freq = clk_freq
+        self.values   = {}
+        self.lengths  = {}
+        self.modes    = {}
+        self.addrs    = {}
+        self.bases    = {}
+        self.bist     = {}
+        csrs = dict(_csrs, **(_bist_csrs if with_bist else {}))
+        for i, (group, registers) in enumerate(csrs.items()):
+            addr = self.csr_base + i*0x800
+            self.bases[group] = addr
+            for name, length, mode in registers:
+                name = f"{group}_{name}"
+                self.values[name]  = 0
+                self.lengths[name] = length
+                self.modes[name]   = mode
+                for j in range(length):
+                    self.addrs[addr + 4*j] = (name, j)
+                addr += 4*length
+        self.values["sdcard_phy_card_detect"] = 0
+        self.values["sdcard_phy_settings"]    = SD_PHY_SPEED_4X
+        for group in _bist_csrs if with_bist else []:
+            self.values[f"{group}_count"] = 1
+            self._bist_reset(group)
+
+    def write_csv(self, filename):
+        """Write a csr.csv (LiteX format) describing the CSRs/main RAM."""
+        with open(filename, "w", newline="") as f:
+            writer = csv.writer(f)
+            for group, base in self.bases.items():
+                writer.writerow(["csr_base", group, f"0x{base:08x}", "", ""])
+            for addr, (name, j) in sorted(self.addrs.items()):
+                if j == 0:
+                    writer.writerow(["csr_register", name, f"0x{addr:08x}", self.lengths[name], self.modes[name]])
+            writer.writerow(["constant", "config_clock_frequency", self.clk_freq, "", ""])
+            writer.writerow(["constant", "config_csr_data_width", 32, "", ""])
+            writer.writerow(["constant", "config_bus_address_width", 32, "", ""])
+            writer.writerow(["memory_region", "main_ram", f"0x{self.mem_base:08x}", len(self.mem), "cached"])
+
+    # Word accesses --------------------------------------------------------------------------------
+
+    def read(self, addr):
+        if addr in self.addrs:
+            name, j = self.addrs[addr]
+            shift   = 32*(self.lengths[name] - 1 - j)
+            return (self.values[name] >> shift) & 0xffffffff
+        offset = addr - self.mem_base
+        if 0 <= offset < len(self.mem):
+            return int.from_bytes(self.mem[offset:offset + 4], "little")
+        return 0
+
+    def write(self, addr, data):
+        if addr in self.addrs:
+            name, j = self.addrs[addr]
+            shift   = 32*(self.lengths[name] - 1 - j)
+            value   = self.values[name] & ~(0xffffffff << shift)
+            self.values[name] = value | ((data & 0xffffffff) << shift)
+            if name == "sdcard_core_cmd_send" and data:
+                self.command()
+            if name.startswith("sdcard_bist_") and data:
+                group, action = name.rsplit("_", 1)
+                if action == "reset":
+                    self._bist_reset(group)
+                if action == "start":
+                    self._bist_start(group)
+            if name.endswith("dma_enable") and not data:
+                group = name[:-len("_dma_enable")]
+                self.values[f"{group}_dma_done"]   = 0
+                self.values[f"{group}_dma_offset"] = 0
+            return
+        offset = addr - self.mem_base
+        if 0 <= offset < len(self.mem):
+            self.mem[offset:offset + 4] = (data & 0xffffffff).to_bytes(4, "little")
+
+    # SDCore/DMAs ----------------------------------------------------------------------------------
+
+    def _dma(self, group, data=None, length=None):
+        # Write data to memory (block2mem) or read length bytes from memory (mem2block).
+        if not self.values[f"{group}_dma_enable"]:
+            return None if data is None else 0
+        base   = self.values[f"{group}_dma_base"] - self.mem_base
+        total  = self.values[f"{group}_dma_length"]
+        offset = self.values[f"{group}_dma_offset"]
+        n      = min(total - offset, len(data) if data is not None else length)
+        if data is not None:
+            self.mem[base + offset:base + offset + n] = data[:n]
+        else:
+            data = bytes(self.mem[base + offset:base + offset + n])
+        self.values[f"{group}_dma_offset"] = offset + n
+        self.values[f"{group}_dma_done"]   = int(offset + n >= total)
+        return data
+
+    # BIST (BISTBlockGenerator/Checker, Counter mode) ---------------------------------------------
+
+    def _bist_reset(self, group):
+        self.bist[group] = {"state": "idle", "word": 0, "block": 0}
+        self.values[f"{group}_done"] = int(group.endswith("checker"))
+        if group.endswith("checker"):
+            self.values[f"{group}_errors"] = 0
+
+    def _bist_start(self, group):
+        self.bist[group].update(state="run", block=0)
+        self.values[f"{group}_done"] = 0
+
+    def _bist_block(self, group, data=None):
+        # Generate a block (generator) or check data (checker), None when the BIST is not running.
+        bist = self.bist.get(group)
+        if bist is None or bist["state"] != "run":
+            return None
+        words = np.arange(bist["word"], bist["word"] + 512//4, dtype=np.uint32)
+        block = words.astype("<u4").tobytes()
+        if data is not None:
+            errors = np.frombuffer(bytes(data).ljust(512, b"\0"), dtype="<u4") != words
+            self.values[f"{group}_errors"] += int(errors.sum())
+        bist["word"]  += 512//4
+        bist["block"] += 1
+        if bist["block"] == self.values[f"{group}_count"]:
+            bist["state"] = "done"
+            self.values[f"{group}_done"] = 1
+        return block
+
+    def command(self):
+        command   = self.values["sdcard_core_cmd_command"]
+        cmd_type  = (command >> 0) & 0b11
+        data_type = (command >> 5) & 0b11
+        cmd       = (command >> 8) & 0x3f
+        argument  = self.values["sdcard_core_cmd_argument"]
+        count     = self.values["sdcard_core_block_count"]
+        self.model.commands.append(("ACMD{}" if self.model.app else "CMD{}").format(cmd))
+        response, transfer = self.model.command(cmd, argument)
+        cmd_event  = 0b0001
+        data_event = 0b0001
+
+        # Response.
+        if cmd_type != SDCARD_CTRL_RESPONSE_NONE:
+            if response is None:
+                cmd_event |= 0b0110 # Error/Timeout.
+                transfer   = None
+            else:
+                response = np.packbits(np.asarray(response, dtype=np.uint8)).tobytes()
+                if cmd_type == SDCARD_CTRL_RESPONSE_LONG:
+                    value = int.from_bytes(response[1:17], "big")
+                else:
+                    value = (self.values["sdcard_core_cmd_response"] << 40) | int.from_bytes(response[:5], "big")
+                self.values["sdcard_core_cmd_response"] = value & (2**128 - 1)
+
+        # Data.
+        if transfer is not None and data_type != SDCARD_CTRL_DATA_TRANSFER_NONE:
+            kind, blocks = transfer
+            if kind == "read":
+                for data in itertools.islice(blocks, count):
+                    if self._bist_block("sdcard_bist_checker", data) is None:
+                        self._dma("sdcard_block2mem", data=data)
+            else:
+                for block in itertools.islice(blocks, count):
+                    data = self._bist_block("sdcard_bist_generator")
+                    if data is None:
+                        data = self._dma("sdcard_mem2block", length=self.model.length)
+                    if data is None or len(data) < self.model.length:
+                        data_event |= 0b0110 # Error/Timeout.
+                        break
+                    self.model.mem[block*512:block*512 + len(data)] = data
+        if self.model.state in [CARD_STATE_DATA, CARD_STATE_RCV]:
+            self.model.state = CARD_STATE_TRAN
+
+        self.values["sdcard_core_cmd_event"]  = cmd_event
+        self.values["sdcard_core_data_event"] = data_event
+
+# Etherbone Server ---------------------------------------------------------------------------------
+
+class EtherboneServer(EtherboneIPC):
+    """Etherbone TCP server (litex_server protocol) in front of a SoCStandIn."""
+    def __init__(self, soc, host="localhost", port=0, addr_width=32):
+        self.soc        = soc
+        self.host       = host
+        self.port       = port
+        self.addr_width = addr_width
+        self.packets    = 0
+        self.lock       = threading.Lock()
+
+    def open(self):
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.socket.bind((self.host, self.port))
+        self.socket.listen(4)
+        self.port   = self.socket.getsockname()[1]
+        self.thread = threading.Thread(target=self._serve, daemon=True)
+        self.thread.start()
+
+    def close(self):
+        self.socket.close()
+
+    def handle(self, packet):
+        """Execute an Etherbone packet, return the response packet (or None)."""
+        packet = EtherbonePacket(self.addr_width, packet)
+        packet.decode()
+        record = packet.records.pop()
+        with self.lock:
+            self.packets += 1
+            if record.writes is not None:
+                base = record.writes.base_addr
+                for i, data in enumerate(record.writes.get_datas()):
+                    self.soc.write(base + 4*i, data)
+            if record.reads is None:
+                return None
+            datas = [self.soc.read(addr) for addr in record.reads.get_addrs()]
+        addr_size = self.addr_width//8
+        base_addr = int.from_bytes(record.reads.bytes[:addr_size], "big") # base_ret_addr (not decoded).
+        record = EtherboneRecord(addr_size)
+        record.writes = EtherboneWrites(addr_size=addr_size, base_addr=base_addr, datas=datas)
+        record.wcount = len(record.writes)
+        packet = EtherbonePacket(self.addr_width)
+        packet.records = [record]
+        packet.encode()
+        return packet
+
+    def _serve(self):
+        while True:
+            try:
+                client, addr = self.socket.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._serve_client, args=(client,), daemon=True).start()
+
+    def _serve_client(self, client):
+        client.sendall(bytes(f"CommStandIn:{self.host}:{self.port}", "UTF-8"))
+        try:
+            while True:
+                packet = self.receive_packet(client, self.addr_width//8)
+                if packet == 0:
+                    break
+                response = self.handle(packet)
+                if response is not None:
+                    self.send_packet(client, response)
+        except OSError:
+            pass
+        finally:
+            client.close()
+
+class EtherboneUDPServer(EtherboneServer):
+    """Etherbone UDP server (LiteEth Etherbone core) in front of a SoCStandIn.
+
+    Responses can be delayed by latency (seconds) and one out of drop responses dropped.
+    """
+    def __init__(self, soc, host="localhost", port=0, addr_width=32, latency=0, drop=0):
+        EtherboneServer.__init__(self, soc, host, port, addr_width)
+        self.latency   = latency
+        self.drop      = drop
+        self.responses = 0
+
+    def open(self):
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.bind((self.host, self.port))
+        self.port   = self.socket.getsockname()[1]
+        self.thread = threading.Thread(target=self._serve, daemon=True)
+        self.thread.start()
+
+    def _send(self, response, addr):
+        try:
+            self.socket.sendto(response.bytes, addr)
+        except OSError:
+            pass
+
+    def _serve(self):
+        while True:
+            try:
+                packet, addr = self.socket.recvfrom(65536)
+            except OSError:
+                return
+            response = self.handle(packet)
+            if response is None:
+                continue
+            self.responses += 1
+            if self.drop and (self.responses % self.drop) == 0:
+                continue
+            if self.latency:
+                threading.Timer(self.latency, self._send, args=(response, addr)).start()
+            else:
+                self._send(response, addr)
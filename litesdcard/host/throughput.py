@@ -0,0 +1,111 @@
+#
+# This file is part of LiteSDCard.
+#
+# Copyright (c) 2026 Florent Kermarrec <florent@enjoy-digital.fr>
+# SPDX-License-Identifier: BSD-2-Clause
+
+"""
+LiteSDCard analytical throughput model
+
+Estimates the duration of Single/Multiple blocks transfers from the overheads of the current PHY/
+Core FSMs, without simulation:
+- Cmd: 48-bit Cmd frame (SDPHYCMDW), response latency (NCR) and 48-bit response (SDPHYCMDR).
+- Read: access latency (NAC) + Data block (start, data, CRC16, end) per block (SDPHYDATAR).
+- Write: CLK2 + Data block + CRC status token + busy (program latency) per block (SDPHYDATAW).
+- Multiple blocks transfers: CLK8 + CMD12 (SHORT_BUSY) to stop the transfer.
+
+Card latencies are expressed in SDCard Clk cycles (as for SDCardModel), the model then predicts the
+sys-clk cycles, MB/s and latency to the first Data byte for a given divider and sys_clk_freq. Small
+sys-clk overheads (FSM handshakes between Core and PHY) are included as constants calibrated against
+simulation (see test/test_throughput.py).
+"""
+
+# Constants ----------------------------------------------------------------------------------------
+
+CMD_CLOCKS         = 48 # Cmd frame.
+RESPONSE_CLOCKS    = 48 # R1/R1b response frame.
+CLK2_CLOCKS        = 2  # SDPHYDATAW: Clk cycles before Write Data blocks.
+CLK8_CLOCKS        = 8  # SDPHYCMDR/SDPHYDATAR/SDPHYDATAW: Clk cycles after the transfer.
+CRC_STATUS_CLOCKS  = 7  # CRC status token (start, 3-bit status, end) and its 2 Clk cycles delay.
+TURNAROUND_CLOCKS  = 3  # PHY/Card turnaround before the first Data byte.
+
+# Sys-clk overheads (Core/PHY FSMs handshakes).
+READ_OVERHEAD             = 5
+READ_BLOCK_OVERHEAD       = 2
+WRITE_OVERHEAD            = 7
+MULTIPLE_BLOCKS_OVERHEAD  = 8
+READ_LATENCY_OVERHEAD     = 2
+WRITE_LATENCY_OVERHEAD    = 4
+
+# Helpers ------------------------------------------------------------------------------------------
+
+def sd_clk_period(divider, slowdown=0):
+    """SDCard Clk period in sys-clk cycles (see SDPHYClocker)."""
+    half = ((divider + 1) << slowdown) >> 1
+    return 2*max(half, 1)
+
+def data_block_clocks(block_length, data_width):
+    """SDCard Clk cycles of a Data block: start, data, CRC16, end."""
+    assert data_width in [1, 4, 8]
+    return 1 + block_length*8//data_width + 16 + 1
+
+def cmd_clocks(response_latency=2):
+    """SDCard Clk cycles of a Cmd with a short response."""
+    return CMD_CLOCKS + response_latency + RESPONSE_CLOCKS
+
+# Estimate -----------------------------------------------------------------------------------------
+
+def estimate(direction="read", divider=0, data_width=4, block_length=512, block_count=8,
+    sys_clk_freq     = 100e6,
+    response_latency = 2,
+    access_latency   = 8,
+    program_latency  = 16):
+    """Estimate a transfer, returns a dict with the same metrics than emulator.perf.measure.
+
+    Multiple blocks transfers (block_count > 1) are stopped with CMD12.
+    """
+    assert direction in ["read", "write"]
+    period   = sd_clk_period(divider)
+    multiple = block_count > 1
+
+    # Cmd.
+    clocks = cmd_clocks(response_latency)
+
+    # Data blocks.
+    if direction == "read":
+        clocks   += block_count*(access_latency + data_block_clocks(block_length, data_width))
+        overhead  = READ_OVERHEAD + READ_BLOCK_OVERHEAD*block_count
+        latency   = period*(cmd_clocks(response_latency) + access_latency + TURNAROUND_CLOCKS + 1 + 8//data_width)
+        latency  += READ_LATENCY_OVERHEAD
+    else:
+        block     = CLK2_CLOCKS + data_block_clocks(block_length, data_width) + CRC_STATUS_CLOCKS
+        clocks   += block_count*(block + program_latency)
+        overhead  = WRITE_OVERHEAD
+        # First Data byte accepted by the PHY once the previous byte time (8//data_width) elapsed.
+        latency   = period*(cmd_clocks(response_latency) + CLK2_CLOCKS + TURNAROUND_CLOCKS - 1 +
+            8//data_width)
+        latency  += WRITE_LATENCY_OVERHEAD
+
+    # Stop (CMD12).
+    if multiple:
+        clocks   += CLK8_CLOCKS + cmd_clocks(response_latency)
+        overhead += MULTIPLE_BLOCKS_OVERHEAD
+
+    cycles = period*clocks + overhead
+    nbytes = block_length*block_count
+    return {
+        "direction"       : direction,
+        "divider"         : divider,
+        "data_width"      : data_width,
+        "block_length"    : block_length,
+        "block_count"     : block_count,
+        "sys_clk_freq"    : sys_clk_freq,
+        "sd_clk_freq"     : sys_clk_freq/period,
+        "cycles"          : cycles,
+        "bytes"           : nbytes,
+        "bytes_per_cycle" : nbytes/cycles,
+        "mbps"            : nbytes/cycles*sys_clk_freq/1e6,
+        "latency"         : latency,
+        "latency_us"      : latency/sys_clk_freq*1e6,
+        "duration_us"     : cycles/sys_clk_freq*1e6,
+    }
@@ -0,0 +1,216 @@
+#
+# This file is part of LiteSDCard.
+#
+# Copyright (c) 2026 Florent Kermarrec <florent@enjoy-digital.fr>
+# SPDX-License-Identifier: BSD-2-Clause
+
+"""
+LiteSDCard SD bus timeline decoder
+
+Decodes sampled CLK/CMD/DAT lines (ex from the bench Sampler) into a timeline of SD bus events:
+- cmd: Cmd frame (index, argument, CRC7 check).
+- response: R1/R1b/R3/R6/R7 or R2 response (index/status or register, CRC7 check).
+- data: Data block (direction, length, CRC16 check).
+- crc_status: CRC status token after a written Data block.
+- busy: Busy period on DAT0 (after written Data blocks and R1b responses).
+
+Lines are sampled on the SDCard Clk rising edges. Events are dicts with type, start/end (sample
+indexes) and event specific fields, sorted by start. Data width (ACMD6) and block length (CMD16)
+are tracked from the decoded Cmds.
+"""
+
+import numpy as np
+
+from litesdcard.host.codec import *
+
+# Constants ----------------------------------------------------------------------------------------
+
+R2_COMMANDS       = [2, 9, 10]
+R1B_COMMANDS      = [7, 12, 28, 29, 38]
+READ_COMMANDS     = [17, 18]
+WRITE_COMMANDS    = [24, 25]
+MULTIPLE_COMMANDS = [18, 25]
+
+# Helpers ------------------------------------------------------------------------------------------
+
+def _next(condition, start, stop=None):
+    # Index of the first True in condition[start:stop] (or None).
+    indexes = np.flatnonzero(condition[start:stop])
+    return None if len(indexes) == 0 else start + int(indexes[0])
+
+def sample_lines(samples, clk=0, cmd=1, dat=2, dat_width=4):
+    """Sample CMD/DAT lines on CLK rising edges, returns (edges, cmd_bits, dat_values)."""
+    samples = np.asarray(samples, dtype=np.uint8)
+    clk     = (samples >> clk) & 0b1
+    edges   = np.flatnonzero((clk[1:] == 1) & (clk[:-1] == 0)) + 1
+    values  = samples[edges]
+    return edges, (values >> cmd) & 0b1, (values >> dat) & (2**dat_width - 1)
+
+# Decoder ------------------------------------------------------------------------------------------
+
+class _Decoder:
+    def __init__(self, edges, cmd_bits, dat_values):
+        self.edges      = edges
+        self.cmd_bits   = cmd_bits
+        self.dat_values = dat_values
+        self.dat0       = dat_values & 0b1
+        self.events     = []
+        self.width      = 1
+        self.length     = 512
+
+    def event(self, type, start, end, **kwargs):
+        # start/end are Clk indexes, converted to sample indexes.
+        last = len(self.edges) - 1
+        self.events.append(dict(type=type,
+            start = int(self.edges[min(start, last)]),
+            end   = int(self.edges[min(end,   last)]),
+            **kwargs))
+
+    # Cmd line.
+    def decode_cmd(self):
+        n        = len(self.cmd_bits)
+        position = 0
+        last     = None # Last Cmd: (index, app).
+        app      = False
+        commands = []
+        while True:
+            start = _next(self.cmd_bits == 0, position)
+            if start is None or start + COMMAND_BITS > n:
+                break
+            bits = self.cmd_bits[start:start + COMMAND_BITS]
+            # Cmd.
+            if bits[1]:
+                index, argument, valid = decode_command(bits)
+                index, argument = int(index), int(argument)
+                self.event("cmd", start, start + COMMAND_BITS - 1,
+                    index    = index,
+                    name     = ("ACMD{}" if app else "CMD{}").format(index),
+                    argument = argument,
+                    valid    = bool(valid))
+                commands.append((start + COMMAND_BITS, index, argument, app))
+                last     = (index, app)
+                app      = (index == 55) and not app
+                position = start + COMMAND_BITS
+                continue
+            # Response.
+            if last is not None and last[0] in R2_COMMANDS and not last[1]:
+                if start + R2_BITS > n:
+                    break
+                register, valid = decode_response_r2(self.cmd_bits[start:start + R2_BITS])
+                self.event("response", start, start + R2_BITS - 1,
+                    register = bytes(register).hex(),
+                    valid    = bool(valid))
+                position = start + R2_BITS
+            else:
+                index, status, valid = decode_response_r1(bits)
+                self.event("response", start, start + R1_BITS - 1,
+                    index  = int(index),
+                    status = int(status),
+                    valid  = bool(valid) or (last == (41, True)), # R3 has no CRC.
+                )
+                position = start + R1_BITS
+                # R1b Busy.
+                if last is not None and last[0] in R1B_COMMANDS and not last[1]:
+                    self.decode_busy(position, position + 4)
+        return commands
+
+    # Data lines.
+    def decode_busy(self, start, stop):
+        busy_start = _next(self.dat0 == 0, start, stop)
+        if busy_start is None:
+            return None
+        busy_end = _next(self.dat0 == 1, busy_start)
+        busy_end = len(self.dat0) - 1 if busy_end is None else busy_end
+        self.event("busy", busy_start, busy_end, clocks=busy_end - busy_start)
+        return busy_end
+
+    def decode_block(self, position, stop, direction, length):
+        mask  = 2**self.width - 1
+        start = _next((self.dat_values & mask) == 0, position, stop)
+        if start is None:
+            return None
+        clocks = data_block_clocks(length, self.width)
+        if start + clocks > len(self.dat_values):
+            return None
+        data, valid = decode_data_block(self.dat_values[start:start + clocks], length, self.width)
+        end = start + clocks - 1
+        self.event("data", start, end,
+            direction = direction,
+            length    = length,
+            width     = self.width,
+            valid     = bool(valid),
+            data      = bytes(data))
+        if direction == "write":
+            # CRC Status token (starts 2 Clks after the end bit).
+            token = _next(self.dat0 == 0, end + 1, end + 8)
+            if token is None or token + 5 > len(self.dat0):
+                return end + 1
+            status, status_valid = decode_crc_status(self.dat0[token:token + 5])
+            self.event("crc_status", token, token + 4,
+                status = int(status),
+                valid  = bool(status_valid) and (int(status) == CRC_STATUS_ACCEPTED))
+            busy_end = self.decode_busy(token + 5, token + 8)
+            return token + 5 if busy_end is None else busy_end
+        return end + 1
+
+    def decode_data(self, commands):
+        for i, (position, index, argument, app) in enumerate(commands):
+            # Track Data width/block length.
+            if app and index == 6:
+                self.width = 4 if (argument & 0b11) == 0b10 else 1
+            if not app and index == 16:
+                self.length = argument
+            # Get Data direction/length.
+            if app and index in [13, 51]:
+                direction, length = "read", 64 if index == 13 else 8
+            elif not app and index == 6:
+                direction, length = "read", 64
+            elif not app and index in READ_COMMANDS:
+                direction, length = "read", self.length
+            elif not app and index in WRITE_COMMANDS:
+                direction, length = "write", self.length
+            else:
+                continue
+            # Decode Data blocks, until next Cmd for single blocks transfers or until Stop.
+            stop = None
+            for next_position, next_index, next_argument, next_app in commands[i+1:]:
+                if (index not in MULTIPLE_COMMANDS) or (next_index == 12 and not next_app):
+                    stop = next_position - COMMAND_BITS
+                    break
+            while True:
+                position = self.decode_block(position, stop, direction, length)
+                if position is None or index not in MULTIPLE_COMMANDS:
+                    break
+
+def decode_timeline(samples, clk=0, cmd=1, dat=2, dat_width=4):
+    """Decode sampled SD bus lines (bit clk/cmd of each sample, DAT at bits dat..dat+dat_width-1)
+    into a list of events."""
+    edges, cmd_bits, dat_values = sample_lines(samples, clk, cmd, dat, dat_width)
+    decoder  = _Decoder(edges, cmd_bits, dat_values)
+    commands = decoder.decode_cmd()
+    decoder.decode_data(commands)
+    return sorted(decoder.events, key=lambda event: (event["start"], event["type"] != "cmd"))
+
+def format_event(event, sample_period=None):
+    """Format an event as a string (with times in us if sample_period (in s) is provided)."""
+    if sample_period is None:
+        s = "{:>10d}: ".format(event["start"])
+    else:
+        s = "{:>12.3f}us: ".format(event["start"]*sample_period*1e6)
+    t = event["type"]
+    if t == "cmd":
+        s += "{:<8s} arg=0x{:08x}".format(event["name"], event["argument"])
+    elif t == "response":
+        if "register" in event:
+            s += "response R2 {}".format(event["register"])
+        else:
+            s += "response CMD{} status=0x{:08x}".format(event["index"], event["status"])
+    elif t == "data":
+        s += "data     {} {} bytes ({}-bit)".format(event["direction"], event["length"], event["width"])
+    elif t == "crc_status":
+        s += "crc      status=0b{:03b}".format(event["status"])
+    elif t == "busy":
+        s += "busy     {} clks".format(event["clocks"])
+    if not event.get("valid", True):
+        s += " [ERROR]"
+    return s
@@ -0,0 +1,133 @@
+#
+# This file is part of LiteSDCard.
+#
+# Copyright (c) 2026 Florent Kermarrec <florent@enjoy-digital.fr>
+# SPDX-License-Identifier: BSD-2-Clause
+
+"""
+LiteSDCard multi-slot
+
+One SDCore (Cmd/Data engine) and its DMAs shared between several card slots (one SDPHY each):
+- SDPHYMux: presents the Cmd/Data streams of the selected slot's SDPHY to the SDCore, so it can be
+  used in place of a SDPHY.
+- Each SDPHY keeps its own CSRs: settings (Data width), Clk divider, initialization and card detect.
+- Transfers go through the single engine one at a time: software selects the slot (slot CSR)
+  before the Cmd and must not change it while a Cmd/Data transfer is ongoing; the other cards keep
+  their state (and can be selected for the next Cmd).
+
+Use with add_sdcard_multislot(soc, ["sdcard0", "sdcard1"]) and SDCardDriver(bus, slot=n) on the host.
+"""
+
+from migen import *
+
+from litex.gen import *
+
+from litex.soc.interconnect.csr import *
+from litex.soc.interconnect import stream
+
+# SDPHY Mux ----------------------------------------------------------------------------------------
+
+class _SDPHYMuxStream:
+    def __init__(self, phy_stream):
+        if hasattr(phy_stream, "sink"):
+            self.sink   = stream.Endpoint(phy_stream.sink.description)
+        if hasattr(phy_stream, "source"):
+            self.source = stream.Endpoint(phy_stream.source.description)
+
+class SDPHYMux(LiteXModule):
+    def __init__(self, phys):
+        self.phys        = phys
+        self.slot        = CSRStorage(bits_for(len(phys) - 1), description="Selected slot (for the next Cmd/Data transfer).")
+        self.card_detect = CSRStatus(len(phys), description="Card detect (one bit per slot).")
+        self.card_detect_irq = Signal()
+
+        # SDPHY-like Cmd/Data streams (for SDCore).
+        self.cmdw  = _SDPHYMuxStream(phys[0].cmdw)
+        self.cmdr  = _SDPHYMuxStream(phys[0].cmdr)
+        self.dataw = _SDPHYMuxStream(phys[0].dataw)
+        self.datar = _SDPHYMuxStream(phys[0].datar)
+
+        # # #
+
+        # Streams routing to/from the selected slot.
+        for i, phy in enumerate(phys):
+            self.comb += If(self.slot.storage == i,
+                self.cmdw.sink.connect(phy.cmdw.sink),
+                self.cmdr.sink.connect(phy.cmdr.sink),
+                phy.cmdr.source.connect(self.cmdr.source),
+                self.dataw.sink.connect(phy.dataw.sink),
+                phy.dataw.source.connect(self.dataw.source),
+                self.datar.sink.connect(phy.datar.sink),
+                phy.datar.source.connect(self.datar.source),
+            )
+
+        # Card detect.
+        self.comb += [
+            self.card_detect.status.eq(Cat(*[phy.card_detect.status for phy in phys])),
+            self.card_detect_irq.eq(Cat(*[phy.card_detect_irq for phy in phys]) != 0),
+        ]
+
+# Helpers ------------------------------------------------------------------------------------------
+
+def add_sdcard_multislot(soc, sdcard_names, name="sdcard", mode="read+write", **phy_kwargs):
+    """Add a multi-slot SDCard (one SDPHY per pads in sdcard_names) to a LiteX SoC, as add_sdcard
+    does for a single slot: {name}_phy{n}, {name}_slots, {name}_core, DMAs and IRQs."""
+    from litex.soc.interconnect import wishbone
+    from litex.soc.interconnect.csr_eventmanager import EventManager, EventSourcePulse, EventSourceLevel
+
+    from litesdcard.phy import SDPHY
+    from litesdcard.core import SDCore
+    from litesdcard.frontend.dma import SDBlock2MemDMA, SDMem2BlockDMA
+
+    assert mode in ["read", "write", "read+write"]
+    phy_kwargs = {"cmd_timeout": 10e-1, "data_timeout": 10e-1, **phy_kwargs}
+
+    # PHYs/Mux/Core.
+    phys = []
+    for i, sdcard_name in enumerate(sdcard_names):
+        phy = SDPHY(soc.platform.request(sdcard_name), soc.platform.device, soc.clk_freq, **phy_kwargs)
+        soc.add_module(name=f"{name}_phy{i}", module=phy)
+        phys.append(phy)
+    mux  = SDPHYMux(phys)
+    core = SDCore(mux)
+    soc.add_module(name=f"{name}_slots", module=mux)
+    soc.add_module(name=f"{name}_core",  module=core)
+
+    # Block2Mem/Mem2Block DMAs.
+    dmas    = []
+    dma_bus = getattr(soc, "dma_bus", soc.bus)
+    for dma, direction in [("block2mem", "read"), ("mem2block", "write")]:
+        if direction not in mode:
+            continue
+        bus = wishbone.Interface(
+            data_width = soc.bus.data_width,
+            adr_width  = soc.bus.get_address_width(standard="wishbone"),
+            addressing = "word",
+        )
+        if dma == "block2mem":
+            sdcard_dma = SDBlock2MemDMA(bus=bus, endianness=soc.cpu.endianness)
+            soc.comb += core.source.connect(sdcard_dma.sink)
+        else:
+            sdcard_dma = SDMem2BlockDMA(bus=bus, endianness=soc.cpu.endianness)
+            soc.comb += sdcard_dma.source.connect(core.sink)
+        soc.add_module(name=f"{name}_{dma}", module=sdcard_dma)
+        dma_bus.add_master(name=f"{name}_{dma}", master=bus)
+        dmas.append((dma, sdcard_dma))
+
+    # Interrupts.
+    irq = EventManager()
+    soc.add_module(name=f"{name}_irq", module=irq)
+    irq.card_detect = EventSourcePulse(description="SDCard has been ejected/inserted (any slot).")
+    for dma, sdcard_dma in dmas:
+        setattr(irq, f"{dma}_dma", EventSourcePulse(description=f"{dma.capitalize()} DMA terminated."))
+    irq.cmd_done = EventSourceLevel(description="Command completed.")
+    irq.finalize()
+    for dma, sdcard_dma in dmas:
+        soc.comb += getattr(irq, f"{dma}_dma").trigger.eq(sdcard_dma.irq)
+    soc.comb += [
+        irq.card_detect.trigger.eq(mux.card_detect_irq),
+        irq.cmd_done.trigger.eq(core.cmd_event.fields.done),
+    ]
+    if soc.irq.enabled:
+        soc.irq.add(f"{name}_irq", use_loc_if_exists=True)
+    return mux
@@ -38,25 +38,55 @@ def _sdpads_layout(data_width=4):
         ("data_i_ce", 1),
     ]
 
+# Data Widths --------------------------------------------------------------------------------------
+
+_data_lanes = {
+    SD_PHY_SPEED_1X: 1,
+    SD_PHY_SPEED_4X: 4,
+    SD_PHY_SPEED_8X: 8,
+}
+
+def _data_speeds(data_width, pads_data_width):
+    # Static Data Width: only generate logic for this Data Width.
+    if isinstance(data_width, int):
+        return [data_width]
+    # Dynamic Data Width: generate logic for all Data Widths supported by the pads.
+    return [speed for speed, lanes in _data_lanes.items() if lanes <= pads_data_width]
+
+def _data_width_mux(data_width, cases):
+    # Static Data Width: no muxing.
+    if isinstance(data_width, int):
+        return cases["default" if data_width == SD_PHY_SPEED_1X else data_width]
+    # Dynamic Data Width: select Data Width at runtime.
+    return Case(data_width, cases)
+
+def _add_retimed(module, statements, with_retiming):
+    # Registered with retiming (+1 cycle latency), combinatorial otherwise.
+    if with_retiming:
+        module.sync += statements
+    else:
+        module.comb += statements
+
 # SDCard PHY Clocker -------------------------------------------------------------------------------
 
 class SDPHYClocker(LiteXModule):
-    def __init__(self):
-        self.divider = CSRStorage(9, reset=256)
-        self.stop    = Signal()        # Stop input (for speed handling/backpressure).
-        self.ce      = Signal()        # CE output  (for logic running in sys_clk domain).
-        self.clk_en  = Signal(reset=1) # Clk enable input (from logic running in sys_clk domain).
-        self.clk     = Signal()        # Clk output (for SDCard pads).
+    def __init__(self, with_retiming=False):
+        self.divider  = CSRStorage(9, reset=256)
+        self.stop     = Signal()        # Stop input (for speed handling/backpressure).
+        self.ce       = Signal()        # CE output  (for logic running in sys_clk domain).
+        self.clk_en   = Signal(reset=1) # Clk enable input (from logic running in sys_clk domain).
+        self.clk      = Signal()        # Clk output (for SDCard pads).
+        self.slowdown = Signal(2)       # Slowdown input (divides Clk by 2**slowdown, for Clk fallback).
 
         # # #
 
         # SDCard Clk Divider Generation.
         clk   = Signal()
-        half  = Signal(10) # >= 1 : half-period in sys-clk cycles.
-        count = Signal(10)
+        half  = Signal(12) # >= 1 : half-period in sys-clk cycles.
+        count = Signal(12)
 
-        # half = max(1, ceil((storage + 1) / 2)).
-        self.comb += half.eq((self.divider.storage + 1) >> 1)
+        # half = max(1, ceil(((storage + 1) << slowdown) / 2)).
+        self.comb += half.eq(((self.divider.storage + 1) << self.slowdown) >> 1)
 
         self.sync += [
             If(~self.stop,
@@ -79,7 +109,114 @@ class SDPHYClocker(LiteXModule):
         ce_latched = Signal()
         self.sync += If(clk_d, ce_delayed.eq(self.clk_en))
         self.comb += If(clk_d, ce_latched.eq(self.clk_en)).Else(ce_latched.eq(ce_delayed))
-        self.comb += self.clk.eq(~clk & ce_latched)
+        if with_retiming:
+            # Delay Clk by 1 sys-clk cycle (to stay aligned with the registered pads outputs).
+            self.sync += self.clk.eq(~clk & ce_latched)
+        else:
+            self.comb += self.clk.eq(~clk & ce_latched)
+
+# SDCard PHY Clock Fallback ------------------------------------------------------------------------
+
+class SDPHYClockFallback(LiteXModule):
+    """Clock Fallback
+
+    Watch the Cmd/Data errors reported by the PHY (and the Cmd CRC errors reported by the Core on
+    cmd_crc_error) and slow down the SDCard Clk (by steps of 2) when the number of errors reaches a
+    threshold, speed it up again after a window of clean Data transfers. Allows running at the
+    highest Clk frequency supported by the SDCard/board.
+
+    Errors are also expected during SDCard initialization (ex: CMD8/ACMD41 timeouts), so the
+    fallback should only be enabled by software once the SDCard has been initialized.
+    """
+    def __init__(self, clocker, cmdr, dataw, datar, max_level=3):
+        assert max_level <= 3 # Limited by Clocker's slowdown/half-period.
+        self.cmd_crc_error = Signal() # Cmd CRC Error strobe input (from Core).
+        self.control = CSRStorage(fields=[
+            CSRField("enable",    size=1, offset=0, description="Enable Clk fallback."),
+            CSRField("threshold", size=8, offset=8, reset=4, description="Number of errors before Clk slowdown."),
+        ])
+        self.window = CSRStorage(16, reset=1024, description="Number of clean Data transfers before Clk speedup.")
+        self.status = CSRStatus(fields=[
+            CSRField("level",   size=bits_for(max_level), offset=0, description="Current Clk slowdown level (Clk divided by 2**level)."),
+            CSRField("divider", size=12, offset=8, description="Current effective Clk divider."),
+        ])
+        self.errors = CSRStatus(32, description="Number of Cmd/Data errors.")
+
+        # # #
+
+        level       = Signal(bits_for(max_level))
+        error_count = Signal(8)
+        clean_count = Signal(16)
+        error       = Signal()
+        clean       = Signal()
+
+        # Error/Clean Detection.
+        self.comb += [
+            # Cmd CRC Error.
+            If(self.cmd_crc_error,
+                error.eq(1)
+            ),
+            # Cmd Timeout.
+            If(cmdr.source.valid & cmdr.source.ready,
+                If(cmdr.source.status == SDCARD_STREAM_STATUS_TIMEOUT,
+                    error.eq(1)
+                )
+            ),
+            # Data Write CRC Error/Accepted.
+            If(dataw.source.valid & dataw.source.ready,
+                If(dataw.source.status == SDCARD_STREAM_STATUS_CRCERROR,
+                    error.eq(1)
+                ).Elif(dataw.source.status == SDCARD_STREAM_STATUS_DATAACCEPTED,
+                    clean.eq(1)
+                )
+            ),
+            # Data Read Timeout/CRC Error/OK.
+            If(datar.source.valid & datar.source.ready & datar.source.last,
+                If((datar.source.status == SDCARD_STREAM_STATUS_TIMEOUT) |
+                   (datar.source.status == SDCARD_STREAM_STATUS_CRCERROR),
+                    error.eq(1)
+                ).Elif(datar.source.status == SDCARD_STREAM_STATUS_OK,
+                    clean.eq(1)
+                )
+            ),
+        ]
+        self.sync += If(error, self.errors.status.eq(self.errors.status + 1))
+
+        # Level Control.
+        self.sync += [
+            If(~self.control.fields.enable,
+                level.eq(0),
+                error_count.eq(0),
+                clean_count.eq(0),
+            ).Elif(error,
+                clean_count.eq(0),
+                error_count.eq(error_count + 1),
+                # Slow down Clk when reaching Threshold.
+                If(error_count >= (self.control.fields.threshold - 1),
+                    error_count.eq(0),
+                    If(level != max_level,
+                        level.eq(level + 1)
+                    )
+                )
+            ).Elif(clean,
+                clean_count.eq(clean_count + 1),
+                # Speed up Clk after a clean Window.
+                If(clean_count >= (self.window.storage - 1),
+                    clean_count.eq(0),
+                    error_count.eq(0),
+                    If(level != 0,
+                        level.eq(level - 1)
+                    )
+                )
+            )
+        ]
+
+        # Clocker Control/Status.
+        self.comb += [
+            clocker.slowdown.eq(level),
+            self.status.fields.level.eq(level),
+            self.status.fields.divider.eq(((clocker.divider.storage + 1) << level) - 1),
+        ]
 
 # SDCard PHY Read ----------------------------------------------------------------------------------
 
@@ -219,7 +356,7 @@ class SDPHYCMDW(LiteXModule):
 # SDCard PHY Command Read --------------------------------------------------------------------------
 
 class SDPHYCMDR(LiteXModule):
-    def __init__(self, sdpads_layout, sys_clk_freq, cmd_timeout, cmdw):
+    def __init__(self, sdpads_layout, sys_clk_freq, cmd_timeout, cmdw, with_retiming=False):
         self.pads_in  = pads_in  = stream.Endpoint(sdpads_layout)
         self.pads_out = pads_out = stream.Endpoint(sdpads_layout)
         self.sink     = sink     = stream.Endpoint([("cmd_type", 2), ("data_type", 2), ("length", 8)])
@@ -236,6 +373,10 @@ class SDPHYCMDR(LiteXModule):
         self.cmdr = cmdr = SDPHYR(sdpads_layout, cmd=True, data_width=1, skip_start_bit=False)
         self.comb += pads_in.connect(cmdr.pads_in)
 
+        # CMDR Reset (delayed with retiming to follow the delayed pads_in).
+        cmdr_reset = Signal()
+        _add_retimed(self, cmdr.reset.eq(cmdr_reset), with_retiming)
+
         self.fsm = fsm = FSM(reset_state="IDLE")
         fsm.act("IDLE",
             # Preload Timeout with Cmd Timeout.
@@ -244,7 +385,7 @@ class SDPHYCMDR(LiteXModule):
             NextValue(count, 0),
             # When the Cmd has been sent to the SDCard, get the response.
             If(sink.valid & pads_out.ready & cmdw.done,
-                NextValue(cmdr.reset, 1),
+                NextValue(cmdr_reset, 1),
                 NextState("WAIT"),
             )
         )
@@ -252,7 +393,7 @@ class SDPHYCMDR(LiteXModule):
             # Drive Clk.
             pads_out.clk.eq(1),
             # Reset CMDR.
-            NextValue(cmdr.reset, 0),
+            NextValue(cmdr_reset, 0),
             # Change state on Cmd response start.
             If(cmdr.source.valid,
                 NextState("CMD")
@@ -343,7 +484,7 @@ class SDPHYCMDR(LiteXModule):
 # SDCard PHY Data Write ----------------------------------------------------------------------------
 
 class SDPHYDATAW(LiteXModule):
-    def __init__(self, sdpads_layout, data_width):
+    def __init__(self, sdpads_layout, data_width, with_retiming=False):
         self.pads_in  = pads_in  = stream.Endpoint(sdpads_layout)
         self.pads_out = pads_out = stream.Endpoint(sdpads_layout)
         self.sink     = sink     = stream.Endpoint([("data", 8), ("last_block", 1)])
@@ -370,10 +511,17 @@ class SDPHYDATAW(LiteXModule):
         self.crc = SDPHYR(sdpads_layout, data=True, data_width=1, skip_start_bit=True)
         self.comb += self.crc.pads_in.eq(pads_in)
 
+        # CRC Reset (delayed with retiming to follow the delayed pads_in).
+        crc_reset = Signal()
+        _add_retimed(self, self.crc.reset.eq(crc_reset), with_retiming)
+
+        speeds = _data_speeds(data_width, len(pads_out.data.o))
+
         # Feed the CRC from the data selected for this cycle, not from pads_out,
-        # which is later reused to emit the CRC bits.
-        crc16_data = Signal(len(pads_out.data.o))
-        self.crc16 = crc16 = CRC16(crc16_data, count)
+        # which is later reused to emit the CRC bits. With retiming, the CRC is shifted out of the
+        # CRC registers instead of being selected by count.
+        crc16_data = Signal(max(_data_lanes[speed] for speed in speeds))
+        self.crc16 = crc16 = CRC16(crc16_data, None if with_retiming else count)
 
         self.fsm = fsm = FSM(reset_state="IDLE")
         fsm.act("IDLE",
@@ -410,34 +558,35 @@ class SDPHYDATAW(LiteXModule):
 
         data_cases = {}
         # SD_PHY_SPEED_1X.
-        data_cases["default"] = [
-            Case(count, {
-                0 : crc16_data[0].eq(sink.data[7]),
-                1 : crc16_data[0].eq(sink.data[6]),
-                2 : crc16_data[0].eq(sink.data[5]),
-                3 : crc16_data[0].eq(sink.data[4]),
-                4 : crc16_data[0].eq(sink.data[3]),
-                5 : crc16_data[0].eq(sink.data[2]),
-                6 : crc16_data[0].eq(sink.data[1]),
-                7 : crc16_data[0].eq(sink.data[0]),
-            }),
-            pads_out.data.o[0].eq(crc16_data[0]),
-            If(pads_out.ready,
-                If(count == (8-1),
-                    NextValue(count, 0),
-                    If(sink.last,
-                        NextState("CRC16")
+        if SD_PHY_SPEED_1X in speeds:
+            data_cases["default"] = [
+                Case(count, {
+                    0 : crc16_data[0].eq(sink.data[7]),
+                    1 : crc16_data[0].eq(sink.data[6]),
+                    2 : crc16_data[0].eq(sink.data[5]),
+                    3 : crc16_data[0].eq(sink.data[4]),
+                    4 : crc16_data[0].eq(sink.data[3]),
+                    5 : crc16_data[0].eq(sink.data[2]),
+                    6 : crc16_data[0].eq(sink.data[1]),
+                    7 : crc16_data[0].eq(sink.data[0]),
+                }),
+                pads_out.data.o[0].eq(crc16_data[0]),
+                If(pads_out.ready,
+                    If(count == (8-1),
+                        NextValue(count, 0),
+                        If(sink.last,
+                            NextState("CRC16")
+                        ).Else(
+                            sink.ready.eq(1)
+                        )
                     ).Else(
-                        sink.ready.eq(1)
+                        NextValue(count, count + 1),
                     )
-                ).Else(
-                    NextValue(count, count + 1),
                 )
-            )
-        ]
+            ]
 
         # SD_PHY_SPEED_4X.
-        if len(pads_out.data.o) >= 4:
+        if SD_PHY_SPEED_4X in speeds:
             data_cases[SD_PHY_SPEED_4X] = [
                 Case(count, {
                     0: crc16_data[:4].eq(sink.data[4:8]),
@@ -459,7 +608,7 @@ class SDPHYDATAW(LiteXModule):
             ]
 
         # SD_PHY_SPEED_8X.
-        if len(pads_out.data.o) >= 8:
+        if SD_PHY_SPEED_8X in speeds:
             data_cases[SD_PHY_SPEED_8X] = [
                 crc16_data[:8].eq(sink.data[:8]),
                 pads_out.data.o[:8].eq(crc16_data[:8]),
@@ -476,7 +625,7 @@ class SDPHYDATAW(LiteXModule):
             self.stop.eq(~sink.valid),
             pads_out.clk.eq(1),
             pads_out.data.oe.eq(1),
-            Case(data_width, data_cases),
+            _data_width_mux(data_width, data_cases),
             crc16.enable.eq(pads_out.ready),
         )
         fsm.act("CRC16",
@@ -484,6 +633,7 @@ class SDPHYDATAW(LiteXModule):
             pads_out.data.oe.eq(1),
             pads_out.data.o.eq(crc16.data_pads_out),
             If(pads_out.ready,
+                crc16.shift.eq(1),
                 NextValue(count, count + 1),
                 If(count == (16-1),
                     NextValue(count, 0),
@@ -496,7 +646,7 @@ class SDPHYDATAW(LiteXModule):
             pads_out.data.oe.eq(1),
             pads_out.data.o.eq(Replicate(C(1), len(pads_out.data.o))),
             If(pads_out.ready,
-                self.crc.reset.eq(1),
+                crc_reset.eq(1),
                 NextState("CRC")
             )
         )
@@ -545,7 +695,7 @@ class SDPHYDATAW(LiteXModule):
 # SDCard PHY Data Read -----------------------------------------------------------------------------
 
 class SDPHYDATAR(LiteXModule):
-    def __init__(self, sdpads_layout, data_width, sys_clk_freq, data_timeout):
+    def __init__(self, sdpads_layout, data_width, sys_clk_freq, data_timeout, with_retiming=False):
         self.pads_in  = pads_in  = stream.Endpoint(sdpads_layout)
         self.pads_out = pads_out = stream.Endpoint(sdpads_layout)
         self.sink     = sink     = stream.Endpoint([("block_length", 10)])
@@ -560,6 +710,7 @@ class SDPHYDATAR(LiteXModule):
         count       = Signal(10)
         crc_count   = Signal(max=17)
         crc_len     = Signal(max=17)
+        crc_check   = Signal()
         crc_correct = Signal()
         crc_error   = Signal()
         data_done   = Signal()
@@ -570,10 +721,18 @@ class SDPHYDATAR(LiteXModule):
         datar_reset   = Signal()
         datar_valid   = Signal()
 
-        self.crc16 = crc16 = CRC16(pads_in.data.i, crc_count)
+        # DATAR Reset (delayed with retiming to follow the delayed pads_in).
+        rx_reset = Signal()
+        _add_retimed(self, rx_reset.eq(datar_reset), with_retiming)
+
+        speeds = _data_speeds(data_width, len(pads_in.data.i))
+
+        crc16_data = pads_in.data.i[:max(_data_lanes[speed] for speed in speeds)]
+        self.crc16 = crc16 = CRC16(crc16_data, None if with_retiming else crc_count)
 
         self.comb += [
-            crc16.reset.eq(datar_reset),
+            crc16.reset.eq(rx_reset),
+            crc16.shift.eq(crc_check),
             data_done.eq(data_count == 0),
             crc16.enable.eq(datar_valid & ~data_done),
         ]
@@ -589,24 +748,25 @@ class SDPHYDATAR(LiteXModule):
         datar_cases = {}
 
         # SD_PHY_SPEED_1X.
-        self.datar_1x = datar_1x = SDPHYR(sdpads_layout, data=True, data_width=1, skip_start_bit=True)
-        self.comb += [
-            datar_1x.reset.eq(datar_reset),
-            pads_in.connect(datar_1x.pads_in),
-        ]
-        datar_cases["default"] = [
-            datar_1x.source.connect(datar_source),
-            crc_len.eq(2),
-            data_len.eq(1),
-            datar_valid.eq(datar_1x.converter.sink.valid),
-            crc_correct.eq(crc16.data_pads_out[0] == pads_in.data.i[0]),
-        ]
+        if SD_PHY_SPEED_1X in speeds:
+            self.datar_1x = datar_1x = SDPHYR(sdpads_layout, data=True, data_width=1, skip_start_bit=True)
+            self.comb += [
+                datar_1x.reset.eq(rx_reset),
+                pads_in.connect(datar_1x.pads_in),
+            ]
+            datar_cases["default"] = [
+                datar_1x.source.connect(datar_source),
+                crc_len.eq(2),
+                data_len.eq(1),
+                datar_valid.eq(datar_1x.converter.sink.valid),
+                crc_correct.eq(crc16.data_pads_out[0] == pads_in.data.i[0]),
+            ]
 
         # SD_PHY_SPEED_4X.
-        if len(pads_in.data.i) >= 4:
+        if SD_PHY_SPEED_4X in speeds:
             self.datar_4x = datar_4x = SDPHYR(sdpads_layout, data=True, data_width=4, skip_start_bit=True)
             self.comb += [
-                datar_4x.reset.eq(datar_reset),
+                datar_4x.reset.eq(rx_reset),
                 pads_in.connect(datar_4x.pads_in),
             ]
             datar_cases[SD_PHY_SPEED_4X] = [
@@ -618,10 +778,10 @@ class SDPHYDATAR(LiteXModule):
             ]
 
         # SD_PHY_SPEED_8X.
-        if len(pads_in.data.i) >= 8:
+        if SD_PHY_SPEED_8X in speeds:
             self.datar_8x = datar_8x = SDPHYR(sdpads_layout, data=True, data_width=8, skip_start_bit=True)
             self.comb += [
-                datar_8x.reset.eq(datar_reset),
+                datar_8x.reset.eq(rx_reset),
                 pads_in.connect(datar_8x.pads_in),
             ]
             datar_cases[SD_PHY_SPEED_8X] = [
@@ -632,7 +792,23 @@ class SDPHYDATAR(LiteXModule):
                 crc_correct.eq(crc16.data_pads_out[:8] == pads_in.data.i[:8]),
             ]
 
-        self.comb += Case(data_width, datar_cases)
+        self.comb += _data_width_mux(data_width, datar_cases)
+
+        # CRC Check.
+        crc_mismatch = Signal()
+        if with_retiming:
+            # Register CRC comparison (CRC error is then reported 1 cycle later).
+            self.sync += crc_mismatch.eq(crc_check & ~crc_correct)
+        else:
+            self.comb += crc_mismatch.eq(crc_check & ~crc_correct)
+
+        # Last/Drop Counts (precomputed with retiming).
+        last_count = Signal(len(count))
+        data_count_last = Signal(len(count))
+        _add_retimed(self, [
+            last_count.eq(sink.block_length + crc_len - 1), # 1 block + CRC
+            data_count_last.eq(sink.block_length - 1),
+        ], with_retiming)
 
         self.fsm = fsm = FSM(reset_state="IDLE")
         fsm.act("IDLE",
@@ -663,8 +839,8 @@ class SDPHYDATAR(LiteXModule):
             source.valid.eq(datar_source.valid),
             source.status.eq(Mux(crc_error, SDCARD_STREAM_STATUS_CRCERROR, SDCARD_STREAM_STATUS_OK)),
             source.first.eq(count == 0),
-            source.last.eq(count == (sink.block_length + crc_len - 1)), # 1 block + CRC
-            source.drop.eq(count > (sink.block_length - 1)), # Drop CRC
+            source.last.eq(count == last_count), # 1 block + CRC
+            source.drop.eq(count > data_count_last), # Drop CRC
             source.data.eq(datar_source.data),
             If(source.valid,
                 If(source.ready,
@@ -683,11 +859,12 @@ class SDPHYDATAR(LiteXModule):
                      self.stop.eq(1)
                 )
             ),
-            If(pads_in.valid & data_done & (crc_count < 16),
+            crc_check.eq(pads_in.valid & data_done & (crc_count < 16)),
+            If(crc_check,
                 NextValue(crc_count, crc_count + 1),
-                If(~crc_correct,
-                    NextValue(crc_error, 1),
-                )
+            ),
+            If(crc_mismatch,
+                NextValue(crc_error, 1),
             ),
             NextValue(timeout, timeout - 1),
             If(timeout == 0,
@@ -794,18 +971,18 @@ class SDPHYIOEmulator(SDPHYIO):
 
         # Data
         self.comb += [
-            pads.dat_i.eq(0b1111),
+            pads.dat_i.eq(2**len(pads.dat_i) - 1),
             If(sdpads.data.oe, pads.dat_i.eq(sdpads.data.o)),
-            sdpads.data.i.eq(0b1111),
+            sdpads.data.i.eq(2**len(sdpads.data.i) - 1),
         ]
         self.add_data_i_ce(clocker, sdpads)
-        for i in range(4):
+        for i in range(len(pads.dat_t)):
             self.comb += If(~pads.dat_t[i], sdpads.data.i[i].eq(pads.dat_o[i]))
 
 # SDCard PHY ---------------------------------------------------------------------------------------
 
 class SDPHY(LiteXModule):
-    def __init__(self, pads, device, sys_clk_freq, cmd_timeout=10e-3, data_timeout=10e-3):
+    def __init__(self, pads, device, sys_clk_freq, cmd_timeout=10e-3, data_timeout=10e-3, fixed_data_width=None, with_clock_fallback=False, with_retiming=False):
         use_emulator = hasattr(pads, "cmd_t") and hasattr(pads, "dat_t")
         self.card_detect = CSRStatus() # Assume SDCard is present if no cd pin.
         self.comb += self.card_detect.status.eq(getattr(pads, "cd", 0))
@@ -813,28 +990,38 @@ class SDPHY(LiteXModule):
         pads_data_width = len(pads.dat_t) if use_emulator else len(pads.data)
         sdpads_layout = _sdpads_layout(pads_data_width)
 
-        data_width = Signal(2)
-
-        self.clocker = clocker = SDPHYClocker()
+        # Data Width: Dynamic (selected at runtime through settings) or Fixed (only generates logic
+        # for this Data Width, settings are then ignored).
+        if fixed_data_width is None:
+            data_width = Signal(2)
+        else:
+            assert fixed_data_width in [1, 4, 8] and fixed_data_width <= pads_data_width
+            data_width = {1: SD_PHY_SPEED_1X, 4: SD_PHY_SPEED_4X, 8: SD_PHY_SPEED_8X}[fixed_data_width]
+            self.fixed_data_width = CSRConstant(fixed_data_width)
+
+        # Retiming: register pads outputs muxing (and delay Clk/Receivers accordingly) and CRC
+        # outputs/checks to improve fmax, at the cost of 1 sys-clk cycle of latency on the pads.
+        self.clocker = clocker = SDPHYClocker(with_retiming)
         self.init    = init    = SDPHYInit(sdpads_layout, with_reset=hasattr(pads, "rst"))
         self.cmdw    = cmdw    = SDPHYCMDW(sdpads_layout)
-        self.cmdr    = cmdr    = SDPHYCMDR(sdpads_layout, sys_clk_freq, cmd_timeout, cmdw)
-        self.dataw   = dataw   = SDPHYDATAW(sdpads_layout, data_width)
-        self.datar   = datar   = SDPHYDATAR(sdpads_layout, data_width, sys_clk_freq, data_timeout)
+        self.cmdr    = cmdr    = SDPHYCMDR(sdpads_layout, sys_clk_freq, cmd_timeout, cmdw, with_retiming)
+        self.dataw   = dataw   = SDPHYDATAW(sdpads_layout, data_width, with_retiming)
+        self.datar   = datar   = SDPHYDATAR(sdpads_layout, data_width, sys_clk_freq, data_timeout, with_retiming)
 
         self.settings = CSRStorage(fields=[
             CSRField("data_width", size=2, offset=0, values=[
                 ("0b00", "1-bit"),
                 ("0b01", "4-bit"),
                 ("0b10", "8-bit"),
-            ], reset=SD_PHY_SPEED_4X), # Defaults to 4x speed for retro-compatibility.
+            ], reset=SD_PHY_SPEED_4X if fixed_data_width is None else data_width), # Defaults to 4x speed for retro-compatibility.
         ])
 
-        self.comb += data_width.eq(self.settings.fields.data_width)
+        if fixed_data_width is None:
+            self.comb += data_width.eq(self.settings.fields.data_width)
 
         self.sdpads = sdpads = Record(sdpads_layout)
 
-        if len(sdpads.data.i) >= 8:
+        if SD_PHY_SPEED_8X in _data_speeds(data_width, len(sdpads.data.i)):
             self.support_8x = CSRConstant(1)
 
         # IOs
@@ -842,13 +1029,13 @@ class SDPHY(LiteXModule):
         self.io = sdphy_cls(clocker, sdpads, pads)
 
         # Connect pads_out of submodules to physical pads ----------------------------------------
-        self.comb += [
-            sdpads.clk.eq(    Reduce("OR", [m.pads_out.clk     for m in [init, cmdw, cmdr, dataw, datar]])),
+        self.comb += sdpads.clk.eq(Reduce("OR", [m.pads_out.clk for m in [init, cmdw, cmdr, dataw, datar]]))
+        _add_retimed(self, [
             sdpads.cmd.oe.eq( Reduce("OR", [m.pads_out.cmd.oe  for m in [init, cmdw, cmdr, dataw, datar]])),
             sdpads.cmd.o.eq(  Reduce("OR", [m.pads_out.cmd.o   for m in [init, cmdw, cmdr, dataw, datar]])),
             sdpads.data.oe.eq(Reduce("OR", [m.pads_out.data.oe for m in [init, cmdw, cmdr, dataw, datar]])),
             sdpads.data.o.eq( Reduce("OR", [m.pads_out.data.o  for m in [init, cmdw, cmdr, dataw, datar]])),
-        ]
+        ], with_retiming)
         for m in [init, cmdw, cmdr, dataw, datar]:
             self.comb += m.pads_out.ready.eq(self.clocker.ce)
         self.comb += self.clocker.clk_en.eq(sdpads.clk)
@@ -863,6 +1050,10 @@ class SDPHY(LiteXModule):
         # Speed Throttling -------------------------------------------------------------------------
         self.comb += clocker.stop.eq(dataw.stop | datar.stop)
 
+        # Clock Fallback (optional) ----------------------------------------------------------------
+        if with_clock_fallback:
+            self.clock_fallback = SDPHYClockFallback(clocker, cmdr, dataw, datar)
+
         # Card Reset -------------------------------------------------------------------------------
         if hasattr(self.io, "card_reset"):
             self.comb += self.io.card_reset.eq(init.card_reset)
@@ -0,0 +1,146 @@
+#
+# This file is part of LiteSDCard.
+#
+# Copyright (c) 2026 Florent Kermarrec <florent@enjoy-digital.fr>
+# SPDX-License-Identifier: BSD-2-Clause
+
+"""
+LiteSDCard LiteScope probes
+
+Standard debug probe set for SDPHY/SDCore: the PHY pads/streams usually probed during bring-up and
+a set of event signals (Cmd start/index, Cmd/Data timeouts, CRC/Write errors, Clk stopped longer
+than a threshold, Core busy/error) on which LiteScope can directly trigger. Use with:
+
+    self.add_sdcard("sdcard")
+    add_sdcard_analyzer(self)
+
+and bench/scope.py on the host to capture/decode transactions (see litesdcard.host.scope).
+"""
+
+from migen import *
+
+from litex.gen import *
+
+from litex.soc.interconnect.csr import *
+
+from litesdcard.common import *
+
+# Layouts ------------------------------------------------------------------------------------------
+
+sdscope_events_layout = [
+    ("cmd_start",    1), # Cmd sent to the PHY (first byte).
+    ("cmd_index",    6), # Index of the last Cmd.
+    ("cmd_timeout",  1), # Cmd response timeout.
+    ("data_timeout", 1), # Data read timeout.
+    ("timeout",      1), # Cmd or Data timeout.
+    ("crc_error",    1), # Data read CRC error or write CRC status error.
+    ("write_error",  1), # Write error status.
+    ("clk_stopped",  1), # Clk stopped longer than clk_stop_threshold.
+    ("read",         1), # Data read beat (PHY source, CRC excluded).
+    ("write",        1), # Data write beat (PHY sink).
+    ("core_busy",    1), # Core transfer ongoing.
+    ("core_error",   1), # Core transfer error.
+]
+
+# SDScope Probes -----------------------------------------------------------------------------------
+
+class SDScopeProbes(LiteXModule):
+    def __init__(self, phy, core=None, clk_stop_threshold=1024):
+        self.clk_stop_threshold = CSRStorage(32, reset=clk_stop_threshold, description="Clk stopped event threshold (in sys-clk cycles).")
+        self.events = events = Record(sdscope_events_layout)
+
+        # # #
+
+        # Cmd start/index (index valid with start).
+        cmd_active = Signal()
+        cmd_index  = Signal(6)
+        cmdw_sink  = phy.cmdw.sink
+        self.comb += [
+            events.cmd_start.eq(cmdw_sink.valid & cmdw_sink.ready & ~cmd_active),
+            events.cmd_index.eq(Mux(events.cmd_start, cmdw_sink.data[0:6], cmd_index)),
+        ]
+        self.sync += [
+            cmd_index.eq(events.cmd_index),
+            If(cmdw_sink.valid & cmdw_sink.ready,
+                cmd_active.eq(~cmdw_sink.last)
+            )
+        ]
+
+        # Timeouts/Errors.
+        cmdr_source  = phy.cmdr.source
+        dataw_source = phy.dataw.source
+        datar_source = phy.datar.source
+        self.comb += [
+            If(cmdr_source.valid & cmdr_source.ready,
+                events.cmd_timeout.eq(cmdr_source.status == SDCARD_STREAM_STATUS_TIMEOUT)
+            ),
+            If(datar_source.valid & datar_source.ready & datar_source.last,
+                events.data_timeout.eq(datar_source.status == SDCARD_STREAM_STATUS_TIMEOUT),
+                events.crc_error.eq(datar_source.status == SDCARD_STREAM_STATUS_CRCERROR),
+            ),
+            If(dataw_source.valid & dataw_source.ready,
+                events.crc_error.eq(dataw_source.status == SDCARD_STREAM_STATUS_CRCERROR),
+                events.write_error.eq(dataw_source.status == SDCARD_STREAM_STATUS_WRITEERROR),
+            ),
+            events.timeout.eq(events.cmd_timeout | events.data_timeout),
+        ]
+
+        # Clk stopped.
+        stop_count = Signal(32)
+        self.sync += [
+            If(phy.clocker.stop,
+                If(~events.clk_stopped,
+                    stop_count.eq(stop_count + 1)
+                )
+            ).Else(
+                stop_count.eq(0)
+            )
+        ]
+        self.comb += events.clk_stopped.eq(phy.clocker.stop & (stop_count >= self.clk_stop_threshold.storage))
+
+        # Data beats.
+        self.comb += [
+            events.read.eq(datar_source.valid & datar_source.ready & ~datar_source.drop),
+            events.write.eq(phy.dataw.sink.valid & phy.dataw.sink.ready),
+        ]
+
+        # Core.
+        if core is not None:
+            self.comb += [
+                events.core_busy.eq(core._busy),
+                events.core_error.eq(core._error),
+            ]
+
+        # Probes.
+        self.signals = [
+            phy.sdpads,
+            phy.cmdw.sink,
+            phy.cmdr.sink,
+            phy.cmdr.source,
+            phy.dataw.sink,
+            phy.dataw.stop,
+            phy.dataw.crc.source,
+            phy.dataw.status.status,
+            phy.datar.sink,
+            phy.datar.source,
+            phy.clocker.ce,
+            phy.clocker.stop,
+            events,
+        ]
+
+# Helpers ------------------------------------------------------------------------------------------
+
+def add_sdcard_analyzer(soc, name="sdcard", depth=2048, clk_stop_threshold=1024, csr_csv="analyzer.csv"):
+    """Add the SDScope probes and a LiteScope analyzer (as soc.analyzer) to a SoC with an SDCard
+    added with add_sdcard (name)."""
+    from litescope import LiteScopeAnalyzer
+    # PHY/Core names: {name}_phy/{name}_core (or sdphy/sdcore on older LiteX).
+    phy    = getattr(soc, f"{name}_phy",  None) or getattr(soc, "sdphy")
+    core   = getattr(soc, f"{name}_core", None) or getattr(soc, "sdcore", None)
+    probes = SDScopeProbes(phy, core, clk_stop_threshold=clk_stop_threshold)
+    soc.add_module(name=f"{name}_scope", module=probes)
+    soc.submodules.analyzer = LiteScopeAnalyzer(probes.signals,
+        depth        = depth,
+        clock_domain = "sys",
+        csr_csv      = csr_csv)
+    return probes
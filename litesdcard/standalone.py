@@ -0,0 +1,161 @@
+#
+# This file is part of LiteSDCard.
+#
+# Copyright (c) 2021-2023 Florent Kermarrec <florent@enjoy-digital.fr>
+# SPDX-License-Identifier: BSD-2-Clause
+
+"""
+LiteSDCard standalone core
+
+SoC wrapping the SDCard PHY/Core/DMAs with Wishbone Control/DMA interfaces, generated by the
+standalone core generator (litesdcard.gen, litesdcard_gen).
+"""
+
+from migen import *
+
+from litex.gen import *
+
+from litex.build.generic_platform import *
+
+from litex.soc.interconnect import wishbone
+from litex.build.io import CRG
+
+from litex.soc.interconnect.csr_eventmanager import *
+from litex.soc.integration.soc import SoCBusHandler, SoCRegion
+from litex.soc.integration.soc_core import SoCMini
+
+from litesdcard.phy import SDPHY
+from litesdcard.core import SDCore
+from litesdcard.frontend.dma import SDBlock2MemDMA, SDMem2BlockDMA
+from litesdcard.scope import SDScopeProbes, sdscope_events_layout
+
+from litesdcard.gen import default_config
+
+# IOs ----------------------------------------------------------------------------------------------
+
+def get_io(data_width=4):
+    return [
+        # Clk / Rst.
+        ("clk", 0, Pins(1)),
+        ("rst", 1, Pins(1)),
+
+        # Interrupt
+        ("irq", 0, Pins(1)),
+
+        # SDCard Pads.
+        ("sdcard", 0,
+            Subsignal("data", Pins(data_width)), # Note: Requires Pullup (internal or external).
+            Subsignal("cmd",  Pins(1)), # Note: Requires Pullup (internal or external).
+            Subsignal("clk",  Pins(1)),
+            Subsignal("cd",   Pins(1)),
+            Subsignal("cmd_dir",   Pins(1)),
+            Subsignal("dat0_dir",  Pins(1)),
+            Subsignal("dat13_dir", Pins(1)),
+        ),
+    ]
+
+# LiteSDCard Core ----------------------------------------------------------------------------------
+
+class LiteSDCardCore(SoCMini):
+    def __init__(self, platform, clk_freq=int(100e6), dma_data_width=32, config=default_config):
+        # CRG --------------------------------------------------------------------------------------
+        self.crg = CRG(platform.request("clk"), platform.request("rst"))
+
+        # SoCMini ----------------------------------------------------------------------------------
+        SoCMini.__init__(self, platform, clk_freq=clk_freq, bus_data_width=dma_data_width)
+
+        # Wishbone Control -------------------------------------------------------------------------
+        # Create Wishbone Control Slave interface, expose it and connect it to the SoC.
+        wb_ctrl = wishbone.Interface()
+        self.bus.add_master(name="wb_ctrl", master=wb_ctrl)
+        platform.add_extension(wb_ctrl.get_ios("wb_ctrl"))
+        self.comb += wb_ctrl.connect_to_pads(self.platform.request("wb_ctrl"), mode="slave")
+
+        # Wishbone DMA -----------------------------------------------------------------------------
+        # Create Wishbone DMA Master interface and expose it.
+        wb_dma = wishbone.Interface(data_width=dma_data_width)
+        platform.add_extension(wb_dma.get_ios("wb_dma"))
+        self.comb += wb_dma.connect_to_pads(self.platform.request("wb_dma"), mode="master")
+
+        # Create DMA Bus Handler (DMAs will be added by add_sdcard to it) and connect it to Wishbone DMA.
+        self.dma_bus = SoCBusHandler(
+            name             = "SoCDMABusHandler",
+            standard         = "wishbone",
+            data_width       = dma_data_width,
+            address_width    = 32,
+        )
+        self.dma_bus.add_slave("dma", slave=wb_dma, region=SoCRegion(origin=0x00000000, size=0x100000000))
+
+        # SDCard -----------------------------------------------------------------------------------
+        # Integrate SDCard as LiteX's add_sdcard method does, with the configured parameters.
+        self.add_sdcard(name="sdcard", config=config)
+
+        # IRQ
+        irq_pad = platform.request("irq")
+        self.comb += irq_pad.eq(self.sdcard_irq.irq)
+
+        # Instrumentation --------------------------------------------------------------------------
+        # Expose the SDScope events for an external logic analyzer/monitor.
+        if config["instrumentation"]:
+            self.sdcard_scope = SDScopeProbes(self.sdcard_phy, self.sdcard_core)
+            platform.add_extension([("sdscope", 0, *[
+                Subsignal(name, Pins(width)) for name, width in sdscope_events_layout])])
+            sdscope_pads = platform.request("sdscope")
+            for name, width in sdscope_events_layout:
+                self.comb += getattr(sdscope_pads, name).eq(getattr(self.sdcard_scope.events, name))
+
+    def add_sdcard(self, name="sdcard", config=default_config):
+        phy_config = config["phy"]
+        dma_config = config["dma"]
+        mode       = dma_config["mode"]
+        assert mode in ["read", "write", "read+write"]
+
+        # Core.
+        sdcard_pads = self.platform.request("sdcard")
+        sdcard_phy  = SDPHY(sdcard_pads, self.platform.device, self.clk_freq,
+            cmd_timeout      = phy_config["cmd_timeout"],
+            data_timeout     = phy_config["data_timeout"],
+            fixed_data_width = phy_config["fixed_data_width"],
+            with_retiming    = phy_config["with_retiming"])
+        sdcard_core = SDCore(sdcard_phy, with_retry=config["core"]["with_retry"])
+        self.add_module(name=f"{name}_phy",  module=sdcard_phy)
+        self.add_module(name=f"{name}_core", module=sdcard_core)
+
+        # Block2Mem/Mem2Block DMAs.
+        dmas = []
+        for dma, direction in [("block2mem", "read"), ("mem2block", "write")]:
+            if direction not in mode:
+                continue
+            bus = wishbone.Interface(
+                data_width = self.bus.data_width,
+                adr_width  = self.bus.get_address_width(standard="wishbone"),
+                addressing = "word",
+            )
+            if dma == "block2mem":
+                sdcard_dma = SDBlock2MemDMA(bus=bus, endianness=self.cpu.endianness,
+                    fifo_depth = dma_config["fifo_depth"])
+                self.comb += sdcard_core.source.connect(sdcard_dma.sink)
+            else:
+                sdcard_dma = SDMem2BlockDMA(bus=bus, endianness=self.cpu.endianness,
+                    fifo_depth     = dma_config["fifo_depth"],
+                    dma_fifo_depth = dma_config["reader_fifo_depth"])
+                self.comb += sdcard_dma.source.connect(sdcard_core.sink)
+            self.add_module(name=f"{name}_{dma}", module=sdcard_dma)
+            self.dma_bus.add_master(name=f"{name}_{dma}", master=bus)
+            dmas.append((dma, sdcard_dma))
+
+        # Interrupts.
+        sdcard_irq = EventManager()
+        self.add_module(name=f"{name}_irq", module=sdcard_irq)
+        sdcard_irq.card_detect = EventSourcePulse(description="SDCard has been ejected/inserted.")
+        for dma, sdcard_dma in dmas:
+            setattr(sdcard_irq, f"{dma}_dma", EventSourcePulse(description=f"{dma.capitalize()} DMA terminated."))
+        sdcard_irq.cmd_done = EventSourceLevel(description="Command completed.")
+        sdcard_irq.finalize()
+        for dma, sdcard_dma in dmas:
+            self.comb += getattr(sdcard_irq, f"{dma}_dma").trigger.eq(sdcard_dma.irq)
+        self.comb += [
+            sdcard_irq.card_detect.trigger.eq(sdcard_phy.card_detect_irq),
+            sdcard_irq.cmd_done.trigger.eq(sdcard_core.cmd_event.fields.done)
+        ]
+
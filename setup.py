@@ -21,7 +21,7 @@ setup(
     test_suite                    = "test",
     license                       = "BSD",
     python_requires               = "~=3.7",
-    install_requires              = ["pyyaml", "litex"],
+    install_requires              = ["pyyaml", "numpy", "litex"],
     extras_require                = {
         "develop": [
           "meson"
@@ -45,6 +45,7 @@ setup(
     entry_points                  = {
         "console_scripts": [
             "litesdcard_gen=litesdcard.gen:main",
+            "litesdcard_bench=litesdcard.bench:main",
         ],
     },
 )
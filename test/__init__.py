@@ -0,0 +1,5 @@
+import os
+import unittest
+
+# Slow tests (full SDCore/SDPHY/SDCardModel simulations): only run with LITESDCARD_SLOW_TESTS=1.
+slow = unittest.skipUnless(os.environ.get("LITESDCARD_SLOW_TESTS"), "Slow test (LITESDCARD_SLOW_TESTS=1 to run).")
@@ -0,0 +1,96 @@
+#
+# This file is part of LiteSDCard.
+#
+# Copyright (c) 2026 Florent Kermarrec <florent@enjoy-digital.fr>
+# SPDX-License-Identifier: BSD-2-Clause
+
+import os
+import asyncio
+import unittest
+import tempfile
+
+from litesdcard.common import *
+from litesdcard.host.standin import SoCStandIn, EtherboneUDPServer
+from litesdcard.host.aio import AsyncEtherbone, AsyncSDCardDriver, run_bist
+
+
+class TestAIO(unittest.TestCase):
+    def setUp(self):
+        self.tmp     = tempfile.TemporaryDirectory()
+        self.csr_csv = os.path.join(self.tmp.name, "csr.csv")
+        self.servers = []
+
+    def tearDown(self):
+        for server in self.servers:
+            server.close()
+        self.tmp.cleanup()
+
+    def server(self, with_bist=False, **kwargs):
+        soc    = SoCStandIn(bytearray(16*1024*1024), with_bist=with_bist)
+        server = EtherboneUDPServer(soc, **kwargs)
+        server.open()
+        soc.write_csv(self.csr_csv)
+        self.servers.append(server)
+        return server
+
+    def test_pipelined_reads(self):
+        server = self.server(drop=5)
+        server.soc.mem[0:16384] = bytes(i & 0xff for i in range(16384))
+        async def main():
+            bus = await AsyncEtherbone("localhost", server.port, csr_csv=self.csr_csv, timeout=0.05).open()
+            # 16KB fetched in 17 bursts, concurrently, with lost responses retried.
+            sdcard = AsyncSDCardDriver(bus)
+            data   = await sdcard.mem_read(sdcard.mem_base, 16384)
+            bus.close()
+            return data, bus.retried
+        data, retried = asyncio.run(main())
+        self.assertEqual(data, bytes(i & 0xff for i in range(16384)))
+        self.assertGreater(retried, 0)
+
+    def test_run_bist(self):
+        servers = [self.server(latency=0.001) for i in range(4)]
+        async def main():
+            drivers = []
+            for server in servers:
+                bus = await AsyncEtherbone("localhost", server.port, csr_csv=self.csr_csv).open()
+                drivers.append(AsyncSDCardDriver(bus))
+            # Initialization/BIST of the 4 targets interleaved.
+            results = await run_bist(drivers, count=8, loops=2)
+            self.assertEqual(drivers[0].size, 16*1024*1024)
+            for driver in drivers:
+                driver.bus.close()
+            return results
+        results = asyncio.run(main())
+        self.assertEqual(results["passed"], 4)
+        self.assertEqual(results["errors"], 0)
+        self.assertEqual(results["bytes"], 4*2*8*512)
+        for server in servers:
+            self.assertIn("ACMD41", server.soc.model.commands)
+            self.assertEqual(server.soc.model.width, 4)
+
+    def test_driver_methods(self):
+        # Inherited SDCardDriver methods doing reads are awaitable and run their full sequence.
+        server = self.server(with_bist=True)
+        async def main():
+            bus    = await AsyncEtherbone("localhost", server.port, csr_csv=self.csr_csv).open()
+            sdcard = AsyncSDCardDriver(bus)
+            await sdcard.init(data_width=1)
+            self.assertEqual(server.soc.model.width, 1)
+            commands = len(server.soc.model.commands)
+            await sdcard.set_bus_width(4)
+            self.assertEqual(server.soc.model.commands[commands:], ["CMD55", "ACMD6"])
+            self.assertEqual(server.soc.model.width, 4)
+            self.assertEqual(await bus.read(bus.regs.sdcard_phy_settings.addr), SD_PHY_SPEED_4X)
+            _, _, response = await sdcard.acmd(13)
+            self.assertEqual(server.soc.model.commands[-1], "ACMD13")
+            results = await sdcard.bist_gateware(block=100, count=4, loops=2)
+            self.assertEqual(results["errors"], 0)
+            self.assertEqual(results["bytes"], 2*4*512)
+            self.assertEqual(server.soc.model.commands[-4:], ["CMD25", "CMD12", "CMD18", "CMD12"])
+            await sdcard.write(200, bytes(range(256))*2)
+            self.assertEqual(await sdcard.read(200), bytes(range(256))*2)
+            bus.close()
+        asyncio.run(main())
+
+if __name__ == "__main__":
+    unittest.main()
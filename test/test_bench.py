@@ -0,0 +1,51 @@
+#
+# This file is part of LiteSDCard.
+#
+# Copyright (c) 2026 Florent Kermarrec <florent@enjoy-digital.fr>
+# SPDX-License-Identifier: BSD-2-Clause
+
+import io
+import os
+import json
+import unittest
+import tempfile
+import contextlib
+
+from litesdcard.bench import main
+
+
+class TestBench(unittest.TestCase):
+    def bench_sim(self, *args):
+        with tempfile.TemporaryDirectory() as tmp:
+            filename = os.path.join(tmp, "results.json")
+            with contextlib.redirect_stdout(io.StringIO()) as stdout:
+                ret = main(["--sim", "--sim-size", "16", "--start-block", "0x100",
+                    "--divider", "0", "3", "--data-width", "1", "4",
+                    "--count", "8", "--loops", "2", "--ios", "10", "--span", "64",
+                    "--bist-count", "8", "--bist-loops", "2",
+                    "--json", filename, *args])
+            with open(filename) as f:
+                results = json.load(f)
+        self.assertEqual(ret, 0)
+        self.assertIn("BIST: PASS", stdout.getvalue())
+        return results
+
+    def test_bench_sim_bist_gateware(self):
+        results = self.bench_sim("--sim-bist")
+        self.assertTrue(results["bist"]["gateware"])
+        self.assertEqual(results["bist"]["errors"], 0)
+
+    def test_bench_sim(self):
+        results = self.bench_sim()
+        self.assertFalse(results["bist"]["gateware"])
+        self.assertTrue(results["passed"])
+        self.assertEqual(results["card"]["size"], 16*1024*1024)
+        self.assertEqual(results["bist"]["errors"], 0)
+        self.assertEqual(len(results["sweep"]), 2*2*2)
+        for result in results["sweep"]:
+            self.assertGreater(result["mbps"], 0)
+            self.assertGreater(result["iops"], 0)
+            self.assertLessEqual(result["latency_us"]["p50"], result["latency_us"]["max"])
+
+if __name__ == "__main__":
+    unittest.main()
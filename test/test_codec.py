@@ -0,0 +1,103 @@
+#
+# This file is part of LiteSDCard.
+#
+# Copyright (c) 2026 Florent Kermarrec <florent@enjoy-digital.fr>
+# SPDX-License-Identifier: BSD-2-Clause
+
+import unittest
+
+import numpy as np
+
+from migen import *
+
+from litesdcard.crc import CRC
+from litesdcard.host.codec import *
+
+
+class TestCodec(unittest.TestCase):
+    def test_crc(self):
+        # CMD0/CMD17 CRC7 (from SD specification).
+        self.assertEqual(crc7(int_to_bits(0x4000000000, 40)), 0x4a)
+        self.assertEqual(crc7(int_to_bits(0x5100000000, 40)), 0x2a)
+        # CRC16 of 512 0xff bytes (from SD specification).
+        self.assertEqual(crc16(np.unpackbits(np.full(512, 0xff, dtype=np.uint8))), 0x7fa1)
+
+    def test_crc_gateware(self):
+        # Cross-check with gateware CRC7 (as used by the Core).
+        data = np.random.RandomState(42).randint(0, 256, size=16, dtype=np.uint8)
+        def gen(dut):
+            yield dut.reset.eq(1)
+            yield
+            yield dut.reset.eq(0)
+            for byte in data:
+                yield dut.enable.eq(1)
+                yield dut.din.eq(int(byte))
+                yield
+            yield dut.enable.eq(0)
+            yield
+            self.assertEqual(crc7(np.unpackbits(data)), (yield dut.crc))
+        dut = CRC(polynom=0x9, taps=7, dw=8)
+        run_simulation(dut, gen(dut))
+
+    def test_command(self):
+        prng     = np.random.RandomState(42)
+        index    = prng.randint(0, 64, size=1000)
+        argument = prng.randint(0, 2**32, size=1000, dtype=np.uint64)
+        bits     = encode_command(index, argument)
+        self.assertEqual(bits.shape, (1000, COMMAND_BITS))
+        self.assertEqual(bits_to_int(encode_command(0, 0)), 0x400000000095)
+        _index, _argument, valid = decode_command(bits)
+        np.testing.assert_array_equal(_index, index)
+        np.testing.assert_array_equal(_argument, argument)
+        self.assertTrue(np.all(valid))
+        # Bit errors are detected.
+        bits[np.arange(1000), prng.randint(0, COMMAND_BITS, size=1000)] ^= 1
+        self.assertFalse(np.any(decode_command(bits)[2]))
+
+    def test_response(self):
+        prng   = np.random.RandomState(42)
+        index  = prng.randint(0, 64, size=1000)
+        status = prng.randint(0, 2**32, size=1000, dtype=np.uint64)
+        _index, _status, valid = decode_response_r1(encode_response_r1(index, status))
+        np.testing.assert_array_equal(_index, index)
+        np.testing.assert_array_equal(_status, status)
+        self.assertTrue(np.all(valid))
+        self.assertFalse(np.any(decode_command(encode_response_r1(index, status))[2]))
+
+        register = prng.randint(0, 256, size=(100, 16)).astype(np.uint8)
+        bits     = encode_response_r2(register)
+        self.assertEqual(bits.shape, (100, R2_BITS))
+        _register, valid = decode_response_r2(bits)
+        np.testing.assert_array_equal(_register[:, :15], register[:, :15])
+        self.assertTrue(np.all(valid))
+        self.assertTrue(np.all(_register[:, 15] & 1))
+
+    def test_data_block(self):
+        prng = np.random.RandomState(42)
+        for width in [1, 4, 8]:
+            data   = prng.randint(0, 256, size=(256, 512)).astype(np.uint8)
+            values = encode_data_block(data, width)
+            self.assertEqual(values.shape, (256, data_block_clocks(512, width)))
+            _data, valid = decode_data_block(values, 512, width)
+            np.testing.assert_array_equal(_data, data)
+            self.assertTrue(np.all(valid))
+            # Lane CRC16 matches the CRC16 of each lane.
+            lane_bits = (values[0, 1:-17] >> 0) & 1
+            lane_crc  = bits_to_int((values[0, -17:-1] >> 0) & 1)
+            self.assertEqual(crc16(lane_bits), lane_crc)
+            # Bit errors are detected.
+            values[np.arange(256), prng.randint(0, values.shape[1], size=256)] ^= 1
+            self.assertFalse(np.any(decode_data_block(values, 512, width)[1]))
+        # 4-bit ordering: high nibble first.
+        self.assertEqual(list(encode_data_block([0x12, 0x34], 4)[1:5]), [0x1, 0x2, 0x3, 0x4])
+
+    def test_crc_status(self):
+        status = np.array([CRC_STATUS_ACCEPTED, CRC_STATUS_CRC_ERROR, CRC_STATUS_WRITE_ERROR])
+        bits   = encode_crc_status(status)
+        self.assertEqual(list(bits[0]), [0, 0, 1, 0, 1])
+        _status, valid = decode_crc_status(bits)
+        np.testing.assert_array_equal(_status, status)
+        self.assertTrue(np.all(valid))
+
+if __name__ == '__main__':
+        unittest.main()
@@ -0,0 +1,147 @@
+#
+# This file is part of LiteSDCard.
+#
+# Copyright (c) 2026 Florent Kermarrec <florent@enjoy-digital.fr>
+# SPDX-License-Identifier: BSD-2-Clause
+
+import os
+import unittest
+
+from migen import *
+
+from litex.gen import *
+
+from litesdcard.common import *
+from litesdcard.phy import SDPHY
+from litesdcard.core import SDCore
+from litesdcard.emulator.core import _sdemulator_pads
+from litesdcard.emulator.perf import _command
+from litesdcard.emulator.model import SDCardModel, CARD_STATE_TRAN
+
+# Retry DUT ----------------------------------------------------------------------------------------
+
+class RetryDUT(LiteXModule):
+    def __init__(self):
+        self.pads = _sdemulator_pads()
+        self.phy  = SDPHY(self.pads, "", 100e6, cmd_timeout=20e-6, data_timeout=20e-6, with_clock_fallback=True)
+        self.core = SDCore(self.phy, with_retry=True)
+        self.phy.clocker.divider.storage.reset    = 0
+        self.phy.settings.storage.reset           = SD_PHY_SPEED_4X
+        self.phy.settings.fields.data_width.reset = SD_PHY_SPEED_4X
+
+# Test Core ----------------------------------------------------------------------------------------
+
+class TestCore(unittest.TestCase):
+    block_length = 64
+
+    def retry_test(self, cmds, fault, after=0, data=None):
+        """Run cmds (cmd, argument, cmd_type, data_type, block_count) with a fault injected, returns
+        the Cmds received by the card (index, argument), the read Data and the model."""
+        dut   = RetryDUT()
+        image = bytearray(os.urandom(8*512))
+        model = SDCardModel(dut.pads, image)
+        model.state  = CARD_STATE_TRAN
+        model.width  = 4
+        model.length = self.block_length
+        model.inject(fault, after)
+        received = []
+        reads    = []
+        retries  = {}
+
+        # Log Cmds with their argument.
+        command = model.command
+        def logged_command(index, argument):
+            received.append((index, argument))
+            return command(index, argument)
+        model.command = logged_command
+
+        @passive
+        def source():
+            yield dut.core.source.ready.eq(1)
+            while True:
+                if (yield dut.core.source.valid):
+                    reads.append((yield dut.core.source.data))
+                yield
+
+        @passive
+        def sink():
+            for i, byte in enumerate(data or []):
+                yield dut.core.sink.valid.eq(1)
+                yield dut.core.sink.data.eq(byte)
+                yield
+                while not (yield dut.core.sink.ready):
+                    yield
+            yield dut.core.sink.valid.eq(0)
+
+        def generator():
+            for cmd, argument, cmd_type, data_type, block_count in cmds:
+                yield from _command(dut, cmd, argument, cmd_type, data_type,
+                    block_length = self.block_length,
+                    block_count  = block_count)
+            retries["cmd"]  = (yield dut.core.cmd_retries.status)
+            retries["data"] = (yield dut.core.data_retries.status)
+            self.fallback_errors = (yield dut.phy.clock_fallback.errors.status)
+
+        run_simulation(dut, [generator(), source(), sink(), *model.get_generators()])
+        self.assertEqual(model.faults, {}) # Fault applied.
+        return received, bytes(reads), retries, image
+
+    def test_cmd_crc_retry(self):
+        received, _, retries, _ = self.retry_test(
+            cmds  = [(13, 0x12340000, SDCARD_CTRL_RESPONSE_SHORT, SDCARD_CTRL_DATA_TRANSFER_NONE, 0)],
+            fault = "cmd_crc")
+        # Cmd sent again (with a valid CRC7, accepted by the card).
+        self.assertEqual(received, [(13, 0x12340000), (13, 0x12340000)])
+        self.assertEqual(retries, {"cmd": 1, "data": 0})
+        # Cmd CRC Error reported to PHY's Clk fallback.
+        self.assertEqual(self.fallback_errors, 1)
+
+    def test_cmd_timeout_retry(self):
+        received, _, retries, _ = self.retry_test(
+            cmds  = [(13, 0x12340000, SDCARD_CTRL_RESPONSE_SHORT, SDCARD_CTRL_DATA_TRANSFER_NONE, 0)],
+            fault = "cmd_timeout")
+        self.assertEqual(received, [(13, 0x12340000)])
+        self.assertEqual(retries, {"cmd": 1, "data": 0})
+
+    def test_read_crc_retry(self):
+        received, reads, retries, image = self.retry_test(
+            cmds  = [
+                (18, 2, SDCARD_CTRL_RESPONSE_SHORT,      SDCARD_CTRL_DATA_TRANSFER_READ, 4),
+                (12, 0, SDCARD_CTRL_RESPONSE_SHORT_BUSY, SDCARD_CTRL_DATA_TRANSFER_NONE, 0),
+            ],
+            fault = "read_crc",
+            after = 1)
+        # Stopped and resumed from the failing block, only valid blocks forwarded.
+        self.assertEqual(received, [(18, 2), (12, 0), (18, 3), (12, 0)])
+        self.assertEqual(reads, b"".join(image[512*b:512*b + self.block_length] for b in range(2, 6)))
+        self.assertEqual(retries, {"cmd": 0, "data": 1})
+
+    def test_write_crc_retry(self):
+        data = os.urandom(4*self.block_length)
+        received, _, retries, image = self.retry_test(
+            cmds  = [
+                (25, 2, SDCARD_CTRL_RESPONSE_SHORT,      SDCARD_CTRL_DATA_TRANSFER_WRITE, 4),
+                (12, 0, SDCARD_CTRL_RESPONSE_SHORT_BUSY, SDCARD_CTRL_DATA_TRANSFER_NONE,  0),
+            ],
+            fault = "write_crc",
+            after = 2,
+            data  = data)
+        # Stopped and resumed from the failing block, failing block written again.
+        self.assertEqual(received, [(25, 2), (12, 0), (25, 4), (12, 0)])
+        for i in range(4):
+            block = image[512*(2 + i):512*(2 + i) + self.block_length]
+            self.assertEqual(block, data[i*self.block_length:(i + 1)*self.block_length])
+        self.assertEqual(retries, {"cmd": 0, "data": 1})
+
+    def test_write_single_crc_retry(self):
+        data = os.urandom(self.block_length)
+        received, _, retries, image = self.retry_test(
+            cmds  = [(24, 5, SDCARD_CTRL_RESPONSE_SHORT, SDCARD_CTRL_DATA_TRANSFER_WRITE, 1)],
+            fault = "write_crc",
+            data  = data)
+        self.assertEqual(received, [(24, 5), (24, 5)])
+        self.assertEqual(image[512*5:512*5 + self.block_length], data)
+        self.assertEqual(retries, {"cmd": 0, "data": 1})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -43,7 +43,7 @@ class TestCRC(unittest.TestCase):
                 yield
 
         dut = CRC16(data_pads, count)
-        run_simulation(dut, gen(dut), vcd_name="sim.vcd")
+        run_simulation(dut, gen(dut))
 
     def test_crc_inserter_ones(self):
         self.crc_inserter_test(data=[0xff]*512, crc=0x7fa1, data_pads_width=1)
@@ -57,5 +57,96 @@ class TestCRC(unittest.TestCase):
             data += word.to_bytes(4, "big")
         self.crc_inserter_test(data=data, crc=0x6b02)
 
+    def crc_reference(self, polynom, taps, bits, init=0):
+        # Bit-serial software CRC reference.
+        crc = init
+        for bit in bits:
+            inv = bit ^ ((crc >> (taps - 1)) & 1)
+            crc = ((crc << 1) & (2**taps - 1)) ^ (polynom if inv else 0)
+        return crc
+
+    def test_crc_reference(self):
+        import random
+        def gen(dut, polynom, taps, dw, words):
+            yield dut.reset.eq(1)
+            yield
+            yield dut.reset.eq(0)
+            bits = []
+            for word in words:
+                yield dut.enable.eq(1)
+                yield dut.din.eq(word)
+                bits += [(word >> (dw - 1 - i)) & 1 for i in range(dw)]
+                yield
+            yield dut.enable.eq(0)
+            yield
+            self.assertEqual(self.crc_reference(polynom, taps, bits), (yield dut.crc))
+
+        # SDCard CMD0 CRC7.
+        dut = CRC(polynom=0x9, taps=7, dw=8)
+        run_simulation(dut, gen(dut, 0x9, 7, 8, [0x40, 0x00, 0x00, 0x00, 0x00]))
+        self.assertEqual(self.crc_reference(0x9, 7, [(b >> (7-i)) & 1
+            for b in [0x40, 0x00, 0x00, 0x00, 0x00] for i in range(8)]), 0x4a)
+
+        prng = random.Random(42)
+        for polynom, taps in [(0x9, 7), (0x1021, 16)]:
+            for dw in [1, 4, 8, 32]:
+                words = [prng.randrange(2**dw) for i in range(32)]
+                dut = CRC(polynom=polynom, taps=taps, dw=dw)
+                run_simulation(dut, gen(dut, polynom, taps, dw, words))
+
+    def test_crc_equations(self):
+        from litesdcard.crc import _crc_equations, _xor_factorize
+        for polynom, taps, dw in [(0x9, 7, 8), (0x1021, 16, 8), (0x1021, 16, 32)]:
+            equations = _crc_equations(polynom, taps, dw)
+            shared, factorized = _xor_factorize(equations, taps + dw)
+            # Expand shared variables: factorized equations must match the original ones.
+            masks = [1 << v for v in range(taps + dw)]
+            for a, b in shared:
+                masks.append(masks[a] ^ masks[b])
+            for equation, factorized_equation in zip(equations, factorized):
+                mask = 0
+                for v in factorized_equation:
+                    mask ^= masks[v]
+                self.assertEqual(mask, sum(1 << v for v in equation))
+            # Sharing must reduce the number of 2-input XORs.
+            xors            = sum(len(equation) - 1 for equation in equations)
+            factorized_xors = len(shared) + sum(len(equation) - 1 for equation in factorized)
+            self.assertLess(factorized_xors, xors)
+
+    def test_parallel_crc16(self):
+        import random
+        def gen(dut, lanes, k, words):
+            # Feed k words of lanes bits per cycle (MSB word first).
+            yield dut.reset.eq(1)
+            yield
+            yield dut.reset.eq(0)
+            for i in range(0, len(words), k):
+                yield dut.enable.eq(1)
+                yield dut.din.eq(sum(word << ((k-1-j)*lanes) for j, word in enumerate(words[i:i+k])))
+                yield
+            yield dut.enable.eq(0)
+            yield
+            # Check CRCs.
+            crcs = [self.crc_reference(0x1021, 16, [(word >> n) & 1 for word in words]) for n in range(lanes)]
+            for n in range(lanes):
+                self.assertEqual(crcs[n], (yield dut.crc[n]))
+            # Check shifted out CRCs.
+            yield dut.shift.eq(1)
+            yield
+            for i in range(16//k):
+                dout = (yield dut.dout)
+                for j in range(k):
+                    word = (dout >> ((k-1-j)*lanes)) & (2**lanes - 1)
+                    for n in range(lanes):
+                        self.assertEqual((crcs[n] >> (16-1-(i*k + j))) & 1, (word >> n) & 1)
+                yield
+
+        prng = random.Random(42)
+        for lanes in [1, 4, 8]:
+            for k in [1, 2, 4, 8]:
+                words = [prng.randrange(2**lanes) for i in range(128)]
+                dut = ParallelCRC16(lanes=lanes, k=k)
+                run_simulation(dut, gen(dut, lanes, k, words))
+
 if __name__ == '__main__':
         unittest.main()
@@ -0,0 +1,120 @@
+#
+# This file is part of LiteSDCard.
+#
+# Copyright (c) 2026 Florent Kermarrec <florent@enjoy-digital.fr>
+# SPDX-License-Identifier: BSD-2-Clause
+
+import os
+import time
+import unittest
+import tempfile
+
+from litesdcard.common import *
+from litesdcard.host.standin import SoCStandIn, EtherboneServer
+from litesdcard.host.driver import BatchRemoteClient, CSRBatch, SDCardDriver
+
+
+class TestDriver(unittest.TestCase):
+    def setUp(self):
+        self.tmp    = tempfile.TemporaryDirectory()
+        self.soc    = SoCStandIn(bytearray(bytes(range(256))*2*32768))
+        self.server = EtherboneServer(self.soc)
+        self.server.open()
+        csr_csv = os.path.join(self.tmp.name, "csr.csv")
+        self.soc.write_csv(csr_csv)
+        self.bus = BatchRemoteClient(port=self.server.port, csr_csv=csr_csv)
+        self.bus.open()
+
+    def tearDown(self):
+        self.bus.close()
+        self.server.close()
+        self.tmp.cleanup()
+
+    def packets_since(self, packets, expected, timeout=1.0):
+        # Writes are not acknowledged: wait for the server to handle them before counting.
+        start = time.time()
+        while (self.server.packets - packets < expected) and (time.time() - start < timeout):
+            time.sleep(1e-3)
+        return self.server.packets - packets
+
+    def test_batch(self):
+        regs  = self.bus.regs
+        batch = CSRBatch(self.bus)
+        packets = self.server.packets
+        batch.write(regs.sdcard_block2mem_dma_base,   0x40001000)
+        batch.write(regs.sdcard_block2mem_dma_length, 1024)
+        batch.write(regs.sdcard_mem2block_dma_length, 512)
+        batch.flush()
+        self.assertEqual(self.packets_since(packets, 2), 2)
+        packets = self.server.packets
+        values  = batch.read(
+            regs.sdcard_mem2block_dma_length,
+            regs.sdcard_block2mem_dma_base,
+            regs.sdcard_block2mem_dma_length)
+        self.assertEqual(values, [512, 0x40001000, 1024])
+        self.assertEqual(self.server.packets - packets, 1)
+
+    def test_driver(self):
+        sdcard = SDCardDriver(self.bus)
+        sdcard.init()
+        self.assertEqual(sdcard.size, 16*1024*1024)
+        self.assertEqual(self.soc.model.width, 4)
+        self.assertIn("ACMD41", self.soc.model.commands)
+
+        # Read (Single/Multiple).
+        self.assertEqual(sdcard.read(0), bytes(range(256))*2)
+        packets = self.server.packets
+        self.assertEqual(sdcard.read(16, count=32), bytes(range(256))*2*32)
+        self.assertLess(self.server.packets - packets, 32) # 16KB fetched in 255-word bursts.
+
+        # Write (Single/Multiple).
+        data = bytes((i*7) & 0xff for i in range(512*8))
+        sdcard.write(100, data)
+        self.assertEqual(bytes(self.soc.model.mem[100*512:108*512]), data)
+        sdcard.write(200, data[:512])
+        self.assertEqual(sdcard.read(200), data[:512])
+
+        # BIST.
+        results = sdcard.bist(block=1000, count=4, loops=2)
+        self.assertEqual(results["errors"], 0)
+        self.assertEqual(results["bytes"], 2*4*512)
+
+    def test_driver_bist_gateware(self):
+        soc    = SoCStandIn(bytearray(4*1024*1024), with_bist=True)
+        server = EtherboneServer(soc)
+        server.open()
+        csr_csv = os.path.join(self.tmp.name, "csr_bist.csv")
+        soc.write_csv(csr_csv)
+        bus = BatchRemoteClient(port=server.port, csr_csv=csr_csv)
+        bus.open()
+        try:
+            sdcard = SDCardDriver(bus)
+            self.assertFalse(SDCardDriver(self.bus).has_bist)
+            self.assertTrue(sdcard.has_bist)
+            sdcard.init()
+            packets = server.packets
+            results = sdcard.bist_gateware(block=1000, count=4, loops=2)
+            self.assertEqual(results["errors"], 0)
+            self.assertEqual(results["bytes"], 2*4*512)
+            # Data from the generator (no memory transfers over the bus).
+            words = bytes(soc.model.mem[1000*512:1004*512])
+            self.assertEqual(words, b"".join(i.to_bytes(4, "little") for i in range(4*512//4)))
+            self.assertLess(server.packets - packets, 64)
+            # Corrupted block detected by the checker (in 32-bit words).
+            sdcard.write(1001, bytes(512))
+            sdcard._bist_start("bist_checker", 4)
+            sdcard.cmd(18, 1000,
+                data_type    = SDCARD_CTRL_DATA_TRANSFER_READ,
+                block_length = 512,
+                block_count  = 4)
+            sdcard.cmd(12, cmd_type=SDCARD_CTRL_RESPONSE_SHORT_BUSY)
+            sdcard._run(sdcard._bist_wait("bist_checker"))
+            self.assertEqual(bus.regs.sdcard_bist_checker_errors.read(), 512//4)
+            # DMAs used again once the BIST is done.
+            self.assertEqual(sdcard.bist(block=2000, count=2)["errors"], 0)
+        finally:
+            bus.close()
+            server.close()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+#
+# This file is part of LiteSDCard.
+#
+# Copyright (c) 2026 Florent Kermarrec <florent@enjoy-digital.fr>
+# SPDX-License-Identifier: BSD-2-Clause
+
+import io
+import os
+import json
+import unittest
+import tempfile
+import contextlib
+import importlib.util
+from unittest import mock
+
+from litex.build.xilinx.platform import XilinxPlatform
+
+from litesdcard.gen import default_config, load_config, config_hash, cached, get_io, main
+from litesdcard.gen import LiteSDCardCore
+
+
+class TestGen(unittest.TestCase):
+    def test_config(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            filename = os.path.join(tmp, "config.yml")
+            with open(filename, "w") as f:
+                f.write("clk_freq: 50e6\nphy:\n  with_retiming: true\ndma:\n  fifo_depth: 1024\n")
+            config = load_config(filename, vendor="lattice")
+            self.assertEqual(config["clk_freq"], "50e6")
+            self.assertEqual(config["vendor"], "lattice")
+            self.assertEqual(config["phy"]["with_retiming"], True)
+            self.assertEqual(config["phy"]["data_width"], default_config["phy"]["data_width"])
+            self.assertEqual(config["dma"]["fifo_depth"], 1024)
+            with open(filename, "w") as f:
+                f.write("phy:\n  with_retimming: true\n")
+            with self.assertRaises(ValueError):
+                load_config(filename)
+
+    def test_cache(self):
+        config = load_config()
+        hash   = config_hash(config)
+        self.assertEqual(hash, config_hash(load_config()))
+        self.assertNotEqual(hash, config_hash(load_config(dma_data_width=64)))
+        with tempfile.TemporaryDirectory() as tmp:
+            self.assertFalse(cached(tmp, hash))
+            os.makedirs(os.path.join(tmp, "gateware"))
+            open(os.path.join(tmp, "gateware", "litesdcard_core.v"), "w").close()
+            with open(os.path.join(tmp, "litesdcard_gen.json"), "w") as f:
+                json.dump({"hash": config_hash(dict(config, clk_freq=int(100e6), dma_data_width=32))}, f)
+            # Up to date: generation skipped.
+            with contextlib.redirect_stdout(io.StringIO()) as stdout:
+                main(["--output-dir", tmp])
+            self.assertIn("up to date", stdout.getvalue())
+            self.assertEqual(sorted(os.listdir(tmp)), ["gateware", "litesdcard_gen.json"])
+
+    def test_cache_migen(self):
+        # Migen sources are part of the hash.
+        find_spec = importlib.util.find_spec
+        with tempfile.TemporaryDirectory() as tmp:
+            filename = os.path.join(tmp, "__init__.py")
+            def migen_spec(name):
+                return importlib.util.spec_from_file_location(name, filename) if name == "migen" else find_spec(name)
+            with mock.patch("importlib.util.find_spec", migen_spec):
+                with open(filename, "w") as f:
+                    f.write("# Migen\n")
+                hash = config_hash(load_config())
+                with open(filename, "w") as f:
+                    f.write("# Migen (updated)\n")
+                self.assertNotEqual(hash, config_hash(load_config()))
+
+    def test_core(self):
+        config = load_config()
+        config["core"]["with_retry"] = True
+        config["dma"]["mode"]        = "read"
+        config["instrumentation"]    = True
+        platform = XilinxPlatform(device="", io=get_io(8))
+        core     = LiteSDCardCore(platform, config=config)
+        self.assertEqual(len(platform.lookup_request("sdcard").data), 8)
+        self.assertTrue(hasattr(core, "sdcard_block2mem"))
+        self.assertFalse(hasattr(core, "sdcard_mem2block"))
+        self.assertTrue(hasattr(core.sdcard_core, "retry"))
+        self.assertTrue(hasattr(core, "sdcard_scope"))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+#
+# This file is part of LiteSDCard.
+#
+# Copyright (c) 2026 Florent Kermarrec <florent@enjoy-digital.fr>
+# SPDX-License-Identifier: BSD-2-Clause
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from litesdcard.common import *
+
+@unittest.skipIf(shutil.which("verilator") is None, "Verilator not found")
+class TestHarness(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        from litesdcard.emulator.harness import VerilatorHarness
+        cls.build_dir = tempfile.mkdtemp()
+        cls.harness   = VerilatorHarness(build_dir=cls.build_dir, mem_size=1024*1024)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.harness.close()
+        shutil.rmtree(cls.build_dir)
+
+    def command(self, cmd, argument, cmd_type,
+        data_type    = SDCARD_CTRL_DATA_TRANSFER_NONE,
+        block_length = 0,
+        block_count  = 0,
+        crc          = None):
+        regs = self.harness.regs
+        crc  = (cmd_type == SDCARD_CTRL_RESPONSE_SHORT) if crc is None else crc
+        regs.sdcard_core_block_length.write(block_length)
+        regs.sdcard_core_block_count.write(block_count)
+        regs.sdcard_core_cmd_argument.write(argument)
+        regs.sdcard_core_cmd_command.write((cmd << 8) | (data_type << 5) | (int(crc) << 2) | cmd_type)
+        regs.sdcard_core_cmd_send.write(1)
+        while not (regs.sdcard_core_cmd_event.read() & regs.sdcard_core_data_event.read() & 0b1):
+            self.harness.run(100)
+        return regs.sdcard_core_cmd_event.read(), regs.sdcard_core_cmd_response.read()
+
+    def init(self):
+        # Identification/Selection, then 4-bit bus.
+        regs = self.harness.regs
+        regs.sdcard_phy_clocker_divider.write(8)
+        regs.sdcard_phy_settings.write(SD_PHY_SPEED_1X)
+        self.command(0, 0, SDCARD_CTRL_RESPONSE_NONE)
+        self.command(8, 0x1aa, SDCARD_CTRL_RESPONSE_SHORT)
+        for i in range(100):
+            self.command(55, 0, SDCARD_CTRL_RESPONSE_SHORT)
+            event, response = self.command(41, 0x40ff8000, SDCARD_CTRL_RESPONSE_SHORT, crc=False)
+            if response & (1 << 31):
+                break
+        self.command(2, 0, SDCARD_CTRL_RESPONSE_LONG)
+        event, response = self.command(3, 0, SDCARD_CTRL_RESPONSE_SHORT)
+        rca = (response >> 16) & 0xffff
+        self.command(7, rca << 16, SDCARD_CTRL_RESPONSE_SHORT_BUSY)
+        self.command(55, rca << 16, SDCARD_CTRL_RESPONSE_SHORT)
+        self.command(6, 0b10, SDCARD_CTRL_RESPONSE_SHORT)
+        regs.sdcard_phy_settings.write(SD_PHY_SPEED_4X)
+        self.command(16, 512, SDCARD_CTRL_RESPONSE_SHORT)
+
+    def dma(self, name, base, length):
+        dma = getattr(self.harness.regs, f"sdcard_{name}_dma_enable")
+        dma.write(0)
+        getattr(self.harness.regs, f"sdcard_{name}_dma_base").write(base)
+        getattr(self.harness.regs, f"sdcard_{name}_dma_length").write(length)
+        dma.write(1)
+
+    def dma_wait(self, name):
+        done = getattr(self.harness.regs, f"sdcard_{name}_dma_done")
+        while not done.read():
+            self.harness.run(100)
+
+    def transfer(self, cmd, dma, base, count, data_type):
+        self.dma(dma, base, 512*count)
+        event, _ = self.command(cmd, 0, SDCARD_CTRL_RESPONSE_SHORT,
+            data_type    = data_type,
+            block_length = 512,
+            block_count  = count)
+        self.assertEqual(event & 0b1110, 0)
+        self.assertEqual(self.harness.regs.sdcard_core_data_event.read() & 0b1110, 0)
+        self.command(12, 0, SDCARD_CTRL_RESPONSE_SHORT_BUSY)
+        self.dma_wait(dma)
+
+    def test_memory(self):
+        data = os.urandom(4096)
+        self.harness.mem_write(0x1000, data)
+        self.assertEqual(self.harness.mem_read(0x1000, 4096), data)
+
+    def test_csrs(self):
+        regs = self.harness.regs
+        regs.sdcard_phy_clocker_divider.write(8)
+        self.assertEqual(regs.sdcard_phy_clocker_divider.read(), 8)
+
+    def test_command(self):
+        self.harness.regs.sdcard_phy_clocker_divider.write(8)
+        self.command(0, 0, SDCARD_CTRL_RESPONSE_NONE)
+        event, response = self.command(8, 0x1aa, SDCARD_CTRL_RESPONSE_SHORT)
+        self.assertEqual(event & 0b10, 0)
+        self.assertEqual(response & 0xfff, 0x1aa)
+
+    def test_dma_blocks(self):
+        # Multi-block write of a preloaded image, then multi-block read. The emulator only has a
+        # 512-bytes buffer (see harness docstring): all blocks read back as the last written one.
+        count = 4
+        image = os.urandom(512*count)
+        self.harness.mem_write(0x10000, image)
+        self.harness.mem_write(0x20000, bytes(512*count))
+        self.init()
+        self.transfer(25, "mem2block", 0x10000, count, SDCARD_CTRL_DATA_TRANSFER_WRITE)
+        self.transfer(18, "block2mem", 0x20000, count, SDCARD_CTRL_DATA_TRANSFER_READ)
+        self.assertEqual(self.harness.mem_read(0x20000, 512*count), image[-512:]*count)
@@ -0,0 +1,72 @@
+#
+# This file is part of LiteSDCard.
+#
+# Copyright (c) 2026 Florent Kermarrec <florent@enjoy-digital.fr>
+# SPDX-License-Identifier: BSD-2-Clause
+
+import sys
+import time
+import json
+import unittest
+import subprocess
+
+# Budgets ------------------------------------------------------------------------------------------
+
+# Heavy modules that must not be imported (hard check) and upper bounds relative to the startup of
+# a bare interpreter (python -c pass, measured in the same run), for the modules/commands invoked
+# from scripts in tight loops.
+heavy_modules = ["migen", "litex.soc.integration", "litex.build.xilinx", "litex.build.altera",
+    "litex.build.lattice", "numpy", "yaml"]
+import_ratio  = 1.0 # Import time (in a fresh interpreter) vs interpreter startup.
+help_ratio    = 3.0 # litesdcard_gen --help vs interpreter startup.
+
+def import_time(module):
+    code = (
+        "import sys, time, json\n"
+        "start = time.perf_counter()\n"
+        f"import {module}\n"
+        "print(json.dumps([time.perf_counter() - start, sorted(sys.modules)]))\n"
+    )
+    duration, modules = json.loads(subprocess.check_output([sys.executable, "-c", code]))
+    return duration, modules
+
+def run_time(*args, runs=3):
+    # Best wall-clock time of a command in a fresh interpreter.
+    durations = []
+    for i in range(runs):
+        start = time.perf_counter()
+        subprocess.check_output([sys.executable, *args])
+        durations.append(time.perf_counter() - start)
+    return min(durations)
+
+# Test Import --------------------------------------------------------------------------------------
+
+class TestImport(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.baseline = run_time("-c", "pass")
+
+    def import_test(self, module):
+        duration, modules = import_time(module)
+        for heavy in heavy_modules:
+            self.assertNotIn(heavy, modules, f"{module} imports {heavy}.")
+        duration = min(duration, *(import_time(module)[0] for i in range(2)))
+        self.assertLess(duration, import_ratio*self.baseline,
+            f"{module}: import over budget ({duration:.3f}s, interpreter startup {self.baseline:.3f}s).")
+
+    def test_import_package(self):
+        self.import_test("litesdcard")
+
+    def test_import_gen(self):
+        self.import_test("litesdcard.gen")
+
+    def test_import_bench(self):
+        self.import_test("litesdcard.bench")
+
+    def test_gen_help(self):
+        duration = run_time("-m", "litesdcard.gen", "--help")
+        self.assertLess(duration, help_ratio*self.baseline,
+            f"litesdcard_gen --help over budget ({duration:.3f}s, interpreter startup {self.baseline:.3f}s).")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,151 @@
+#
+# This file is part of LiteSDCard.
+#
+# Copyright (c) 2026 Florent Kermarrec <florent@enjoy-digital.fr>
+# SPDX-License-Identifier: BSD-2-Clause
+
+import os
+import tempfile
+import unittest
+
+from migen import *
+
+from litex.gen import *
+
+from litesdcard.common import *
+from litesdcard.phy import SDPHY
+from litesdcard.core import SDCore
+from litesdcard.emulator.core import _sdemulator_pads
+from litesdcard.host.codec import decode_response_r1
+from litesdcard.emulator.model import SDCardModel, CARD_STATUS_BLOCK_LEN_ERROR
+
+# Helpers ------------------------------------------------------------------------------------------
+
+class DUT(LiteXModule):
+    def __init__(self, **kwargs):
+        self.pads = _sdemulator_pads()
+        self.phy  = SDPHY(self.pads, "", 100e6, **kwargs)
+        self.core = SDCore(self.phy)
+        self.phy.clocker.divider.storage.reset = 0
+
+def sd_command(dut, cmd, argument, cmd_type, data_type=SDCARD_CTRL_DATA_TRANSFER_NONE, block_count=0):
+    core = dut.core
+    yield core.cmd_argument.storage.eq(argument)
+    yield core.cmd_command.fields.cmd.eq(cmd)
+    yield core.cmd_command.fields.cmd_type.eq(cmd_type)
+    yield core.cmd_command.fields.data_type.eq(data_type)
+    yield core.cmd_command.fields.crc.eq(cmd_type == SDCARD_CTRL_RESPONSE_SHORT and cmd != 41)
+    yield core.block_length.storage.eq(512)
+    yield core.block_count.storage.eq(block_count)
+    yield core.cmd_send.wr_stb.eq(1)
+    yield
+    yield core.cmd_send.wr_stb.eq(0)
+    yield
+    yield
+    while not (yield core.data_event.fields.done):
+        yield
+    assert not (yield core.cmd_event.fields.error), "CMD{} failed".format(cmd)
+    return (yield core.cmd_response.status)
+
+def sd_init(dut, rca=0x1234):
+    yield from sd_command(dut, 0, 0, SDCARD_CTRL_RESPONSE_NONE)
+    yield from sd_command(dut, 8, 0x1aa, SDCARD_CTRL_RESPONSE_SHORT)
+    while True:
+        yield from sd_command(dut, 55, 0, SDCARD_CTRL_RESPONSE_SHORT)
+        ocr = (yield from sd_command(dut, 41, 0x70ff8000, SDCARD_CTRL_RESPONSE_SHORT))
+        if (ocr >> 31) & 0b1:
+            break
+    yield from sd_command(dut, 2, 0, SDCARD_CTRL_RESPONSE_LONG)
+    rca = ((yield from sd_command(dut, 3, 0, SDCARD_CTRL_RESPONSE_SHORT)) >> 16) & 0xffff
+    csd = (yield from sd_command(dut, 9, rca << 16, SDCARD_CTRL_RESPONSE_LONG))
+    yield from sd_command(dut, 7, rca << 16, SDCARD_CTRL_RESPONSE_SHORT_BUSY)
+    yield from sd_command(dut, 55, rca << 16, SDCARD_CTRL_RESPONSE_SHORT)
+    yield from sd_command(dut, 6, 0b10, SDCARD_CTRL_RESPONSE_SHORT)
+    yield dut.phy.settings.fields.data_width.eq(SD_PHY_SPEED_4X)
+    return rca, csd
+
+@passive
+def source_gen(dut, data):
+    yield dut.core.source.ready.eq(1)
+    while True:
+        if (yield dut.core.source.valid):
+            data.append((yield dut.core.source.data))
+        yield
+
+def sink_gen(dut, data):
+    for byte in data:
+        yield dut.core.sink.valid.eq(1)
+        yield dut.core.sink.data.eq(byte)
+        yield
+        while not (yield dut.core.sink.ready):
+            yield
+    yield dut.core.sink.valid.eq(0)
+
+# Test SDCard Model --------------------------------------------------------------------------------
+
+class TestModel(unittest.TestCase):
+    def test_model(self):
+        image = bytearray(os.urandom(4*1024*1024))
+        ref   = bytes(image)
+        dut   = DUT()
+        model = SDCardModel(dut.pads, image, access_latency=4, program_latency=8)
+        read  = []
+        write = [os.urandom(512) for i in range(2)]
+
+        def gen(dut):
+            # Initialization.
+            rca, csd = (yield from sd_init(dut))
+            self.assertEqual(rca, model.rca)
+            self.assertEqual((csd >> 48) & 0x3fffff, 4*2 - 1) # C_SIZE.
+
+            # Multiple Block Read.
+            yield from sd_command(dut, 18, 10, SDCARD_CTRL_RESPONSE_SHORT,
+                data_type=SDCARD_CTRL_DATA_TRANSFER_READ, block_count=2)
+            yield from sd_command(dut, 12, 0, SDCARD_CTRL_RESPONSE_SHORT_BUSY)
+            self.assertFalse((yield dut.core.data_event.fields.error))
+
+            # Multiple Block Write.
+            yield from sd_command(dut, 25, 30, SDCARD_CTRL_RESPONSE_SHORT,
+                data_type=SDCARD_CTRL_DATA_TRANSFER_WRITE, block_count=2)
+            yield from sd_command(dut, 12, 0, SDCARD_CTRL_RESPONSE_SHORT_BUSY)
+            self.assertFalse((yield dut.core.data_event.fields.error))
+
+        run_simulation(dut, [gen(dut), source_gen(dut, read), sink_gen(dut, b"".join(write)),
+            *model.get_generators()])
+
+        self.assertEqual(model.commands[:4], ["CMD0", "CMD8", "CMD55", "ACMD41"])
+        self.assertEqual(model.commands[-2:], ["CMD25", "CMD12"])
+        self.assertEqual(bytes(read), ref[10*512:12*512])
+        self.assertEqual(bytes(image[30*512:32*512]), write[0] + write[1])
+        self.assertEqual(bytes(image[:30*512]), ref[:30*512])
+        self.assertEqual(bytes(image[32*512:]), ref[32*512:])
+
+    def test_model_image_file(self):
+        with tempfile.TemporaryDirectory() as d:
+            filename = os.path.join(d, "sdcard.img")
+            model = SDCardModel(_sdemulator_pads(), filename, size=64*1024*1024)
+            self.assertEqual(model.size, 64*1024*1024)
+            self.assertEqual(int.from_bytes(model.csd(), "big") >> 48 & 0x3fffff, 64*2 - 1)
+            model.mem[512:1024] = bytes(range(256))*2
+            model.close()
+            with open(filename, "rb") as f:
+                f.seek(512)
+                self.assertEqual(f.read(512), bytes(range(256))*2)
+            # New image: size required.
+            with self.assertRaises(ValueError):
+                SDCardModel(_sdemulator_pads(), os.path.join(d, "new.img"))
+
+    def test_model_block_length(self):
+        image = bytearray(os.urandom(64*1024))
+        model = SDCardModel(_sdemulator_pads(), image)
+        model.command(16, 64)
+        self.assertEqual(model.length, 64)
+        response, (kind, blocks) = model.command(18, 2)
+        self.assertEqual(next(blocks), bytes(image[2*512:2*512 + 64]))
+        self.assertEqual(next(blocks), bytes(image[3*512:3*512 + 64]))
+        response, transfer = model.command(16, 1024)
+        self.assertEqual(model.length, 64)
+        self.assertTrue(int(decode_response_r1(response)[1]) & CARD_STATUS_BLOCK_LEN_ERROR)
+
+if __name__ == '__main__':
+        unittest.main()
@@ -0,0 +1,110 @@
+#
+# This file is part of LiteSDCard.
+#
+# Copyright (c) 2026 Florent Kermarrec <florent@enjoy-digital.fr>
+# SPDX-License-Identifier: BSD-2-Clause
+
+import os
+import unittest
+
+from migen import *
+
+from litex.gen import *
+
+from litesdcard.common import *
+from litesdcard.phy import SDPHY
+from litesdcard.core import SDCore
+from litesdcard.multislot import SDPHYMux
+from litesdcard.emulator.core import _sdemulator_pads
+from litesdcard.emulator.perf import _command
+from litesdcard.emulator.model import SDCardModel, CARD_STATE_TRAN
+
+# Multi-Slot DUT -----------------------------------------------------------------------------------
+
+class MultiSlotDUT(LiteXModule):
+    def __init__(self, nslots=2):
+        self.pads = [_sdemulator_pads() for i in range(nslots)]
+        self.phys = [SDPHY(pads, "", 100e6) for pads in self.pads]
+        self.mux  = SDPHYMux(self.phys)
+        self.core = SDCore(self.mux)
+        for i, phy in enumerate(self.phys):
+            self.add_module(name=f"phy{i}", module=phy)
+        # Per-slot settings: 4-bit Data, different Clk dividers.
+        for i, phy in enumerate(self.phys):
+            phy.clocker.divider.storage.reset    = 2*i
+            phy.settings.storage.reset           = SD_PHY_SPEED_4X
+            phy.settings.fields.data_width.reset = SD_PHY_SPEED_4X
+
+# Test Multi-Slot ----------------------------------------------------------------------------------
+
+class TestMultiSlot(unittest.TestCase):
+    def test_multislot(self):
+        dut    = MultiSlotDUT()
+        images = [bytearray(os.urandom(2048)) for i in range(2)]
+        models = [SDCardModel(pads, image) for pads, image in zip(dut.pads, images)]
+        for model in models:
+            model.state = CARD_STATE_TRAN
+            model.width = 4
+        reads  = []
+        writes = bytes(range(64))
+
+        @passive
+        def source():
+            yield dut.core.source.ready.eq(1)
+            while True:
+                if (yield dut.core.source.valid):
+                    reads[-1].append((yield dut.core.source.data))
+                yield
+
+        @passive
+        def sink():
+            for i, data in enumerate(writes):
+                yield dut.core.sink.valid.eq(1)
+                yield dut.core.sink.data.eq(data)
+                yield dut.core.sink.last.eq(i == len(writes) - 1)
+                yield
+                while not (yield dut.core.sink.ready):
+                    yield
+            yield dut.core.sink.valid.eq(0)
+
+        def read(slot, block):
+            yield dut.mux.slot.storage.eq(slot)
+            reads.append([])
+            yield from _command(dut, 17, block, SDCARD_CTRL_RESPONSE_SHORT,
+                data_type    = SDCARD_CTRL_DATA_TRANSFER_READ,
+                block_length = 64,
+                block_count  = 1)
+
+        def generator():
+            # Block length on each slot.
+            for slot in range(2):
+                yield dut.mux.slot.storage.eq(slot)
+                yield from _command(dut, 16, 64, SDCARD_CTRL_RESPONSE_SHORT)
+            # Interleaved reads.
+            yield from read(0, 1)
+            yield from read(1, 1)
+            yield from read(0, 0)
+            # Write on slot 1.
+            yield dut.mux.slot.storage.eq(1)
+            yield from _command(dut, 24, 2, SDCARD_CTRL_RESPONSE_SHORT,
+                data_type    = SDCARD_CTRL_DATA_TRANSFER_WRITE,
+                block_length = 64,
+                block_count  = 1)
+            yield from read(1, 2)
+            self.assertEqual((yield dut.mux.card_detect.status), 0b00)
+
+        generators = [generator(), source(), sink()]
+        for model in models:
+            generators += model.get_generators()
+        run_simulation(dut, generators)
+
+        self.assertEqual(bytes(reads[0]), bytes(images[0][512:512 + 64]))
+        self.assertEqual(bytes(reads[1]), bytes(images[1][512:512 + 64]))
+        self.assertEqual(bytes(reads[2]), bytes(images[0][0:64]))
+        self.assertEqual(bytes(models[1].mem[1024:1024 + 64]), writes)
+        self.assertEqual(bytes(reads[3]), writes)
+        self.assertEqual(models[0].commands, ["CMD16", "CMD17", "CMD17"])
+        self.assertEqual(models[1].commands, ["CMD16", "CMD17", "CMD24", "CMD17"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+#
+# This file is part of LiteSDCard.
+#
+# Copyright (c) 2026 Florent Kermarrec <florent@enjoy-digital.fr>
+# SPDX-License-Identifier: BSD-2-Clause
+
+import os
+import json
+import unittest
+
+from litesdcard.emulator.perf import measure
+
+# Budgets ------------------------------------------------------------------------------------------
+
+# Upper bounds (in sys-clk cycles) for fixed transfers against the SDCardModel (default latencies).
+# Update the table when a change intentionally modifies the timings (and lower the budgets when
+# improving them).
+with open(os.path.join(os.path.dirname(__file__), "perf_budgets.json")) as f:
+    budgets = json.load(f)
+
+# Test Perf ----------------------------------------------------------------------------------------
+
+class TestPerf(unittest.TestCase):
+    def perf_test(self, name):
+        transfer = budgets[name]["transfer"]
+        budget   = budgets[name]["budget"]
+        result   = measure(**transfer)
+        for metric in ["cycles", "max_gap", "stopped"]:
+            self.assertLessEqual(result[metric], budget[metric],
+                "{}: {} over budget ({} > {}).".format(name, metric, result[metric], budget[metric]))
+
+    def test_read_4x_div2(self):
+        self.perf_test("read_4x_div2")
+
+    def test_write_4x_div2(self):
+        self.perf_test("write_4x_div2")
+
+    def test_read_1x_div0(self):
+        self.perf_test("read_1x_div0")
+
+    def test_write_8x_div0(self):
+        self.perf_test("write_8x_div0")
+
+if __name__ == '__main__':
+        unittest.main()
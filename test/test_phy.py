@@ -10,6 +10,7 @@ from migen import *
 
 from litesdcard.phy import *
 from litesdcard.phy import _sdpads_layout
+from litesdcard.host.codec import encode_data_block
 
 def c2bool(c):
     return {"-": 1, "_": 0}[c]
@@ -108,6 +109,72 @@ class TestPHY(unittest.TestCase):
         dut.divider.storage.reset = 8
         run_simulation(dut, gen(dut))
 
+    def test_clocker_slowdown(self):
+        # Effective Div = 4 << 1 = 8.
+        def gen(dut):
+            clk   = "_____----____----___"
+            ce    = "_-_______-_______-__"
+            for i in range(len(clk)):
+                self.assertEqual(c2bool(clk[i]),   (yield dut.clk))
+                self.assertEqual(c2bool(ce[i]),    (yield dut.ce))
+                yield
+        dut = SDPHYClocker()
+        dut.divider.storage.reset = 3
+        dut.slowdown.reset = 1
+        run_simulation(dut, gen(dut))
+
+    def test_clock_fallback(self):
+        def gen(dut):
+            def event(endpoint, status, last=1):
+                yield endpoint.valid.eq(1)
+                yield endpoint.ready.eq(1)
+                yield endpoint.last.eq(last)
+                yield endpoint.status.eq(status)
+                yield
+                yield endpoint.valid.eq(0)
+                yield
+            yield dut.control.fields.enable.eq(1)
+            yield
+            # Slow down after threshold errors.
+            for i in range(4):
+                self.assertEqual((yield dut.status.fields.level), 0)
+                yield from event(dut.datar.source, SDCARD_STREAM_STATUS_CRCERROR)
+            self.assertEqual((yield dut.status.fields.level), 1)
+            for i in range(2):
+                yield from event(dut.cmdr.source, SDCARD_STREAM_STATUS_TIMEOUT)
+            # Cmd CRC Errors (from Core).
+            for i in range(2):
+                yield dut.cmd_crc_error.eq(1)
+                yield
+                yield dut.cmd_crc_error.eq(0)
+                yield
+            self.assertEqual((yield dut.status.fields.level), 2)
+            self.assertEqual((yield dut.clocker.slowdown), 2)
+            self.assertEqual((yield dut.status.fields.divider), ((8 + 1) << 2) - 1)
+            self.assertEqual((yield dut.errors.status), 8)
+            # Speed up after a clean window.
+            for i in range(16):
+                self.assertEqual((yield dut.status.fields.level), 2)
+                yield from event(dut.dataw.source, SDCARD_STREAM_STATUS_DATAACCEPTED)
+            self.assertEqual((yield dut.status.fields.level), 1)
+            # Back to full speed when disabled.
+            yield dut.control.fields.enable.eq(0)
+            yield
+            yield
+            self.assertEqual((yield dut.status.fields.level), 0)
+
+        class PHYStatus:
+            def __init__(self):
+                self.source = stream.Endpoint([("status", 3)])
+        clocker = SDPHYClocker()
+        clocker.divider.storage.reset = 8
+        cmdr, dataw, datar = PHYStatus(), PHYStatus(), PHYStatus()
+        dut = SDPHYClockFallback(clocker, cmdr, dataw, datar)
+        dut.clocker = clocker
+        dut.cmdr, dut.dataw, dut.datar = cmdr, dataw, datar
+        dut.window.storage.reset = 16
+        run_simulation(dut, gen(dut))
+
     def test_phyr_cmd(self):
         def stim_gen(dut):
             yield dut.pads_in.valid.eq(1)
@@ -208,6 +275,144 @@ class TestPHY(unittest.TestCase):
         dut  = SDPHYCMDR(_sdpads_layout(4), 1e6, 5e-3, cmdw)
         run_simulation(dut, [stim_gen(dut), check_gen(dut)])
 
+    def test_phy_fixed_data_width(self):
+        from litesdcard.emulator.core import _sdemulator_pads
+        for fixed_data_width, receivers in [(None, ["1x", "4x"]), (1, ["1x"]), (4, ["4x"])]:
+            dut = SDPHY(_sdemulator_pads(), "", 100e6, fixed_data_width=fixed_data_width)
+            for receiver in ["1x", "4x", "8x"]:
+                self.assertEqual(hasattr(dut.datar, f"datar_{receiver}"), receiver in receivers)
+            crc_lanes = 1 if fixed_data_width == 1 else 4
+            self.assertEqual(len(dut.datar.crc16.crc), crc_lanes)
+            self.assertEqual(len(dut.dataw.crc16.crc), crc_lanes)
+
+    def test_phy_fixed_data_width_transfers(self):
+        from litesdcard.core import SDCore
+        from litesdcard.emulator.core import _sdemulator_pads
+        from litesdcard.emulator.perf import _command
+        from litesdcard.emulator.model import SDCardModel, CARD_STATE_TRAN
+        for fixed_data_width in [1, 4]:
+            pads  = _sdemulator_pads()
+            dut   = Module()
+            dut.submodules.phy  = phy  = SDPHY(pads, "", 100e6, fixed_data_width=fixed_data_width)
+            dut.submodules.core = core = SDCore(phy)
+            phy.clocker.divider.storage.reset = 0
+            image = bytearray(range(256))*8
+            model = SDCardModel(pads, image)
+            model.state = CARD_STATE_TRAN
+            model.width = fixed_data_width
+            reads  = []
+            writes = bytes(range(64, 128))
+
+            @passive
+            def source():
+                yield core.source.ready.eq(1)
+                while True:
+                    if (yield core.source.valid):
+                        reads.append((yield core.source.data))
+                    yield
+
+            @passive
+            def sink():
+                for data in writes:
+                    yield core.sink.valid.eq(1)
+                    yield core.sink.data.eq(data)
+                    yield
+                    while not (yield core.sink.ready):
+                        yield
+                yield core.sink.valid.eq(0)
+
+            def generator():
+                yield from _command(dut, 16, 64, SDCARD_CTRL_RESPONSE_SHORT)
+                yield from _command(dut, 17, 1, SDCARD_CTRL_RESPONSE_SHORT,
+                    data_type    = SDCARD_CTRL_DATA_TRANSFER_READ,
+                    block_length = 64,
+                    block_count  = 1)
+                yield from _command(dut, 24, 2, SDCARD_CTRL_RESPONSE_SHORT,
+                    data_type    = SDCARD_CTRL_DATA_TRANSFER_WRITE,
+                    block_length = 64,
+                    block_count  = 1)
+
+            run_simulation(dut, [generator(), source(), sink(), *model.get_generators()])
+            self.assertEqual(bytes(reads), bytes(image[512:512 + 64]))
+            self.assertEqual(bytes(image[1024:1024 + 64]), writes)
+            self.assertEqual(model.commands, ["CMD16", "CMD17", "CMD24"])
+
+    def test_phy_retiming(self):
+        from litesdcard.emulator.core import _sdemulator_pads
+        def card_gen(pads, data, corrupt=None):
+            # Send Data block on DAT lanes on SDCard Clk falling edges (after 4 Clk cycles).
+            block = encode_data_block(data, width=4)
+            if corrupt is not None:
+                block[1 + 2*len(data) + corrupt] ^= 0b0001
+            values = [0b1111]*4 + list(block)
+            yield pads.dat_t.eq(0)
+            yield pads.dat_o.eq(0b1111)
+            clk_d = 0
+            while values:
+                clk = (yield pads.clk)
+                if clk_d and not clk:
+                    yield pads.dat_o.eq(int(values.pop(0)))
+                clk_d = clk
+                yield
+
+        def host_gen(dut, pads, trace, beats):
+            yield dut.datar.sink.valid.eq(1)
+            yield dut.datar.sink.last.eq(1)
+            yield dut.datar.sink.block_length.eq(4)
+            yield dut.datar.source.ready.eq(1)
+            while True:
+                trace.append(((yield pads.clk), (yield pads.dat_i)))
+                if (yield dut.datar.source.valid):
+                    beats.append(((yield dut.datar.source.data),
+                                  (yield dut.datar.source.status),
+                                  (yield dut.datar.source.drop)))
+                    if (yield dut.datar.source.last):
+                        break
+                yield
+
+        def host_write_gen(dut, pads, trace):
+            data = [0x12, 0x34, 0x56, 0x78]
+            yield dut.dataw.sink.valid.eq(1)
+            yield dut.dataw.sink.last_block.eq(1)
+            yield dut.dataw.sink.data.eq(data.pop(0))
+            for i in range(256):
+                trace.append(((yield pads.clk), (yield pads.dat_i)))
+                if (yield dut.dataw.sink.ready) and data:
+                    yield dut.dataw.sink.data.eq(data.pop(0))
+                yield
+
+        # Data Write: Pads delayed by 1 sys-clk cycle with retiming.
+        traces = {}
+        for with_retiming in [False, True]:
+            pads = _sdemulator_pads()
+            dut  = SDPHY(pads, "", 100e6, with_retiming=with_retiming)
+            dut.clocker.divider.storage.reset = 3
+            traces[with_retiming] = []
+            run_simulation(dut, host_write_gen(dut, pads, traces[with_retiming]))
+        self.assertEqual(traces[True][1:], traces[False][:-1])
+
+        # Data Read.
+        data = [0x12, 0x34, 0x56, 0x78]
+        for divider in [0, 3]:
+            for corrupt in [None, 0, 15]:
+                traces, beats = {}, {}
+                for with_retiming in [False, True]:
+                    pads = _sdemulator_pads()
+                    dut  = SDPHY(pads, "", 100e6, with_retiming=with_retiming)
+                    dut.clocker.divider.storage.reset = divider
+                    traces[with_retiming], beats[with_retiming] = [], []
+                    run_simulation(dut, [
+                        host_gen(dut, pads, traces[with_retiming], beats[with_retiming]),
+                        card_gen(pads, data, corrupt),
+                    ])
+                # Same data/status/drop with/without retiming.
+                status = SDCARD_STREAM_STATUS_OK if corrupt is None else SDCARD_STREAM_STATUS_CRCERROR
+                self.assertEqual([b[0] for b in beats[False][:4]], [0x12, 0x34, 0x56, 0x78])
+                self.assertEqual(beats[False][-1][1], status)
+                self.assertEqual(beats[True], beats[False])
+                # Pads delayed by 1 sys-clk cycle with retiming.
+                self.assertEqual(traces[True][1:len(traces[False])], traces[False][:-1])
+
     def test_phycrc(self):
         pass
 
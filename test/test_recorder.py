@@ -0,0 +1,96 @@
+#
+# This file is part of LiteSDCard.
+#
+# Copyright (c) 2026 Florent Kermarrec <florent@enjoy-digital.fr>
+# SPDX-License-Identifier: BSD-2-Clause
+
+import os
+import random
+import tempfile
+import unittest
+
+from migen import *
+
+from litex.soc.interconnect import stream
+
+from litesdcard.emulator.recorder import StreamRecorder, stream_diff
+
+# Test Recorder ------------------------------------------------------------------------------------
+
+class TestRecorder(unittest.TestCase):
+    def test_recorder(self):
+        prng = random.Random(42)
+        data = [prng.randrange(256) for i in range(64)]
+        dut  = stream.SyncFIFO([("data", 8)], depth=4)
+        sink_recorder   = StreamRecorder(dut.sink)
+        source_recorder = StreamRecorder(dut.source, fields=["data", "last"])
+
+        def generator(dut):
+            for i, byte in enumerate(data):
+                yield dut.sink.valid.eq(1)
+                yield dut.sink.data.eq(byte)
+                yield dut.sink.last.eq(i == len(data) - 1)
+                yield
+                while not (yield dut.sink.ready):
+                    yield
+            yield dut.sink.valid.eq(0)
+            for i in range(16):
+                yield
+
+        @passive
+        def checker(dut):
+            while True:
+                yield dut.source.ready.eq(prng.randrange(2))
+                yield
+
+        run_simulation(dut, [generator(dut), checker(dut),
+            sink_recorder.generator(), source_recorder.generator()])
+
+        # Recordings.
+        sink_beats   = sink_recorder.to_array()
+        source_beats = source_recorder.to_array()
+        self.assertEqual(sink_beats["data"].tolist(), data)
+        self.assertEqual(source_beats["data"].tolist(), data)
+        self.assertEqual(source_beats.dtype.names, ("cycle", "data", "last"))
+        self.assertEqual(source_beats["last"].tolist(), [0]*63 + [1])
+        self.assertTrue((source_beats["cycle"] > sink_beats["cycle"]).all())
+
+        # Diff.
+        self.assertEqual(len(stream_diff(sink_recorder, source_recorder)), 0)
+        self.assertEqual(len(stream_diff(sink_recorder, source_recorder, with_cycles=True)), 64)
+        source_beats["data"][10] ^= 1
+        self.assertEqual(stream_diff(sink_beats, source_beats).tolist(), [10])
+        self.assertEqual(stream_diff(sink_beats, source_beats[:60]).tolist(), [10, 60, 61, 62, 63])
+
+        # Save/Load.
+        with tempfile.TemporaryDirectory() as d:
+            filename = os.path.join(d, "sink.npy")
+            sink_recorder.save(filename)
+            self.assertEqual(len(stream_diff(StreamRecorder.load(filename), sink_beats, with_cycles=True)), 0)
+
+    def test_recorder_wide(self):
+        prng = random.Random(42)
+        data = [prng.getrandbits(128) for i in range(8)]
+        dut  = stream.SyncFIFO([("data", 128)], depth=16)
+        recorder = StreamRecorder(dut.sink)
+
+        def generator(dut):
+            for word in data:
+                yield dut.sink.valid.eq(1)
+                yield dut.sink.data.eq(word)
+                yield
+            yield dut.sink.valid.eq(0)
+            yield
+
+        run_simulation(dut, [generator(dut), recorder.generator()])
+
+        # Wide fields stored as little-endian bytes (and saved without pickling).
+        beats = recorder.to_array()
+        self.assertEqual([int.from_bytes(word, "little") for word in beats["data"]], data)
+        with tempfile.TemporaryDirectory() as d:
+            filename = os.path.join(d, "wide.npy")
+            recorder.save(filename)
+            self.assertEqual(len(stream_diff(StreamRecorder.load(filename), beats, with_cycles=True)), 0)
+
+if __name__ == '__main__':
+        unittest.main()
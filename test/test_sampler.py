@@ -0,0 +1,229 @@
+#
+# This file is part of LiteSDCard.
+#
+# Copyright (c) 2026 Florent Kermarrec <florent@enjoy-digital.fr>
+# SPDX-License-Identifier: BSD-2-Clause
+
+import random
+import unittest
+
+from migen import *
+
+from litesdcard.emulator.recorder import StreamRecorder
+from litesdcard.host.codec import *
+from litesdcard.host.capture import pattern_gaps, rle_decode
+from litesdcard.host.timeline import decode_timeline
+
+from bench.sampler import Sampler, SamplerRLE
+
+from test.test_timeline import SDBus
+
+# Helpers ------------------------------------------------------------------------------------------
+
+def run_sampler(dut, pads_values, sample_count, rle=True, pattern=0):
+    recorder = StreamRecorder(dut.rle.sink, fields=["data"])
+    output   = []
+    overflow = []
+
+    def generator(dut):
+        yield dut.pattern.storage.eq(pattern)
+        yield dut.sample_count.storage.eq(sample_count)
+        yield dut.rle.enable.storage.eq(rle)
+        yield dut.enable.storage.eq(1)
+        for value in pads_values:
+            yield dut.pads.eq(value)
+            yield
+        overflow.append((yield dut.rle.overflow.status))
+
+    @passive
+    def receiver(dut):
+        yield dut.source.ready.eq(1)
+        while True:
+            if (yield dut.source.valid):
+                output.append((yield dut.source.data))
+            yield
+
+    run_simulation(dut, [generator(dut), receiver(dut), recorder.generator()])
+    return recorder.to_array()["data"], output, overflow[0]
+
+def run_trigger(dut, samples, sample_count, **trigger):
+    hits     = []
+    captured = []
+
+    def generator(dut):
+        yield dut.pattern.storage.eq(0)
+        yield dut.sample_count.storage.eq(sample_count)
+        yield dut.pre_trigger.storage.eq(trigger.pop("pre_trigger", 0))
+        for k, v in trigger.items():
+            yield getattr(dut.trigger, k).storage.eq(v)
+        yield dut.enable.storage.eq(1)
+        for i, value in enumerate(samples):
+            yield dut.pads.eq(int(value))
+            if (yield dut.trigger.hit):
+                hits.append(i)
+            yield
+
+    @passive
+    def receiver(dut):
+        yield dut.source.ready.eq(1)
+        while True:
+            if (yield dut.source.valid) and len(captured) < sample_count:
+                captured.append((yield dut.source.data))
+            yield
+
+    run_simulation(dut, [generator(dut), receiver(dut)])
+    return hits, captured
+
+# Test Sampler -------------------------------------------------------------------------------------
+
+class TestSampler(unittest.TestCase):
+    def sampler(self):
+        pads = Signal(8)
+        dut  = Sampler(pads, with_rle=True)
+        dut.pads = pads
+        return dut
+
+    def test_sampler_rle(self):
+        prng        = random.Random(42)
+        pads_values = []
+        while len(pads_values) < 1024:
+            pads_values += [prng.randrange(256)]*prng.randrange(1, 64)
+        samples, output, overflow = run_sampler(self.sampler(), pads_values, sample_count=512)
+        # Sampler re-arms while enabled: compare decoded samples with the captured ones.
+        decoded = rle_decode(output, expand=True)
+        self.assertGreaterEqual(len(decoded), 512)
+        self.assertLess(len(output), len(decoded))
+        self.assertEqual(overflow, 0)
+        self.assertEqual(decoded.tolist(), samples[:len(decoded)].tolist())
+        timestamps, values = rle_decode(output)
+        self.assertEqual(samples[timestamps].tolist(), values.tolist())
+
+    def test_sampler_rle_bypass(self):
+        pads_values = [i//8 for i in range(256)]
+        samples, output, overflow = run_sampler(self.sampler(), pads_values, sample_count=128, rle=False)
+        self.assertEqual(output, samples.tolist())
+
+    def test_sampler_rle_overflow(self):
+        # Pattern (counter) changes on every sample: 4 bytes per sample.
+        samples, output, overflow = run_sampler(self.sampler(), [0]*512, sample_count=256, pattern=1)
+        self.assertEqual(overflow, 1)
+        self.assertLess(len(output), 4*len(samples))
+
+    def test_sampler_rle_flush(self):
+        # Samples following the last sample of a capture (flush cycle) are held, not dropped.
+        dut     = SamplerRLE()
+        samples = [1]*5 + [2]*3 + [3]*4
+        lasts   = [4, 7, 11]
+        output  = []
+
+        def generator():
+            yield dut.enable.storage.eq(1)
+            for i, value in enumerate(samples):
+                yield dut.sink.valid.eq(1)
+                yield dut.sink.data.eq(value)
+                yield dut.sink.last.eq(i in lasts)
+                yield
+                while not (yield dut.sink.ready):
+                    yield
+            yield dut.sink.valid.eq(0)
+            for i in range(64):
+                yield
+
+        @passive
+        def receiver():
+            yield dut.source.ready.eq(1)
+            while True:
+                if (yield dut.source.valid):
+                    output.append((yield dut.source.data))
+                yield
+
+        run_simulation(dut, [generator(), receiver()])
+        self.assertEqual(rle_decode(output, expand=True).tolist(), samples)
+
+    def test_sampler_host_decode(self):
+        # Host --pattern: pattern=1, capture checked for gaps.
+        _, output, _ = run_sampler(self.sampler(), [0]*512, sample_count=256, rle=False, pattern=1)
+        self.assertGreaterEqual(len(output), 256)
+        self.assertEqual(pattern_gaps(output[:256]).tolist(), [])
+        # Host --decode: pattern=0, capture decoded as SD bus timeline.
+        samples, marks = self.trigger_bus()
+        _, output, _ = run_sampler(self.sampler(), samples.tolist(), sample_count=len(samples), rle=False)
+        events = decode_timeline(output)
+        self.assertEqual([e["name"] for e in events if e["type"] == "cmd"], ["CMD13", "CMD25", "CMD12", "CMD25", "CMD12"])
+
+    def trigger_bus(self):
+        # CMD13 / CMD25 (arg 0x10) / CMD25 (arg 0x20) with 2 8-byte blocks, 2nd block with CRC error.
+        bus   = SDBus()
+        marks = {}
+        bus.idle(16)
+        bus.cmd_frame(encode_command(13, 0));         bus.idle(2)
+        bus.cmd_frame(encode_response_r1(13, 0x900)); bus.idle(16)
+        for argument in [0x10, 0x20]:
+            bus.cmd_frame(encode_command(25, argument)); marks[argument] = len(bus.cmd); bus.idle(2)
+            bus.cmd_frame(encode_response_r1(25, 0x900)); bus.idle(2)
+            for i in range(2):
+                bus.dat_frame(encode_data_block(np.arange(8, dtype=np.uint8), 4)); bus.idle(2)
+                status = CRC_STATUS_CRC_ERROR if (argument, i) == (0x20, 1) else CRC_STATUS_ACCEPTED
+                bus.dat_frame([0xe | b for b in encode_crc_status(status)], width=1)
+                marks[(argument, i)] = len(bus.cmd)
+                bus.dat_frame([0xe]*(16 if i == 0 else 32), width=1) # Busy.
+                bus.idle(2)
+            bus.cmd_frame(encode_command(12, 0));         bus.idle(2)
+            bus.cmd_frame(encode_response_r1(12, 0xc00)); bus.idle(16)
+        return bus.samples(), {k: 4*v for k, v in marks.items()}
+
+    def trigger_sampler(self):
+        pads = Signal(8)
+        dut  = Sampler(pads, with_trigger=True, pre_trigger_depth=256)
+        dut.pads = pads
+        return dut
+
+    def test_sampler_trigger_cmd(self):
+        samples, marks = self.trigger_bus()
+        hits, captured = run_trigger(self.trigger_sampler(), samples, sample_count=256,
+            mode              = 1,
+            count             = 2,
+            cmd_index         = 25,
+            cmd_argument      = 0x00,
+            cmd_argument_mask = 0x00,
+            pre_trigger       = 220)
+        # 2nd CMD25.
+        self.assertEqual(len(hits), 1)
+        self.assertTrue(marks[0x20] <= hits[0] < marks[0x20] + 16)
+        # Pre-Trigger: Cmd captured.
+        events = decode_timeline(captured)
+        self.assertEqual(events[0]["type"], "cmd")
+        self.assertEqual(events[0]["name"], "CMD25")
+        self.assertEqual(events[0]["argument"], 0x20)
+
+    def test_sampler_trigger_cmd_argument(self):
+        samples, marks = self.trigger_bus()
+        hits, captured = run_trigger(self.trigger_sampler(), samples, sample_count=16,
+            mode              = 1,
+            cmd_index         = 25,
+            cmd_argument      = 0x20,
+            cmd_argument_mask = 0xffffffff)
+        self.assertEqual(len(hits), 1)
+        self.assertTrue(marks[0x20] <= hits[0] < marks[0x20] + 16)
+
+    def test_sampler_trigger_crc_error(self):
+        samples, marks = self.trigger_bus()
+        hits, captured = run_trigger(self.trigger_sampler(), samples, sample_count=64,
+            mode         = 2,
+            block_clocks = 1 + 8*8//4 + 16 + 1)
+        self.assertEqual(len(hits), 1)
+        self.assertTrue(marks[(0x20, 1)] <= hits[0] < marks[(0x20, 1)] + 16)
+
+    def test_sampler_trigger_busy(self):
+        samples, marks = self.trigger_bus()
+        hits, captured = run_trigger(self.trigger_sampler(), samples, sample_count=64,
+            mode         = 3,
+            count        = 2,
+            block_clocks = 1 + 8*8//4 + 16 + 1,
+            busy_cycles  = 100)
+        # 32-Clk (128 cycles) busy periods after the 2nd blocks only, 2nd occurrence.
+        self.assertEqual(len(hits), 1)
+        self.assertTrue(marks[(0x20, 1)] + 100 <= hits[0] < marks[(0x20, 1)] + 128)
+
+if __name__ == '__main__':
+        unittest.main()
@@ -0,0 +1,94 @@
+#
+# This file is part of LiteSDCard.
+#
+# Copyright (c) 2026 Florent Kermarrec <florent@enjoy-digital.fr>
+# SPDX-License-Identifier: BSD-2-Clause
+
+import os
+import tempfile
+import unittest
+
+from migen import *
+
+from litesdcard.common import *
+from litesdcard.scope import SDScopeProbes, sdscope_events_layout
+from litesdcard.emulator.perf import PerfDUT, _command
+from litesdcard.emulator.model import SDCardModel, CARD_STATE_TRAN
+from litesdcard.host.scope import *
+
+# Test Scope ---------------------------------------------------------------------------------------
+
+class TestScope(unittest.TestCase):
+    def test_scope(self):
+        dut = PerfDUT(divider=0, data_width=4)
+        dut.phy.cmdr.timeout.storage.reset = 256
+        dut.probes = SDScopeProbes(dut.phy, dut.core, clk_stop_threshold=32)
+        model = SDCardModel(dut.pads, bytearray(os.urandom(512)))
+        model.state = CARD_STATE_TRAN
+        model.width = 4
+
+        # LiteScope-like capture of the events probes.
+        layout  = [("sdcard_scope_events_" + name, width) for name, width in sdscope_events_layout]
+        samples = []
+
+        @passive
+        def capture():
+            while True:
+                sample = 0
+                offset = 0
+                for name, width in sdscope_events_layout:
+                    sample |= (yield getattr(dut.probes.events, name)) << offset
+                    offset += width
+                samples.append(sample)
+                yield
+
+        def generator():
+            yield from _command(dut, 16, 64, SDCARD_CTRL_RESPONSE_SHORT)
+            yield dut.core.source.ready.eq(0) # Stop Clk (backpressure).
+            yield from _command(dut, 17, 0, SDCARD_CTRL_RESPONSE_SHORT,
+                data_type    = SDCARD_CTRL_DATA_TRANSFER_READ,
+                block_length = 64,
+                block_count  = 1)
+            # Illegal Cmd: Cmd timeout.
+            try:
+                yield from _command(dut, 5, 0, SDCARD_CTRL_RESPONSE_SHORT)
+            except RuntimeError:
+                pass
+
+        @passive
+        def source():
+            # Release backpressure after some cycles with the Clk stopped.
+            while not (yield dut.probes.events.clk_stopped):
+                yield
+            for i in range(64):
+                yield
+            yield dut.core.source.ready.eq(1)
+
+        run_simulation(dut, [generator(), capture(), source()] + model.get_generators())
+
+        # Decode.
+        transactions = decode_transactions(decode_fields(samples, layout))
+        for transaction in transactions:
+            format_transaction(transaction, sys_clk_freq=100e6)
+        self.assertEqual([t["cmd_index"] for t in transactions], [16, 17, 5])
+        self.assertEqual([t["read_bytes"] for t in transactions], [0, 64, 0])
+        self.assertEqual([t["cmd_timeout"] for t in transactions], [False, False, True])
+        self.assertEqual([t["clk_stopped"] for t in transactions], [False, True, False])
+        self.assertFalse(any(t["crc_error"] or t["data_timeout"] for t in transactions))
+
+    def test_scope_triggers(self):
+        with tempfile.TemporaryDirectory() as d:
+            filename = os.path.join(d, "analyzer.csv")
+            with open(filename, "w") as f:
+                f.write("config,None,data_width,16\n")
+                f.write("signal,0,sdcard_phy_clocker_ce,1\n")
+                for name, width in sdscope_events_layout:
+                    f.write("signal,0,sdcard_scope_events_{},{}\n".format(name, width))
+            layout = read_layout(filename)
+        self.assertEqual(layout[0], ("sdcard_phy_clocker_ce", 1))
+        self.assertEqual(trigger_value_mask(layout, "cmd"), (0b10, 0b10))
+        self.assertEqual(trigger_value_mask(layout, "cmd", cmd_index=25), (0b10 | (25 << 2), 0b11111110))
+        self.assertEqual(trigger_value_mask(layout, "timeout"), (1 << 10, 1 << 10))
+
+if __name__ == '__main__':
+        unittest.main()
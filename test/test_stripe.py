@@ -0,0 +1,221 @@
+#
+# This file is part of LiteSDCard.
+#
+# Copyright (c) 2026 Florent Kermarrec <florent@enjoy-digital.fr>
+# SPDX-License-Identifier: BSD-2-Clause
+
+import os
+import unittest
+
+from migen import *
+from migen.sim import passive
+
+from litex.gen import *
+
+from litesdcard.common import *
+from litesdcard.phy import SDPHY
+from litesdcard.core import SDCore, SDCorePort
+from litesdcard.frontend.stripe import SDStripe
+from litesdcard.emulator.core import _sdemulator_pads
+from litesdcard.emulator.model import SDCardModel, CARD_STATE_TRAN
+
+from test import slow
+
+def card_block(lba, stripe, ncards):
+    # Reference mapping: stripe n on card n % ncards.
+    n = lba >> stripe
+    return n % ncards, ((n//ncards) << stripe) | (lba & ((1 << stripe) - 1))
+
+class StripeDUT(LiteXModule):
+    def __init__(self, ncards):
+        self.pads  = [_sdemulator_pads() for i in range(ncards)]
+        self.phys  = [SDPHY(pads, "", 100e6) for pads in self.pads]
+        self.cores = [SDCore(phy) for phy in self.phys]
+        for i, (phy, core) in enumerate(zip(self.phys, self.cores)):
+            self.add_module(name=f"phy{i}",  module=phy)
+            self.add_module(name=f"core{i}", module=core)
+            phy.clocker.divider.storage.reset    = 0
+            phy.settings.storage.reset           = SD_PHY_SPEED_4X
+            phy.settings.fields.data_width.reset = SD_PHY_SPEED_4X
+        self.stripe = SDStripe([core.get_port() for core in self.cores])
+
+
+class TestStripe(unittest.TestCase):
+    @passive
+    def port_gen(self, port, mem, cmds, fail=False):
+        # Simple SDCore Cmd Port model: WRITE/READ_MULTIPLE_BLOCK from/to mem, STOP_TRANSMISSION.
+        while True:
+            yield port.cmd.ready.eq(1)
+            yield
+            while not (yield port.cmd.valid):
+                yield
+            yield port.cmd.ready.eq(0)
+            self.assertEqual((yield port.cmd.crc), 1)
+            cmd   = (yield port.cmd.cmd)
+            block = (yield port.cmd.argument)
+            count = (yield port.cmd.block_count)
+            cmds.append((cmd, block, count) if cmd != 12 else (cmd,))
+            if cmd == 25:
+                yield port.sink.ready.eq(1)
+                for i in range(512*count):
+                    yield
+                    while not (yield port.sink.valid):
+                        yield
+                    mem[512*block + i] = (yield port.sink.data)
+                yield port.sink.ready.eq(0)
+            if cmd == 18:
+                for i in range(512*count if not fail else 100):
+                    yield port.source.valid.eq(1)
+                    yield port.source.data.eq(mem[512*block + i])
+                    yield port.source.first.eq(i%512 == 0)
+                    yield port.source.last.eq(i%512 == 511)
+                    yield
+                    while not (yield port.source.ready):
+                        yield
+                yield port.source.valid.eq(0)
+            yield port.error.eq(fail & (cmd == 18))
+            yield port.done.eq(1)
+            yield
+            yield port.done.eq(0)
+
+    def stripe_test(self, ncards, stripe, block, count, fail=False):
+        dut   = SDStripe([SDCorePort() for i in range(ncards)])
+        mems  = [bytearray(512*64) for i in range(ncards)]
+        cmds  = [[] for i in range(ncards)]
+        data  = os.urandom(512*count)
+        reads = []
+
+        def transfer(write):
+            yield dut.stripe.storage.eq(stripe)
+            yield dut.block.storage.eq(block)
+            yield dut.count.storage.eq(count)
+            yield (dut.write if write else dut.read).wr_stb.eq(1)
+            yield
+            yield (dut.write if write else dut.read).wr_stb.eq(0)
+            yield
+            while not (yield dut.status.fields.done):
+                yield
+
+        @passive
+        def sink():
+            for i, byte in enumerate(data):
+                yield dut.sink.valid.eq(1)
+                yield dut.sink.data.eq(byte)
+                yield
+                while not (yield dut.sink.ready):
+                    yield
+            yield dut.sink.valid.eq(0)
+
+        @passive
+        def source():
+            yield dut.source.ready.eq(1)
+            while True:
+                if (yield dut.source.valid):
+                    reads.append((yield dut.source.data))
+                yield
+
+        def main():
+            yield from transfer(write=True)
+            self.assertEqual((yield dut.status.fields.error), 0)
+            yield from transfer(write=False)
+            self.assertEqual((yield dut.status.fields.error), int(fail))
+            self.assertEqual((yield dut.writes.status), count)
+            self.assertEqual((yield dut.reads.status),  0 if fail else count)
+            self.assertEqual((yield dut.errors.status), int(fail))
+
+        generators = [main(), sink(), source()]
+        for i in range(ncards):
+            generators.append(self.port_gen(dut.ports[i], mems[i], cmds[i], fail=fail and (i == 0)))
+        run_simulation(dut, generators)
+
+        # Data distributed over the cards by stripes.
+        for lba in range(block, block + count):
+            card, cblock = card_block(lba, stripe, ncards)
+            offset = 512*(lba - block)
+            self.assertEqual(mems[card][512*cblock:512*(cblock + 1)], data[offset:offset + 512])
+
+        # One Multiple blocks transfer per card (and direction).
+        for i in range(ncards):
+            cblocks = [card_block(lba, stripe, ncards)[1] for lba in range(block, block + count)
+                if card_block(lba, stripe, ncards)[0] == i]
+            expected = [(25, cblocks[0], len(cblocks)), (12,), (18, cblocks[0], len(cblocks)), (12,)]
+            self.assertEqual(cmds[i], expected)
+
+        # Data reassembled (the failing card's blocks are read as zeroes).
+        self.assertEqual(len(reads), len(data))
+        if not fail:
+            self.assertEqual(bytes(reads), data)
+        return reads
+
+    def test_stripe_2(self):
+        self.stripe_test(ncards=2, stripe=0, block=0, count=4)
+
+    def test_stripe_4(self):
+        self.stripe_test(ncards=4, stripe=0, block=3, count=5)
+
+    @slow
+    def test_stripe_cores(self):
+        # Through SDCores/SDPHYs to SDCardModels: 1 block per card.
+        dut    = StripeDUT(ncards=2)
+        images = [bytearray(4*512) for i in range(2)]
+        models = [SDCardModel(pads, image) for pads, image in zip(dut.pads, images)]
+        for model in models:
+            model.state = CARD_STATE_TRAN
+            model.width = 4
+        stripe = dut.stripe
+        data   = os.urandom(2*512)
+        reads  = []
+
+        def transfer(write):
+            yield stripe.stripe.storage.eq(0)
+            yield stripe.block.storage.eq(2)
+            yield stripe.count.storage.eq(2)
+            yield (stripe.write if write else stripe.read).wr_stb.eq(1)
+            yield
+            yield (stripe.write if write else stripe.read).wr_stb.eq(0)
+            yield
+            while not (yield stripe.status.fields.done):
+                yield
+
+        @passive
+        def sink():
+            for byte in data:
+                yield stripe.sink.valid.eq(1)
+                yield stripe.sink.data.eq(byte)
+                yield
+                while not (yield stripe.sink.ready):
+                    yield
+            yield stripe.sink.valid.eq(0)
+
+        @passive
+        def source():
+            yield stripe.source.ready.eq(1)
+            while True:
+                if (yield stripe.source.valid):
+                    reads.append((yield stripe.source.data))
+                yield
+
+        def main():
+            yield from transfer(write=True)
+            self.assertEqual((yield stripe.status.fields.error), 0)
+            yield from transfer(write=False)
+            self.assertEqual((yield stripe.status.fields.error), 0)
+
+        generators = [main(), sink(), source()]
+        for model in models:
+            generators += model.get_generators()
+        run_simulation(dut, generators)
+
+        # Block 2 on card 0 (block 1), block 3 on card 1 (block 1).
+        self.assertEqual(bytes(images[0][512:1024]), data[:512])
+        self.assertEqual(bytes(images[1][512:1024]), data[512:])
+        self.assertEqual(bytes(reads), data)
+        for model in models:
+            self.assertEqual(model.commands, ["CMD25", "CMD12", "CMD18", "CMD12"])
+
+    def test_stripe_error(self):
+        reads = self.stripe_test(ncards=2, stripe=1, block=0, count=4, fail=True)
+        self.assertEqual(bytes(reads[100:1024]), bytes(924))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+#
+# This file is part of LiteSDCard.
+#
+# Copyright (c) 2026 Florent Kermarrec <florent@enjoy-digital.fr>
+# SPDX-License-Identifier: BSD-2-Clause
+
+import unittest
+
+from litesdcard.host.throughput import sd_clk_period, estimate
+from litesdcard.emulator.perf import measure
+
+# Test Throughput Model ----------------------------------------------------------------------------
+
+class TestThroughput(unittest.TestCase):
+    def test_sd_clk_period(self):
+        self.assertEqual([sd_clk_period(d) for d in [0, 1, 2, 3, 7, 255]], [2, 2, 2, 4, 8, 256])
+        self.assertEqual(sd_clk_period(3, slowdown=1), 8)
+
+    def model_test(self, tolerance=0.02, **kwargs):
+        measured  = measure(**kwargs)
+        estimated = estimate(**kwargs)
+        for metric in ["cycles", "latency"]:
+            self.assertAlmostEqual(estimated[metric]/measured[metric], 1.0, delta=tolerance,
+                msg="{}: estimated {}, measured {}".format(metric, estimated[metric], measured[metric]))
+
+    def test_model_read(self):
+        self.model_test(direction="read", divider=3, data_width=4, block_length=64, block_count=2,
+            access_latency=16)
+
+    def test_model_write(self):
+        self.model_test(direction="write", divider=3, data_width=4, block_length=64, block_count=2,
+            program_latency=32)
+
+    def test_model_read_1bit(self):
+        self.model_test(direction="read", divider=0, data_width=1, block_length=64, block_count=1)
+
+    def test_model_write_1bit(self):
+        self.model_test(direction="write", divider=0, data_width=1, block_length=64, block_count=1)
+
+    def test_model_read_divider(self):
+        self.model_test(direction="read", divider=7, data_width=4, block_length=64, block_count=2)
+
+    def test_model_write_divider(self):
+        self.model_test(direction="write", divider=7, data_width=4, block_length=64, block_count=2)
+
+if __name__ == '__main__':
+        unittest.main()
@@ -0,0 +1,152 @@
+#
+# This file is part of LiteSDCard.
+#
+# Copyright (c) 2026 Florent Kermarrec <florent@enjoy-digital.fr>
+# SPDX-License-Identifier: BSD-2-Clause
+
+import os
+import socket
+import threading
+import time
+import unittest
+
+import numpy as np
+
+from litesdcard.host.codec import *
+from litesdcard.host.capture import UDPCapture, pattern_gaps, rle_decode
+from litesdcard.host.timeline import decode_timeline, format_event
+
+# Helpers ------------------------------------------------------------------------------------------
+
+class SDBus:
+    """Build sampled SD bus lines (clk: bit 0, cmd: bit 1, dat: bits 2-5), 4 samples per Clk."""
+    def __init__(self):
+        self.cmd = []
+        self.dat = []
+
+    def idle(self, clocks):
+        self.cmd += [1]*clocks
+        self.dat += [0xf]*clocks
+
+    def cmd_frame(self, bits):
+        self.cmd += [int(b) for b in bits]
+        self.dat += [0xf]*len(bits)
+
+    def dat_frame(self, values, width=4):
+        self.cmd += [1]*len(values)
+        self.dat += [int(v) | (0xf & ~(2**width - 1)) for v in values]
+
+    def samples(self):
+        values = (np.array(self.cmd, dtype=np.uint8) << 1) | (np.array(self.dat, dtype=np.uint8) << 2)
+        return np.stack([values, values, values | 1, values | 1], axis=1).reshape(-1)
+
+# Test Timeline ------------------------------------------------------------------------------------
+
+class TestTimeline(unittest.TestCase):
+    def test_timeline(self):
+        read_data  = os.urandom(512)
+        write_data = [os.urandom(512) for i in range(2)]
+        bus = SDBus()
+        bus.idle(16)
+        # ACMD6 (4-bit).
+        bus.cmd_frame(encode_command(55, 0x12340000)); bus.idle(2)
+        bus.cmd_frame(encode_response_r1(55, 0x120));  bus.idle(8)
+        bus.cmd_frame(encode_command(6, 0b10));        bus.idle(2)
+        bus.cmd_frame(encode_response_r1(6, 0x920));   bus.idle(8)
+        # CMD2 (R2).
+        bus.cmd_frame(encode_command(2, 0));           bus.idle(2)
+        bus.cmd_frame(encode_response_r2(np.arange(16, dtype=np.uint8))); bus.idle(8)
+        # CMD17.
+        bus.cmd_frame(encode_command(17, 10));         bus.idle(2)
+        bus.cmd_frame(encode_response_r1(17, 0x900));  bus.idle(8)
+        bus.dat_frame(encode_data_block(np.frombuffer(read_data, dtype=np.uint8), 4)); bus.idle(8)
+        # CMD25 + CMD12 (2nd block with CRC error).
+        bus.cmd_frame(encode_command(25, 20));         bus.idle(2)
+        bus.cmd_frame(encode_response_r1(25, 0x900));  bus.idle(2)
+        for i, data in enumerate(write_data):
+            block = encode_data_block(np.frombuffer(data, dtype=np.uint8), 4)
+            if i == 1:
+                block[10] ^= 1
+            bus.dat_frame(block); bus.idle(2)
+            status = CRC_STATUS_ACCEPTED if i == 0 else CRC_STATUS_CRC_ERROR
+            bus.dat_frame([0xe | b for b in encode_crc_status(status)], width=1)
+            bus.dat_frame([0xe]*32, width=1) # Busy.
+            bus.idle(2)
+        bus.cmd_frame(encode_command(12, 0));          bus.idle(2)
+        bus.cmd_frame(encode_response_r1(12, 0xc00));  bus.idle(1)
+        bus.dat_frame([0xe]*8, width=1)                # Busy.
+        bus.idle(16)
+
+        events = decode_timeline(bus.samples())
+        for event in events:
+            format_event(event, sample_period=10e-9)
+        types = [event["type"] for event in events]
+        self.assertEqual(types, [
+            "cmd", "response", "cmd", "response", "cmd", "response",
+            "cmd", "response", "data",
+            "cmd", "response", "data", "crc_status", "busy", "data", "crc_status", "busy",
+            "cmd", "response", "busy"])
+        self.assertEqual([e["name"] for e in events if e["type"] == "cmd"],
+            ["CMD55", "ACMD6", "CMD2", "CMD17", "CMD25", "CMD12"])
+        self.assertEqual(events[5]["register"][:30], bytes(range(15)).hex())
+        data = [e for e in events if e["type"] == "data"]
+        self.assertEqual([e["data"] for e in data], [read_data, write_data[0], data[2]["data"]])
+        self.assertEqual([e["direction"] for e in data], ["read", "write", "write"])
+        self.assertEqual([e["valid"] for e in data], [True, True, False])
+        self.assertEqual([e["status"] for e in events if e["type"] == "crc_status"],
+            [CRC_STATUS_ACCEPTED, CRC_STATUS_CRC_ERROR])
+        self.assertEqual([e["clocks"] for e in events if e["type"] == "busy"], [32, 32, 8])
+        self.assertTrue(all(e["valid"] for e in events if e["type"] in ["cmd", "response"]))
+
+    def test_capture(self):
+        capture = UDPCapture(ip="127.0.0.1", port=0, timeout=0.5)
+        capture.open()
+        port    = capture.sock.getsockname()[1]
+        pattern = (np.arange(4096) % 256).astype(np.uint8)
+        pattern = np.delete(pattern, [1000, 1001])
+
+        def sender():
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            for i in range(0, len(pattern), 1024):
+                sock.sendto(pattern[i:i+1024].tobytes(), ("127.0.0.1", port))
+            sock.close()
+
+        thread = threading.Thread(target=sender)
+        thread.start()
+        samples, stats = capture.capture(4096)
+        thread.join()
+        capture.close()
+        self.assertEqual(stats["samples"], 4094)
+        self.assertEqual(stats["packets"], 4)
+        self.assertFalse(stats["complete"])
+        self.assertEqual(pattern_gaps(samples).tolist(), [1000])
+
+    def test_capture_rle(self):
+        capture = UDPCapture(ip="127.0.0.1", port=0, timeout=5.0)
+        capture.open()
+        port    = capture.sock.getsockname()[1]
+        # 256 records of 16 samples (4096 samples), sent in datagrams splitting records.
+        records = (np.arange(256, dtype="<u4") % 256) | (15 << 8)
+        data    = records.astype("<u4").tobytes()
+
+        def sender():
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            for i in range(0, len(data), 1022):
+                sock.sendto(data[i:i+1022], ("127.0.0.1", port))
+            sock.close()
+
+        thread = threading.Thread(target=sender)
+        thread.start()
+        start = time.time()
+        samples, stats = capture.capture(4096, rle=True)
+        duration = time.time() - start
+        thread.join()
+        capture.close()
+        # Capture stopped on the records covering the samples, not on timeout.
+        self.assertLess(duration, capture.timeout)
+        self.assertTrue(stats["complete"])
+        self.assertEqual(stats["samples"], len(data))
+        self.assertEqual(rle_decode(samples, expand=True).tolist(), np.repeat(np.arange(256) % 256, 16).tolist())
+
+if __name__ == '__main__':
+        unittest.main()
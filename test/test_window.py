@@ -0,0 +1,117 @@
+#
+# This file is part of LiteSDCard.
+#
+# Copyright (c) 2026 Florent Kermarrec <florent@enjoy-digital.fr>
+# SPDX-License-Identifier: BSD-2-Clause
+
+import unittest
+
+import os
+
+from migen import *
+from migen.sim import passive
+
+from litex.gen import *
+
+from litesdcard.common import *
+from litesdcard.phy import SDPHY
+from litesdcard.core import SDCore, SDCorePort
+from litesdcard.frontend.window import SDBlockWindow
+from litesdcard.emulator.core import _sdemulator_pads
+from litesdcard.emulator.model import SDCardModel, CARD_STATE_TRAN
+
+def block_data(lba):
+    return [(lba + i) & 0xff for i in range(512)]
+
+class WindowDUT(LiteXModule):
+    def __init__(self):
+        self.pads   = _sdemulator_pads()
+        self.phy    = SDPHY(self.pads, "", 100e6)
+        self.core   = SDCore(self.phy)
+        self.window = SDBlockWindow(self.core.get_port(), nlines=2, with_readahead=False)
+        self.phy.clocker.divider.storage.reset    = 0
+        self.phy.settings.storage.reset           = SD_PHY_SPEED_4X
+        self.phy.settings.fields.data_width.reset = SD_PHY_SPEED_4X
+
+
+class TestWindow(unittest.TestCase):
+    @passive
+    def port_gen(self, port, fetches):
+        # Simple SDCore Cmd Port model: returns block_data(lba) for each READ_SINGLE_BLOCK Cmd.
+        while True:
+            yield port.cmd.ready.eq(1)
+            yield
+            while not (yield port.cmd.valid):
+                yield
+            yield port.cmd.ready.eq(0)
+            lba = (yield port.cmd.argument)
+            self.assertEqual((yield port.cmd.crc), 1)
+            fetches.append(lba)
+            for i, data in enumerate(block_data(lba)):
+                yield port.source.valid.eq(1)
+                yield port.source.data.eq(data)
+                yield port.source.last.eq(i == 511)
+                yield
+                while not (yield port.source.ready):
+                    yield
+            yield port.source.valid.eq(0)
+            yield port.done.eq(1)
+            yield
+            yield port.done.eq(0)
+
+    def window_test(self, reads, with_readahead, expected_fetches, expected_hits, expected_misses):
+        fetches = []
+        stats   = []
+        def main_gen(dut):
+            yield dut.enable.storage.eq(1)
+            yield dut.block_base.storage.eq(0x100)
+            yield
+            for adr in reads:
+                lba  = 0x100 + adr//128
+                data = block_data(lba)[4*(adr%128):4*(adr%128) + 4]
+                self.assertEqual((yield from dut.bus.read(adr)), int.from_bytes(bytes(data), "little"))
+            for i in range(2048):
+                yield
+            stats.append(((yield dut.hits.status), (yield dut.misses.status)))
+
+        dut = SDBlockWindow(SDCorePort(), nlines=4, with_readahead=with_readahead)
+        run_simulation(dut, [main_gen(dut), self.port_gen(dut.port, fetches)])
+        self.assertEqual(fetches, expected_fetches)
+        self.assertEqual(stats, [(expected_hits, expected_misses)])
+
+    def test_window_hits(self):
+        self.window_test(reads=[0, 1, 127, 2, 0], with_readahead=False, expected_fetches=[0x100],
+            expected_hits=4, expected_misses=1)
+
+    def test_window_misses(self):
+        self.window_test(reads=[0, 128, 256, 0], with_readahead=False, expected_fetches=[0x100, 0x101, 0x102],
+            expected_hits=1, expected_misses=3)
+
+    def test_window_readahead(self):
+        # 128 read before the prefetch of 0x101 starts: fetched on miss (0x102 then prefetched).
+        self.window_test(reads=[0, 1, 128], with_readahead=True, expected_fetches=[0x100, 0x101, 0x102],
+            expected_hits=1, expected_misses=2)
+
+    def test_window_core(self):
+        # Through SDCore/SDPHY to SDCardModel.
+        dut    = WindowDUT()
+        image  = bytearray(os.urandom(4*512))
+        model  = SDCardModel(dut.pads, image)
+        model.state = CARD_STATE_TRAN
+        model.width = 4
+        window = dut.window
+        def main_gen():
+            yield window.enable.storage.eq(1)
+            yield window.block_base.storage.eq(1)
+            yield
+            for adr in [0, 5, 128 + 3, 127]:
+                lba  = 1 + adr//128
+                data = image[512*lba + 4*(adr%128):512*lba + 4*(adr%128) + 4]
+                self.assertEqual((yield from window.bus.read(adr)), int.from_bytes(data, "little"))
+            self.assertEqual((yield window.hits.status),   2)
+            self.assertEqual((yield window.misses.status), 2)
+        run_simulation(dut, [main_gen(), *model.get_generators()])
+        self.assertEqual(model.commands, ["CMD17", "CMD17"])
+
+if __name__ == '__main__':
+        unittest.main()